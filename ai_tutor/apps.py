@@ -1,5 +1,26 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
+
+SERVER_ENTRYPOINTS = ("gunicorn", "uvicorn", "daphne", "hypercorn", "uwsgi")
+
+
+def _is_server_process() -> bool:
+    """True for the process that actually serves requests, not migrate/shell/tests."""
+    if len(sys.argv) > 1 and sys.argv[1] == "runserver":
+        # With the autoreloader only the child (RUN_MAIN=true) serves; --noreload has no child
+        return os.environ.get("RUN_MAIN") == "true" or "--noreload" in sys.argv
+    return os.path.basename(sys.argv[0] if sys.argv else "").startswith(SERVER_ENTRYPOINTS)
+
 
 class AiTutorConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "ai_tutor"
+
+    def ready(self):
+        # Load the Ollama models in the background so the first student doesn't pay the cold load
+        if getattr(settings, "AI_TUTOR_WARMUP_ON_START", False) and _is_server_process():
+            from .model_manager import model_manager
+            model_manager.warm_up_async()
@@ -0,0 +1,189 @@
+# ai_tutor/audio.py
+"""
+Audio acquisition for the speech-to-text fallback.
+
+- pick the smallest audio-only stream yt-dlp offers (speech is resampled to
+  16 kHz mono anyway, so a higher bitrate only costs bandwidth)
+- pipe it through ONE ffmpeg decode straight to 16 kHz mono PCM and hand the
+  samples to the transcriber as they arrive — no MP3 re-encode, no WAV on disk
+- if the stream URL cannot be read directly, download the native container
+  (webm/m4a, no postprocessing) into an AudioTempDir and decode from there
+
+AudioTempDir is a disk-quota-bounded directory (AI_TUTOR_AUDIO_TEMP_DIR /
+AI_TUTOR_AUDIO_TEMP_MAX_BYTES): files are touched on use and the least recently
+used ones are deleted whenever the total passes the quota.
+"""
+
+import os
+import subprocess
+import threading
+from typing import Iterator, Optional
+
+from .conf import get_setting
+
+SAMPLE_RATE = 16000
+# Smallest audio-only stream first; fall back to anything with audio
+AUDIO_FORMAT = "worstaudio[acodec!=none]/worstaudio/bestaudio/best"
+READ_SECONDS = 5
+
+
+class AudioTempDir:
+    def __init__(self, root: str = "audio_temp", max_bytes: int = 512 * 1024 * 1024):
+        self.root = str(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def find(self, stem: str) -> Optional[str]:
+        """Existing file named <stem>.<ext> (touched as recently used), or None."""
+        for name in os.listdir(self.root):
+            if os.path.splitext(name)[0] == stem and not name.endswith(".part"):
+                path = os.path.join(self.root, name)
+                self.touch(path)
+                return path
+        return None
+
+    def touch(self, path: str):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def usage(self) -> int:
+        return sum(size for _, size, _ in self._files())
+
+    def enforce_quota(self, keep: Optional[str] = None):
+        """Delete least recently used files until the directory fits max_bytes."""
+        with self._lock:
+            files = sorted(self._files(), key=lambda f: f[2])   # oldest mtime first
+            total = sum(size for _, size, _ in files)
+            for path, size, _ in files:
+                if total <= self.max_bytes:
+                    break
+                if keep and os.path.abspath(path) == os.path.abspath(keep):
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def _files(self):
+        out = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if os.path.isfile(path):
+                out.append((path, st.st_size, st.st_mtime))
+        return out
+
+
+_temp_dir: Optional[AudioTempDir] = None
+_temp_dir_lock = threading.Lock()
+
+
+def get_audio_temp_dir() -> AudioTempDir:
+    global _temp_dir
+    with _temp_dir_lock:
+        if _temp_dir is None:
+            _temp_dir = AudioTempDir(
+                get_setting("AI_TUTOR_AUDIO_TEMP_DIR", "audio_temp"),
+                get_setting("AI_TUTOR_AUDIO_TEMP_MAX_BYTES", 512 * 1024 * 1024),
+            )
+        return _temp_dir
+
+
+def _ffmpeg(ffmpeg_location: Optional[str] = None) -> str:
+    if ffmpeg_location:
+        return os.path.join(ffmpeg_location, "ffmpeg")
+    return "ffmpeg"
+
+
+def decode_stream(source: str, headers: Optional[dict] = None, ffmpeg_location: Optional[str] = None,
+                  sr: int = SAMPLE_RATE) -> Iterator:
+    """URL or file → float32 mono PCM blocks of ~READ_SECONDS, as ffmpeg produces them."""
+    import numpy as np
+
+    cmd = [_ffmpeg(ffmpeg_location), "-nostdin", "-loglevel", "error"]
+    if headers:
+        cmd += ["-headers", "".join(f"{k}: {v}\r\n" for k, v in headers.items())]
+    cmd += ["-i", source, "-vn", "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr), "-"]
+
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    block = sr * 2 * READ_SECONDS
+    try:
+        while True:
+            data = proc.stdout.read(block)
+            if not data:
+                break
+            usable = len(data) - len(data) % 2
+            yield np.frombuffer(data[:usable], np.int16).astype(np.float32) / 32768.0
+        stderr = proc.stderr.read()
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+def _resolve(video_id: str):
+    """Stream URL + HTTP headers of the smallest audio format."""
+    from yt_dlp import YoutubeDL
+
+    with YoutubeDL({"format": AUDIO_FORMAT, "quiet": True, "noplaylist": True}) as ydl:
+        info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+    fmt = (info.get("requested_formats") or [info])[0]
+    return fmt.get("url"), fmt.get("http_headers") or info.get("http_headers") or {}
+
+
+def download_audio(video_id: str, temp_dir: Optional[AudioTempDir] = None,
+                   ffmpeg_location: Optional[str] = None) -> str:
+    """Native-container audio file in the temp dir (reused if still there)."""
+    from yt_dlp import YoutubeDL
+
+    temp_dir = temp_dir or get_audio_temp_dir()
+    path = temp_dir.find(video_id)
+    if path:
+        return path
+
+    opts = {
+        "format": AUDIO_FORMAT,
+        "outtmpl": os.path.join(temp_dir.root, "%(id)s.%(ext)s"),
+        "quiet": True,
+        "noplaylist": True,
+    }
+    if ffmpeg_location:
+        opts["ffmpeg_location"] = ffmpeg_location
+    with YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=True)
+        path = ydl.prepare_filename(info)
+
+    temp_dir.enforce_quota(keep=path)
+    return path
+
+
+def stream_pcm(video_id: str, ffmpeg_location: Optional[str] = None,
+               temp_dir: Optional[AudioTempDir] = None) -> Iterator:
+    """
+    16 kHz mono float32 blocks for a YouTube video: straight from the stream URL,
+    or from a downloaded native file if direct streaming fails before any audio.
+    """
+    produced = False
+    try:
+        url, headers = _resolve(video_id)
+        if url:
+            for block in decode_stream(url, headers, ffmpeg_location):
+                produced = True
+                yield block
+            return
+    except Exception as err:
+        if produced:
+            raise
+        print(f"[ai_tutor.audio] Direct stream failed for {video_id} ({err}); downloading instead.")
+
+    path = download_audio(video_id, temp_dir, ffmpeg_location)
+    yield from decode_stream(path, ffmpeg_location=ffmpeg_location)
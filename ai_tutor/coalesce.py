@@ -0,0 +1,78 @@
+# ai_tutor/coalesce.py
+"""
+Single-flight request coalescing:
+- The first caller for a key (the leader) runs the work.
+- Callers arriving with the same key while it is in flight (followers)
+  block on the leader's result instead of starting new work.
+- Leader / follower counts and the coalescing rate are exported to metrics.
+"""
+
+import re
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from . import metrics
+
+
+def normalize_text(text) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation."""
+    if text is None:
+        return ""
+    t = re.sub(r"\s+", " ", str(text).lower()).strip()
+    return t.rstrip(" ?!.")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.leaders = 0
+        self.followers = 0
+
+        metrics.register_gauge(f"coalesce.{name}.rate", self.coalescing_rate)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn() once per in-flight key; followers get the leader's result or exception."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            metrics.incr(f"coalesce.{self.name}.followers")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        metrics.incr(f"coalesce.{self.name}.leaders")
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def coalescing_rate(self) -> float:
+        total = self.leaders + self.followers
+        return round(self.followers / total, 4) if total else 0.0
@@ -0,0 +1,14 @@
+# ai_tutor/conf.py
+"""
+Settings lookup that also works outside Django (Streamlit apps, CLI testers):
+reads AI_TUTOR_* values from django.conf.settings when configured,
+otherwise falls back to the given default.
+"""
+
+
+def get_setting(name: str, default=None):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:  # Django missing or settings not configured
+        return default
@@ -8,49 +8,103 @@ AI Tutor Controller (HYBRID MODE):
 
 from typing import Dict, Any, List, Optional
 import uuid
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from .coalesce import SingleFlight, normalize_text
+from .scheduler import SchedulerBusy
+from .prompts import tutor_messages
+from .model_router import model_router
+from .conf import get_setting
+from .sessions import SessionStore, get_session_store, register_metrics, start_sweeper
+from .memory import build_memory
+from .prefetch import TopicPrefetcher
+from .domain_guard import question_allowed, keywords_allowed, topic_centroid, centroid_id
+from . import metrics
 
 # ================================================================
 #  SESSION STORAGE
 # ================================================================
 
-SESSIONS: Dict[str, Dict[str, Any]] = {}
+# Backend chosen by AI_TUTOR_SESSION_BACKEND (per-process LRU+TTL, or shared Django cache)
+SESSIONS: SessionStore = get_session_store()
+register_metrics(SESSIONS)
+start_sweeper(SESSIONS, get_setting("AI_TUTOR_SESSION_SWEEP_INTERVAL", 60.0))
+
+# Turn history + rolling summary, stored on each session
+MEMORY = build_memory(SESSIONS)
+
 
 def new_session() -> str:
     sid = str(uuid.uuid4())
-    SESSIONS[sid] = {
+    SESSIONS.save(sid, {
         "topic": None,
         "keywords": [],
         "mode": "chat",
         "current_video": None,
         "last_updated": time.time()
-    }
+    })
     return sid
 
 
 def set_session_context(session_id: str, topic=None, keywords=None, mode=None, current_video=None):
-    if session_id not in SESSIONS:
+    s = SESSIONS.get(session_id)
+    if s is None:
         raise KeyError("session_id not found")
 
-    s = SESSIONS[session_id]
-
-    if topic is not None:
-        s["topic"] = topic
-    if keywords is not None:
-        s["keywords"] = keywords
-    if mode is not None:
-        s["mode"] = mode
-    if current_video is not None:
-        s["current_video"] = current_video
+    # Embed topic + keywords once; each question is then one dot product against this.
+    # Computed before taking the session's write lock.
+    retopic = topic is not None or keywords is not None
+    if retopic:
+        new_topic = topic if topic is not None else s.get("topic")
+        new_keywords = keywords if keywords is not None else s.get("keywords")
+        try:
+            centroid = topic_centroid(new_topic, new_keywords)
+        except Exception as err:
+            print(f"[ai_tutor.controller] Domain guard centroid unavailable: {err}")
+            centroid = None
+
+    def apply(s):
+        if topic is not None:
+            s["topic"] = topic
+        if keywords is not None:
+            s["keywords"] = keywords
+        if mode is not None:
+            s["mode"] = mode
+        if current_video is not None:
+            s["current_video"] = current_video
+        if retopic:
+            s["guard_centroid"] = centroid
+            s["guard_id"] = centroid_id(new_topic, new_keywords)
+            s.pop("warm_pool", None)
+            s.pop("prefetched_video", None)
+        s["last_updated"] = time.time()
+
+    s = SESSIONS.update(session_id, apply)
+    if s is None:
+        raise KeyError("session_id not found")
 
-    s["last_updated"] = time.time()
+    # Warm NCERT (and optionally a video) for the new topic in the background
+    if retopic:
+        PREFETCHER.schedule(session_id)
     return s
 
 
+# Server-side only; never sent back to clients (history/summary are the
+# conversation memory, prefetched_video is prefetch bookkeeping)
+INTERNAL_SESSION_FIELDS = {"guard_centroid", "guard_id", "warm_pool", "history", "summary", "prefetched_video"}
+
+
+def public_session(sess: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in sess.items() if k not in INTERNAL_SESSION_FIELDS}
+
+
 def get_session_context(session_id: str):
-    if session_id not in SESSIONS:
+    s = SESSIONS.get(session_id)
+    if s is None:
         raise KeyError("session_id not found")
-    return SESSIONS[session_id]
+    return s
 
 
 # ================================================================
@@ -68,26 +122,53 @@ try:
         print(f"[NCERT] Failed init: {err}")
         rag_service = None
 
-    def _search_ncert(query: str, k=8):
+    POOL_MAX_DISTANCE = get_setting("AI_TUTOR_PREFETCH_MAX_DISTANCE", 1.0)
+
+    def _search_ncert(query: str, k=8, pool=None):
         if rag_service is None:
             return {"source": "ncert_stub", "results": []}
         try:
-            return {"source": "ncert", "results": rag_service.search(query, k)}
+            # Warm topic pool first; full index only if nothing in it is close enough
+            source = "ncert"
+            hits = None
+            if pool:
+                hits = rag_service.search_in_pool(query, pool, k)
+                if hits and hits[0][1] <= POOL_MAX_DISTANCE:
+                    metrics.incr("retrieval.ncert.pool_hit")
+                    source = "ncert_pool"
+                else:
+                    metrics.incr("retrieval.ncert.pool_miss")
+                    hits = None
+            if hits is None:
+                hits = rag_service.search_scored(query, k)
+            return {
+                "source": source,
+                "results": [rag_service.text_at(p) for p, _ in hits],
+                # Unit-length embeddings: cosine = 1 - L2²/2
+                "hits": [{"id": str(rag_service.chunk_ids[p]), "score": round(1 - d / 2, 4)} for p, d in hits],
+            }
         except Exception:
             return {"source": "ncert_stub", "results": []}
 
+    def _ncert_pool_search(query: str, k: int):
+        return rag_service.search_scored(query, k) if rag_service is not None else []
+
 except:
-    def _search_ncert(query: str, k=8):
+    rag_service = None
+
+    def _search_ncert(query: str, k=8, pool=None):
         return {"source": "ncert_stub", "results": []}
 
+    _ncert_pool_search = None
+
 
 # ================================================================
 #  YOUTUBE RAG (FIXED)
 # ================================================================
 
 try:
-    from .rag_youtube import YouTubeRAG
-    yt_rag_backend = YouTubeRAG()
+    from .rag_youtube import get_youtube_rag
+    yt_rag_backend = get_youtube_rag()   # the same instance the views serve
 
     def _search_youtube(query: str):
         try:
@@ -97,18 +178,33 @@ try:
             return {"source": "youtube_stub", "results": []}
 
 except:
+    yt_rag_backend = None
+
     def _search_youtube(query: str):
         return {"source": "youtube_stub", "results": []}
 
 
+# ================================================================
+#  TOPIC PREFETCH
+# ================================================================
+
+PREFETCHER = TopicPrefetcher(
+    SESSIONS,
+    pool_search=_ncert_pool_search,
+    pool_size=get_setting("AI_TUTOR_PREFETCH_POOL_SIZE", 48),
+    video_search=yt_rag_backend.search_youtube if yt_rag_backend and get_setting("AI_TUTOR_PREFETCH_VIDEO", False) else None,
+    video_prepare=yt_rag_backend.prepare_video if yt_rag_backend else None,
+)
+
+
 # ================================================================
 #  LLM IMPORT
 # ================================================================
 
 try:
-    from .llm_loader import ask_llm
+    from .llm_loader import chat_messages
 except:
-    def ask_llm(prompt: str):
+    def chat_messages(messages, **kwargs):
         return "LLM unavailable."
 
 
@@ -117,10 +213,7 @@ except:
 # ================================================================
 
 def domain_allowed(question: str, keywords: List[str]):
-    q = question.lower()
-    if not keywords:
-        return True
-    return any(k in q for k in keywords)
+    return keywords_allowed(question, keywords)
 
 
 # ================================================================
@@ -137,81 +230,151 @@ def yt_to_text(item: dict) -> str:
     )
 
 
+# ================================================================
+#  PARALLEL RETRIEVAL (PER-SOURCE DEADLINES)
+# ================================================================
+
+RETRIEVAL_DEADLINES = get_setting("AI_TUTOR_RETRIEVAL_DEADLINES", {"ncert": 3.0, "youtube": 5.0})
+RETRIEVAL_WORKERS = get_setting("AI_TUTOR_RETRIEVAL_WORKERS", {"ncert": 4, "youtube": 4})
+
+
+class _SourcePool:
+    """
+    One bounded executor per retrieval source. A call that misses its deadline
+    keeps running (a thread cannot be interrupted) but still holds one of the
+    source's `workers` slots; once every slot is held by stragglers, new calls
+    to that source are refused at once instead of queueing, and other sources
+    are unaffected.
+    """
+
+    def __init__(self, name: str, workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"retrieval-{name}")
+        self._slots = threading.BoundedSemaphore(workers)
+
+    def submit(self, fn, *args):
+        """Future for fn(*args), or None if the source is saturated."""
+        if not self._slots.acquire(blocking=False):
+            return None
+        fut = self._executor.submit(fn, *args)
+        fut.add_done_callback(lambda _: self._slots.release())   # finished or cancelled
+        return fut
+
+
+_source_pools: Dict[str, _SourcePool] = {}
+_source_pools_lock = threading.Lock()
+
+
+def _source_pool(name: str) -> _SourcePool:
+    with _source_pools_lock:
+        pool = _source_pools.get(name)
+        if pool is None:
+            pool = _source_pools[name] = _SourcePool(name, RETRIEVAL_WORKERS.get(name, 4))
+        return pool
+
+
+def _fan_out(question: str, use_youtube=False, ncert_pool=None):
+    """
+    Run every retrieval source concurrently; each gets its own deadline.
+    Returns ({source: result}, {source: "ok" | "timeout" | "busy" | "error" | "unavailable"}).
+    """
+    sources = {"ncert": lambda q: _search_ncert(q, pool=ncert_pool)}
+    if use_youtube:
+        sources["youtube"] = _search_youtube
+
+    started = time.monotonic()
+    futures = {name: _source_pool(name).submit(fn, question) for name, fn in sources.items()}
+
+    results, status = {}, {}
+    for name, fut in futures.items():
+        remaining = RETRIEVAL_DEADLINES.get(name, 5.0) - (time.monotonic() - started)
+        try:
+            if fut is None:
+                res, status[name] = {"source": f"{name}_stub", "results": []}, "busy"
+            else:
+                res = fut.result(timeout=max(remaining, 0))
+                status[name] = "unavailable" if res.get("source", "").endswith("_stub") else "ok"
+        except FutureTimeout:
+            fut.cancel()   # drops it if it never started; a running call finishes on its own
+            res, status[name] = {"source": f"{name}_stub", "results": []}, "timeout"
+        except Exception:
+            res, status[name] = {"source": f"{name}_stub", "results": []}, "error"
+        results[name] = res
+        metrics.incr(f"retrieval.{name}.{status[name]}")
+
+    metrics.observe("retrieval.fan_out_seconds", time.monotonic() - started)
+    return results, status
+
+
 # ================================================================
 #  MAIN ORCHESTRATOR
 # ================================================================
 
-def handle_student_query(session_id: str, question: str, use_youtube=False):
+_chat_flight = SingleFlight("chat")
 
-    # Validate
-    if session_id not in SESSIONS:
-        return {"ok": False, "error": "Invalid session_id"}
 
-    sess = SESSIONS[session_id]
-    keywords = sess.get("keywords", [])
+LLM_FAILED_ANSWER = "AI Tutor failed to generate an answer."
 
-    # Domain guard
-    if not domain_allowed(question, keywords):
-        return {"ok": False, "error": "I can only answer questions related to the topic."}
 
-    # Retrieval
-    ncert = _search_ncert(question)
-    youtube = _search_youtube(question) if use_youtube else None
+def _generate_answer(question: str, use_youtube=False, memory_text="", ncert_pool=None):
+    """Retrieval + LLM generation. Shared by all coalesced callers of one key."""
+
+    # Retrieval — NCERT and YouTube in parallel, slow sources dropped at their deadline
+    retrieved, sources = _fan_out(question, use_youtube, ncert_pool)
+    ncert = retrieved["ncert"]
+    youtube = retrieved.get("youtube")
 
     ncert_chunks = [str(x) for x in ncert.get("results", [])[:10]]
     youtube_chunks = [yt_to_text(v) for v in youtube.get("results", [])[:5]] if youtube else []
 
-    # Background
-    llm_background = (
-        "General Science Knowledge:\n"
-        "- Acids release H+ ions.\n"
-        "- Bases release OH- ions.\n"
-        "- Neutralisation forms salt and water.\n"
-        "Use background ONLY to enrich explanations."
-    )
+    context_text = "\n\n".join(ncert_chunks + youtube_chunks)
 
-    all_chunks = ncert_chunks + youtube_chunks + [llm_background]
-    context_text = "\n\n".join(all_chunks)
+    # Fixed instructions + background live in the cacheable system prefix
+    messages = tutor_messages(context_text, question, memory=memory_text)
+    model = model_router.choose("chat", question, context_chars=len(context_text))
 
-    # NEW IMPROVED PROMPT (OPEN KNOWLEDGE MODE)
-    prompt = f"""
-You are an intelligent NCERT science tutor.
+    try:
+        answer = chat_messages(messages, model=model)
+    except SchedulerBusy:
+        raise   # surfaced to the client as HTTP 429
+    except Exception:
+        answer = LLM_FAILED_ANSWER
 
-Use the HYBRID CONTEXT as reference, but you are allowed to use your own
-scientific knowledge to explain concepts clearly, deeply, and with helpful examples.
+    return {"ncert": ncert, "youtube": youtube, "sources": sources, "answer": answer, "model": model}
+
+
+def handle_student_query(session_id: str, question: str, use_youtube=False):
 
-INSTRUCTIONS:
-- Use NCERT FIRST.
-- Use YouTube content as supportive info.
-- Use your own knowledge to expand, clarify, and give real-life examples.
-- Give a detailed explanation suitable for Class 6–10 students.
-- Structure the answer: introduction → explanation → examples → summary.
-- Do NOT stay limited only to the context.
-- Do NOT hallucinate wrong facts.
+    # Validate
+    sess = SESSIONS.get(session_id)
+    if sess is None:
+        return {"ok": False, "error": "Invalid session_id"}
 
-------------------------
-HYBRID CONTEXT:
-{context_text}
-------------------------
+    # Domain guard (embedding centroid; keyword fallback) — runs before any retrieval
+    if not question_allowed(question, sess):
+        return {"ok": False, "error": "I can only answer questions related to the topic."}
 
-Question: {question}
+    # Fixed-size conversation memory (rolling summary + recent turns)
+    memory_text = MEMORY.render(sess)
 
-Write a clear, structured, detailed explanation:
-"""
+    # Identical in-flight questions on the same topic (and same memory) share one retrieval + generation
+    key = (normalize_text(sess.get("topic")), normalize_text(question), bool(use_youtube), memory_text)
+    generated = _chat_flight.do(
+        key, lambda: _generate_answer(question, use_youtube, memory_text, sess.get("warm_pool"))
+    )
 
-    try:
-        answer = ask_llm(prompt)
-    except Exception:
-        answer = "AI Tutor failed to generate an answer."
+    if generated["answer"] != LLM_FAILED_ANSWER:
+        MEMORY.append_turn(session_id, question, generated["answer"])
 
     return {
         "ok": True,
         "session_id": session_id,
         "question": question,
-        "session": sess,
-        "ncert": ncert,
-        "youtube": youtube,
-        "answer": answer
+        "session": public_session(sess),
+        "ncert": generated["ncert"],
+        "youtube": generated["youtube"],
+        "sources": generated["sources"],
+        "answer": generated["answer"],
+        "model": generated["model"]
     }
 
 
@@ -0,0 +1,90 @@
+# ai_tutor/domain_guard.py
+"""
+Embedding-based domain guard.
+
+set_session_context embeds the topic and keywords ONCE and stores their
+unit-length centroid on the session ("guard_centroid"). Each question is then
+embedded (LRU-cached) and scored with a single dot product against it, before
+any retrieval or LLM work. Falls back to the keyword substring check when no
+centroid is available (embedder missing, or no topic set).
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from . import metrics
+from .coalesce import normalize_text
+from .conf import get_setting
+
+THRESHOLD = get_setting("AI_TUTOR_DOMAIN_GUARD_THRESHOLD", 0.3)
+
+_DECISION_CACHE_SIZE = 4096
+_decisions: "OrderedDict[tuple, bool]" = OrderedDict()   # LRU of (guard_id, question) → allowed
+_decisions_lock = threading.Lock()
+
+
+def keywords_allowed(question: str, keywords: List[str]) -> bool:
+    """Original substring check; used as the fallback."""
+    q = question.lower()
+    if not keywords:
+        return True
+    return any(k in q for k in keywords)
+
+
+def topic_centroid(topic: Optional[str], keywords: Optional[List[str]]) -> Optional[List[float]]:
+    """Unit-length mean of the topic + keyword embeddings (a plain list, so sessions stay serialisable)."""
+    import numpy as np
+    from .embeddings import embed
+
+    texts = [t for t in [topic, *(keywords or [])] if t]
+    if not texts:
+        return None
+    centroid = embed(texts, normalize=True).mean(axis=0)
+    norm = float(np.linalg.norm(centroid))
+    return (centroid / norm).tolist() if norm else None
+
+
+def centroid_id(topic, keywords) -> str:
+    raw = f"{normalize_text(topic)}|{','.join(sorted(normalize_text(k) for k in keywords or []))}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=4096)
+def _question_vector(normalized_question: str):
+    from .embeddings import embed
+    return embed([normalized_question], normalize=True)[0]
+
+
+def score(question: str, centroid: List[float]) -> float:
+    import numpy as np
+    return float(np.dot(_question_vector(normalize_text(question)), np.asarray(centroid, dtype="float32")))
+
+
+def question_allowed(question: str, session: Dict) -> bool:
+    centroid = session.get("guard_centroid")
+    if not centroid:
+        return keywords_allowed(question, session.get("keywords", []))
+
+    key = (session.get("guard_id"), normalize_text(question))
+    with _decisions_lock:
+        cached = _decisions.get(key)
+        if cached is not None:
+            _decisions.move_to_end(key)
+    if cached is not None:
+        metrics.incr("domain_guard.cache_hits")
+        return cached
+
+    try:
+        allowed = score(question, centroid) >= THRESHOLD
+    except Exception:
+        allowed = keywords_allowed(question, session.get("keywords", []))
+
+    metrics.incr(f"domain_guard.{'allowed' if allowed else 'rejected'}")
+    with _decisions_lock:
+        _decisions[key] = allowed
+        if len(_decisions) > _DECISION_CACHE_SIZE:
+            _decisions.popitem(last=False)
+    return allowed
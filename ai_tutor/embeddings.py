@@ -0,0 +1,32 @@
+# ai_tutor/embeddings.py
+"""
+One shared sentence-transformers model per process.
+
+RAGService, YouTubeRAG and the domain guard all use all-MiniLM-L6-v2;
+loading it once saves memory and start-up time.
+"""
+
+import threading
+from typing import Dict, List
+
+_lock = threading.Lock()
+_models: Dict[str, object] = {}
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+
+
+def get_embedder(model_name: str = DEFAULT_MODEL):
+    with _lock:
+        model = _models.get(model_name)
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+            model = _models[model_name] = SentenceTransformer(model_name)
+        return model
+
+
+def embed(texts: List[str], model_name: str = DEFAULT_MODEL, normalize: bool = False):
+    """float32 matrix, one row per text; unit-length rows when normalize=True."""
+    vectors = get_embedder(model_name).encode(
+        texts, convert_to_numpy=True, normalize_embeddings=normalize
+    )
+    return vectors.astype("float32")
@@ -0,0 +1,194 @@
+# ai_tutor/fake_ollama.py
+"""
+Deterministic Ollama-compatible HTTP server for load tests and offline benchmarks.
+
+Implements the endpoints the tutor uses:
+- POST /api/chat      (streaming NDJSON or single JSON, like Ollama)
+- POST /api/generate  (warm-up calls)
+- GET  /api/tags, /api/version
+
+Answers are pseudo-random words seeded from (seed, model, messages), so the same
+request always gets the same answer. Timing is configurable:
+- first-token latency ~ lognormal(ttft_mean, ttft_sigma)
+- then tokens_per_sec for the answer body
+- a one-off cold_load delay the first time each model is requested
+
+Run:  python -m ai_tutor.fake_ollama --port 11435 --tokens-per-sec 40
+Point the tutor at it with AI_TUTOR_OLLAMA_HOST = "http://127.0.0.1:11435".
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_VOCAB = (
+    "acid base salt water ion hydrogen energy plant light cell force motion "
+    "matter heat sound reaction change example because therefore which when "
+    "the a of and to in is are this that with for as by on"
+).split()
+
+
+class FakeOllamaConfig:
+    def __init__(self, tokens_per_sec=40.0, ttft_mean=0.3, ttft_sigma=0.25,
+                 answer_tokens=120, cold_load=2.0, seed=0):
+        self.tokens_per_sec = tokens_per_sec
+        self.ttft_mean = ttft_mean
+        self.ttft_sigma = ttft_sigma
+        self.answer_tokens = answer_tokens
+        self.cold_load = cold_load
+        self.seed = seed
+
+
+class _Handler(BaseHTTPRequestHandler):
+    config: FakeOllamaConfig = FakeOllamaConfig()
+    loaded = set()
+    lock = threading.Lock()
+
+    def log_message(self, fmt, *args):   # keep benchmark output clean
+        pass
+
+    # ----------------------------------------------------
+    # HELPERS
+    # ----------------------------------------------------
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _rng(self, model, payload):
+        digest = hashlib.sha256(
+            json.dumps([self.config.seed, model, payload], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    def _load(self, model) -> float:
+        """Simulated cold load; returns load duration in seconds."""
+        with self.lock:
+            cold = model not in self.loaded
+            self.loaded.add(model)
+        if cold and self.config.cold_load:
+            time.sleep(self.config.cold_load)
+            return self.config.cold_load
+        return 0.001
+
+    @staticmethod
+    def _now():
+        return datetime.now(timezone.utc).isoformat()
+
+    # ----------------------------------------------------
+    # ROUTES
+    # ----------------------------------------------------
+    def do_GET(self):
+        if self.path.startswith("/api/tags"):
+            models = [{"name": m, "model": m} for m in sorted(self.loaded)]
+            return self._send_json({"models": models})
+        if self.path.startswith("/api/version"):
+            return self._send_json({"version": "0.0.0-fake"})
+        self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        payload = self._read_json()
+        model = payload.get("model", "fake")
+
+        if self.path.startswith("/api/generate"):
+            load = self._load(model)
+            return self._send_json({
+                "model": model, "created_at": self._now(), "response": "",
+                "done": True, "load_duration": int(load * 1e9),
+            })
+
+        if not self.path.startswith("/api/chat"):
+            return self._send_json({"error": "not found"}, status=404)
+
+        started = time.monotonic()
+        load = self._load(model)
+        rng = self._rng(model, payload.get("messages"))
+        cfg = self.config
+
+        mu = math.log(max(cfg.ttft_mean, 1e-3))
+        time.sleep(rng.lognormvariate(mu, cfg.ttft_sigma))
+        tokens = [rng.choice(_VOCAB) + " " for _ in range(cfg.answer_tokens)]
+        delay = 1.0 / cfg.tokens_per_sec if cfg.tokens_per_sec else 0.0
+
+        def final():
+            return {
+                "model": model, "created_at": self._now(),
+                "message": {"role": "assistant", "content": ""},
+                "done": True, "done_reason": "stop",
+                "total_duration": int((time.monotonic() - started) * 1e9),
+                "load_duration": int(load * 1e9),
+                "eval_count": len(tokens),
+            }
+
+        if payload.get("stream", True):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            for token in tokens:
+                time.sleep(delay)
+                line = {"model": model, "created_at": self._now(),
+                        "message": {"role": "assistant", "content": token}, "done": False}
+                self.wfile.write((json.dumps(line) + "\n").encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write((json.dumps(final()) + "\n").encode("utf-8"))
+            return
+
+        time.sleep(delay * len(tokens))
+        resp = final()
+        resp["message"]["content"] = "".join(tokens).strip()
+        self._send_json(resp)
+
+
+def serve(host="127.0.0.1", port=11435, config: FakeOllamaConfig = None, background=False):
+    """Start the fake server. With background=True returns the running server."""
+    handler = type("FakeOllamaHandler", (_Handler,), {
+        "config": config or FakeOllamaConfig(),
+        "loaded": set(),
+        "lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    if background:
+        threading.Thread(target=server.serve_forever, name="fake-ollama", daemon=True).start()
+        return server
+    print(f"Fake Ollama listening on http://{host}:{port}")
+    server.serve_forever()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Deterministic Ollama stand-in")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=11435)
+    ap.add_argument("--tokens-per-sec", type=float, default=40.0)
+    ap.add_argument("--ttft-mean", type=float, default=0.3, help="median first-token latency (s)")
+    ap.add_argument("--ttft-sigma", type=float, default=0.25, help="lognormal sigma of first-token latency")
+    ap.add_argument("--answer-tokens", type=int, default=120)
+    ap.add_argument("--cold-load", type=float, default=2.0, help="one-off load delay per model (s)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    serve(args.host, args.port, FakeOllamaConfig(
+        tokens_per_sec=args.tokens_per_sec,
+        ttft_mean=args.ttft_mean,
+        ttft_sigma=args.ttft_sigma,
+        answer_tokens=args.answer_tokens,
+        cold_load=args.cold_load,
+        seed=args.seed,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# ai_tutor/global_index.py
+"""
+One vector index across every prepared video, for "which video (and which moment)
+explains this?" without a live YouTube search.
+
+Each row is a chunk: (video_id, start, end) plus its embedding. The vectors live
+in the shared VectorArena (ai_tutor.vector_arena) that YouTubeRAG searches
+per video, so this index only keeps the timestamps. YouTubeRAG registers a
+video whenever it prepares or loads one (re-adding replaces it) and removes it
+when its in-memory LRU evicts it, so the index covers exactly the resident
+videos. On first search YouTubeRAG warms that set from the most recent records
+in the on-disk VideoStore, within the LRU budget. Chunk text is not kept here —
+hits are (video, timestamp) only, since transcripts are never sent to the UI.
+
+Embeddings come from all-MiniLM-L6-v2, which is L2-normalised, so
+score = 1 - L2² / 2 is the cosine similarity (same scale as controller hits).
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+from .vector_arena import get_vector_arena
+
+
+class GlobalVideoIndex:
+    def __init__(self, embed_model: str, arena=None):
+        self.embed_model = embed_model
+        self.arena = arena if arena is not None else get_vector_arena(embed_model)
+        self._videos: Dict[str, Dict] = {}    # video_id → {"starts", "ends", "slot"}
+        self._lock = threading.Lock()
+
+    def add(self, video_id: str, rec: Dict):
+        """Register a video whose vectors are already in the arena (rec: starts, ends, arena_slot)."""
+        with self._lock:
+            self._videos[video_id] = {
+                "starts": list(rec["starts"]),
+                "ends": list(rec["ends"]),
+                "slot": rec.get("arena_slot"),
+            }
+
+    def remove(self, video_id: str, expected: Optional[int] = None):
+        """Unregister a video; with expected, only if it was added with that arena slot."""
+        with self._lock:
+            meta = self._videos.get(video_id)
+            if meta is not None and (expected is None or meta["slot"] == expected):
+                del self._videos[video_id]
+
+    def __contains__(self, video_id: str) -> bool:
+        return video_id in self._videos
+
+    def search(self, q_vec, k: int = 10, per_video: Optional[int] = 1, min_score: float = 0.0) -> List[Dict]:
+        """
+        Ranked hits [{video_id, start, end, score}] for a (1, dim) query vector.
+        per_video caps hits from the same video (None = no cap).
+        """
+        with self._lock:
+            videos = dict(self._videos)
+
+        hits, seen = [], {}
+        for video_id, i, d in self.arena.iter_all(q_vec[0], allowed=set(videos)):
+            score = 1.0 - d / 2.0
+            if score < min_score:
+                break
+            if per_video is not None and seen.get(video_id, 0) >= per_video:
+                continue
+            seen[video_id] = seen.get(video_id, 0) + 1
+            meta = videos[video_id]
+            if i >= len(meta["starts"]):
+                continue   # video re-put between the snapshot and the arena scan
+            hits.append({
+                "video_id": video_id,
+                "start": meta["starts"][i],
+                "end": meta["ends"][i],
+                "score": round(score, 4),
+            })
+            if len(hits) >= k:
+                break
+        return hits
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "videos": len(self._videos),
+                "chunks": sum(len(v["starts"]) for v in self._videos.values()),
+                "arena": self.arena.stats(),
+            }
+
+
+_indexes: Dict[str, GlobalVideoIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_global_index(embed_model: str = "all-MiniLM-L6-v2") -> GlobalVideoIndex:
+    """Process-wide index per embedding model, shared by every YouTubeRAG."""
+    with _indexes_lock:
+        index = _indexes.get(embed_model)
+        if index is None:
+            index = _indexes[embed_model] = GlobalVideoIndex(embed_model)
+        return index
@@ -0,0 +1,118 @@
+# ai_tutor/jobs.py
+"""
+Background job queue for YouTube video preparation.
+
+submit(video_id) enqueues prepare_video on a local worker pool and returns a
+PrepareJob immediately; clients poll GET /ai_tutor/prepare/<job_id>/ for:
+
+    queued → fetching → transcribing (Whisper only) → embedding → ready
+                                                              ↘ failed
+
+Ready jobs carry the video's per-stage timings (seconds). A video with a
+queued/running job is not enqueued twice. Finished jobs are
+kept for AI_TUTOR_PREPARE_JOB_TTL seconds so late pollers still see them.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from . import metrics
+
+ACTIVE_STATES = ("queued", "fetching", "transcribing", "embedding")
+
+
+class PrepareJob:
+    def __init__(self, video_id: str):
+        self.id = uuid.uuid4().hex
+        self.video_id = video_id
+        self.state = "queued"
+        self.progress = 0.0
+        self.error: Optional[str] = None
+        self.timings: Optional[Dict[str, float]] = None
+        self.created = time.time()
+        self.updated = self.created
+        self._done = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.state in ACTIVE_STATES
+
+    def set_state(self, state: str, progress: Optional[float] = None):
+        self.state = state
+        if progress is not None:
+            self.progress = round(max(self.progress, min(progress, 1.0)), 3)
+        self.updated = time.time()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """True once the job reached ready (or failed) within timeout."""
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "video_id": self.video_id,
+            "status": self.state,
+            "progress": self.progress,
+            "error": self.error,
+            "timings": self.timings,
+            "created": self.created,
+            "updated": self.updated,
+        }
+
+
+class PrepareJobQueue:
+    def __init__(self, prepare_fn: Callable, workers: int = 2, ttl: float = 3600):
+        """prepare_fn(video_id, progress=callback(state, fraction))"""
+        self.prepare_fn = prepare_fn
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prepare")
+        self._jobs: Dict[str, PrepareJob] = {}
+        self._by_video: Dict[str, PrepareJob] = {}
+        self._lock = threading.Lock()
+
+        metrics.register_gauge("prepare_jobs.active", lambda: sum(j.active for j in list(self._jobs.values())))
+
+    def submit(self, video_id: str) -> PrepareJob:
+        with self._lock:
+            self._prune()
+            job = self._by_video.get(video_id)
+            if job is not None and job.state != "failed":
+                return job   # in progress, or ready and still retained
+            job = PrepareJob(video_id)
+            self._jobs[job.id] = job
+            self._by_video[video_id] = job
+
+        metrics.incr("prepare_jobs.submitted")
+        self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[PrepareJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: PrepareJob):
+        started = time.monotonic()
+        try:
+            rec = self.prepare_fn(job.video_id, progress=job.set_state)
+            if isinstance(rec, dict):
+                job.timings = rec.get("timings")
+            job.set_state("ready", 1.0)
+            metrics.incr("prepare_jobs.ready")
+        except Exception as err:
+            job.error = str(err)
+            job.set_state("failed")
+            metrics.incr("prepare_jobs.failed")
+        finally:
+            metrics.observe("prepare_jobs.seconds", time.monotonic() - started)
+            job._done.set()
+
+    def _prune(self):
+        cutoff = time.time() - self.ttl
+        for job_id, job in list(self._jobs.items()):
+            if not job.active and job.updated < cutoff:
+                del self._jobs[job_id]
+                if self._by_video.get(job.video_id) is job:
+                    del self._by_video[job.video_id]
@@ -1,16 +1,30 @@
-from ollama import chat
+from ai_tutor.scheduler import llm_scheduler, PRIORITY_INTERACTIVE
+from ai_tutor.model_manager import model_manager
 
 MODEL_NAME = "llama3:latest"
 
-def ask_llm(prompt):
-    """Send a prompt to the LLM and return the response text."""
-    response = chat(
-        model=MODEL_NAME,
-        messages=[{"role": "user", "content": prompt}]
+def chat_messages(messages, model=MODEL_NAME, priority=PRIORITY_INTERACTIVE):
+    """Send chat messages to the LLM (through the shared scheduler) and return the response text."""
+    response = llm_scheduler.run(
+        lambda: model_manager.chat(model, messages),
+        priority=priority,
     )
     # The ChatResponse object has a 'message' attribute containing content
     return response.message.content
 
+def stream_messages(messages, model=MODEL_NAME, priority=PRIORITY_INTERACTIVE):
+    """Yield response tokens as they arrive; the scheduler slot is held until the stream ends."""
+    with llm_scheduler.slot(priority):
+        for part in model_manager.stream(model, messages):
+            yield part
+
+def ask_llm(prompt, priority=PRIORITY_INTERACTIVE, system=None):
+    """Send a prompt (optionally behind a fixed system prefix) and return the response text."""
+    messages = [{"role": "user", "content": prompt}]
+    if system:
+        messages.insert(0, {"role": "system", "content": system})
+    return chat_messages(messages, priority=priority)
+
 def main():
     print("Type 'exit' to quit the chat.\n")
     while True:
@@ -0,0 +1,154 @@
+# ai_tutor/memory.py
+"""
+Per-session conversation memory with rolling summarisation.
+
+Each session carries:
+- "history": recent turns [{"role": "user" | "assistant", "content": ...}]
+- "summary": a compact summary of everything older
+
+Once the history grows past AI_TUTOR_MEMORY_COMPACT_TOKENS, the older turns are
+folded into the summary by a background LLM job (batch priority, fast model),
+keeping the newest AI_TUTOR_MEMORY_KEEP_TURNS verbatim. render() always returns
+at most AI_TUTOR_MEMORY_MAX_TOKENS, even while a compaction is still pending, so
+the prompt stays the same size however long the tutoring session runs.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from . import metrics
+from .conf import get_setting
+from .prompts import summary_messages
+from .scheduler import PRIORITY_BATCH
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English)."""
+    return len(text or "") // 4 + 1
+
+
+def _clip(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * 4
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "…"
+
+
+def _format_turns(turns: List[Dict[str, str]]) -> str:
+    names = {"user": "Student", "assistant": "Tutor"}
+    return "\n".join(f"{names.get(t['role'], t['role'])}: {t['content']}" for t in turns)
+
+
+class ConversationMemory:
+    def __init__(self, store, compact_tokens=1200, keep_turns=4, max_tokens=600, turn_tokens=150):
+        self.store = store
+        self.compact_tokens = compact_tokens
+        self.keep_turns = keep_turns
+        self.max_tokens = max_tokens
+        self.turn_tokens = turn_tokens
+
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-compact")
+        self._compacting = set()
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------
+    # READ
+    # ----------------------------------------------------
+    def render(self, session: Dict) -> str:
+        """Fixed-size memory block: summary first, then as many recent turns as fit."""
+        summary = _clip(session.get("summary") or "", self.max_tokens // 3)
+        budget = self.max_tokens - estimate_tokens(summary)
+
+        recent = []
+        for turn in reversed(session.get("history") or []):
+            clipped = {"role": turn["role"], "content": _clip(turn["content"], self.turn_tokens)}
+            cost = estimate_tokens(clipped["content"])
+            if cost > budget:
+                break
+            recent.insert(0, clipped)
+            budget -= cost
+
+        parts = []
+        if summary:
+            parts.append(f"Summary: {summary}")
+        if recent:
+            parts.append(_format_turns(recent))
+        return "\n".join(parts)
+
+    # ----------------------------------------------------
+    # WRITE
+    # ----------------------------------------------------
+    def append_turn(self, session_id: str, question: str, answer: str):
+        def append(sess):
+            sess.setdefault("history", []).extend([
+                {"role": "user", "content": question},
+                {"role": "assistant", "content": answer},
+            ])
+
+        sess = self.store.update(session_id, append)
+        if sess is None:
+            return
+        history = sess["history"]
+        if sum(estimate_tokens(t["content"]) for t in history) > self.compact_tokens:
+            self._schedule_compaction(session_id)
+
+    # ----------------------------------------------------
+    # BACKGROUND COMPACTION
+    # ----------------------------------------------------
+    def _schedule_compaction(self, session_id: str):
+        with self._lock:
+            if session_id in self._compacting:
+                return
+            self._compacting.add(session_id)
+        self._pool.submit(self._compact, session_id)
+
+    def _compact(self, session_id: str):
+        started = time.monotonic()
+        try:
+            sess = self.store.get(session_id)
+            if sess is None:
+                return
+            history = sess.get("history") or []
+            n_old = len(history) - 2 * self.keep_turns
+            if n_old <= 0:
+                return
+
+            from .llm_loader import chat_messages
+            from .model_router import FAST_MODEL
+            summary = chat_messages(
+                summary_messages(sess.get("summary") or "", _format_turns(history[:n_old])),
+                model=FAST_MODEL,
+                priority=PRIORITY_BATCH,
+            ).strip()
+
+            folded = history[:n_old]
+            applied = []
+
+            def fold(sess):
+                # Turns appended while the LLM was summarising stay in the history;
+                # skip if another worker already folded these turns
+                current = sess.get("history") or []
+                if current[:n_old] == folded:
+                    sess["summary"] = summary
+                    sess["history"] = current[n_old:]
+                    applied.append(True)
+
+            self.store.update(session_id, fold)
+            if applied:
+                metrics.incr("memory.compactions")
+        except Exception as err:
+            metrics.incr("memory.compaction_failures")
+            print(f"[ai_tutor.memory] Compaction failed for {session_id}: {err}")
+        finally:
+            metrics.observe("memory.compaction_seconds", time.monotonic() - started)
+            with self._lock:
+                self._compacting.discard(session_id)
+
+
+def build_memory(store) -> ConversationMemory:
+    return ConversationMemory(
+        store,
+        compact_tokens=get_setting("AI_TUTOR_MEMORY_COMPACT_TOKENS", 1200),
+        keep_turns=get_setting("AI_TUTOR_MEMORY_KEEP_TURNS", 4),
+        max_tokens=get_setting("AI_TUTOR_MEMORY_MAX_TOKENS", 600),
+    )
@@ -0,0 +1,81 @@
+# ai_tutor/metrics.py
+"""
+In-process metrics for the AI tutor:
+- incr(name) → monotonically increasing counters
+- observe(name, seconds) → latency histograms (count / sum / buckets)
+- register_gauge(name, fn) → values computed at read time
+
+snapshot() is served by GET /ai_tutor/metrics/.
+"""
+
+import bisect
+import threading
+from typing import Callable, Dict, Sequence
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = {}
+_histograms: Dict[str, "Histogram"] = {}
+_gauges: Dict[str, Callable[[], float]] = {}
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot = +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def to_dict(self):
+        cumulative = {}
+        running = 0
+        for bound, n in zip(self.buckets, self.counts):
+            running += n
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = self.count
+        return {"count": self.count, "sum": round(self.total, 6), "buckets": cumulative}
+
+
+def incr(name: str, value: float = 1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, value: float, buckets: Sequence[float] = DEFAULT_BUCKETS):
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram(buckets)
+        hist.observe(value)
+
+
+def register_gauge(name: str, fn: Callable[[], float]):
+    with _lock:
+        _gauges[name] = fn
+
+
+def get_counter(name: str) -> float:
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def snapshot() -> dict:
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: h.to_dict() for k, h in _histograms.items()}
+        gauges = dict(_gauges)
+
+    gauge_values = {}
+    for name, fn in gauges.items():
+        try:
+            gauge_values[name] = fn()
+        except Exception as err:
+            gauge_values[name] = f"error: {err}"
+
+    return {"counters": counters, "gauges": gauge_values, "histograms": histograms}
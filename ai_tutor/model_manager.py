@@ -0,0 +1,114 @@
+# ai_tutor/model_manager.py
+"""
+Ollama model lifecycle:
+- warm_up() loads the configured models at startup (AiTutorConfig.ready)
+- every chat call passes keep_alive so models stay resident between bursts
+- each call is classified cold (model had to be loaded) or warm, from the
+  load_duration Ollama reports, and timed into llm.latency.cold / .warm
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from . import metrics
+from .conf import get_setting
+
+# A load_duration above this means the model was not resident
+COLD_LOAD_THRESHOLD_S = 0.5
+
+
+class ModelManager:
+    def __init__(self, models: Optional[List[str]] = None, keep_alive="30m", host: Optional[str] = None):
+        self.models = list(models or [])
+        self.keep_alive = keep_alive
+        self.host = host              # None → ollama default / OLLAMA_HOST
+        self._client = None
+        self._warm: Dict[str, float] = {}      # model → last warm-up / call time
+        self._latency: Dict[str, float] = {}   # model → EWMA of warm call latency
+        self._lock = threading.Lock()
+
+        metrics.register_gauge("llm.models_warm", lambda: sorted(self._warm))
+
+    def client(self):
+        """Ollama client for the configured host (real server or ai_tutor.fake_ollama)."""
+        if self._client is None:
+            from ollama import Client
+            self._client = Client(host=str(self.host)) if self.host else Client()
+        return self._client
+
+    # ----------------------------------------------------
+    # CHAT
+    # ----------------------------------------------------
+    def chat(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        chat = self.client().chat
+
+        started = time.monotonic()
+        resp = chat(model=model, messages=messages, keep_alive=self.keep_alive, **kwargs)
+        self.record(model, time.monotonic() - started, getattr(resp, "load_duration", None))
+        return resp
+
+    def stream(self, model: str, messages: List[Dict[str, str]]):
+        """Yield content tokens; the final chunk carries load_duration for cold/warm accounting."""
+        chat = self.client().chat
+
+        started = time.monotonic()
+        load_duration = None
+        for chunk in chat(model=model, messages=messages, keep_alive=self.keep_alive, stream=True):
+            if getattr(chunk, "done", False):
+                load_duration = getattr(chunk, "load_duration", None)
+            token = chunk.message.content
+            if token:
+                yield token
+        self.record(model, time.monotonic() - started, load_duration)
+
+    def record(self, model: str, elapsed: float, load_duration_ns=None):
+        if load_duration_ns is not None:
+            cold = load_duration_ns / 1e9 > COLD_LOAD_THRESHOLD_S
+        else:
+            cold = model not in self._warm
+
+        kind = "cold" if cold else "warm"
+        metrics.incr(f"llm.calls.{kind}")
+        metrics.observe(f"llm.latency.{kind}", elapsed)
+        with self._lock:
+            self._warm[model] = time.time()
+            if not cold:
+                prev = self._latency.get(model)
+                self._latency[model] = elapsed if prev is None else 0.8 * prev + 0.2 * elapsed
+
+    def expected_latency(self, model: str, default: float) -> float:
+        """Observed warm latency for model (seconds), or default before the first call."""
+        return self._latency.get(model, default)
+
+    # ----------------------------------------------------
+    # WARM-UP
+    # ----------------------------------------------------
+    def warm_up(self, models: Optional[List[str]] = None):
+        """Load each model into Ollama memory with an empty generation."""
+        generate = self.client().generate
+
+        for model in models or self.models:
+            started = time.monotonic()
+            try:
+                generate(model=model, prompt="", keep_alive=self.keep_alive)
+            except Exception as err:
+                print(f"[ai_tutor.model_manager] Warm-up failed for {model}: {err}")
+                continue
+            elapsed = time.monotonic() - started
+            metrics.observe("llm.warmup_seconds", elapsed)
+            with self._lock:
+                self._warm[model] = time.time()
+            print(f"[ai_tutor.model_manager] {model} warm ({elapsed:.1f}s)")
+
+    def warm_up_async(self):
+        t = threading.Thread(target=self.warm_up, name="ollama-warmup", daemon=True)
+        t.start()
+        return t
+
+
+model_manager = ModelManager(
+    models=get_setting("AI_TUTOR_WARM_MODELS", ["llama3:latest", "llama3.2:1b"]),
+    keep_alive=get_setting("AI_TUTOR_OLLAMA_KEEP_ALIVE", "30m"),
+    host=get_setting("AI_TUTOR_OLLAMA_HOST"),
+)
@@ -0,0 +1,147 @@
+# ai_tutor/model_router.py
+"""
+Latency-aware model routing between the quality model (llama3) and the
+fast model (llama3.2:1b).
+
+Per request it weighs:
+- question complexity (length, "why/how/compare"-style asks, multi-part)
+- retrieved-context size
+- current LLM queue depth (ai_tutor.scheduler)
+- the endpoint's latency SLO vs the observed latency of each model
+
+Every decision is appended as one JSON line to AI_TUTOR_ROUTING_LOG
+so thresholds can be tuned offline. Lines are queued and written by a
+background thread, so routing never touches the disk on the request path.
+"""
+
+import json
+import os
+import queue
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from . import metrics
+from .conf import get_setting
+from .model_manager import model_manager
+from .scheduler import llm_scheduler
+
+QUALITY_MODEL = get_setting("AI_TUTOR_MODEL_QUALITY", "llama3:latest")
+FAST_MODEL = get_setting("AI_TUTOR_MODEL_FAST", "llama3.2:1b")
+
+# Seconds; used until a model has been observed
+_DEFAULT_LATENCY = {QUALITY_MODEL: 15.0, FAST_MODEL: 4.0}
+
+_COMPLEX_CUES = re.compile(
+    r"\b(why|how|explain|compare|difference|differentiate|derive|describe|relationship|examples?)\b"
+)
+
+# Questions that open by asking for reasoning ("Explain…", "Why…", "How does…")
+_EXPLANATORY_ASK = re.compile(r"^\W*(why|how|explain|describe|derive|compare)\b")
+
+COMPLEXITY_THRESHOLD = 0.4
+LARGE_CONTEXT_CHARS = 6000
+
+
+def question_complexity(question: str) -> float:
+    """0.0 (short factual) … 1.0 (long, multi-part, explanatory)."""
+    q = (question or "").lower()
+    words = len(q.split())
+    score = min(words / 40.0, 0.4)
+    score += 0.15 * min(len(_COMPLEX_CUES.findall(q)), 2)
+    if _EXPLANATORY_ASK.match(q):
+        score += 0.15
+    if q.count("?") > 1 or " and " in q:
+        score += 0.2
+    return round(min(score, 1.0), 3)
+
+
+class ModelRouter:
+    def __init__(self, slos: Optional[Dict[str, float]] = None, log_path: Optional[str] = None):
+        self.slos = dict(slos or {})
+        self.log_path = log_path
+        self._pending: "queue.Queue[dict]" = queue.Queue(maxsize=10000)
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+
+    def expected_latency(self, model: str, queue_depth: int) -> float:
+        base = model_manager.expected_latency(model, _DEFAULT_LATENCY.get(model, 10.0))
+        # Each queued request ahead of us costs roughly one generation per slot
+        return base * (1 + queue_depth / llm_scheduler.max_concurrency)
+
+    def choose(self, endpoint: str, question: str, context_chars: int = 0) -> str:
+        complexity = question_complexity(question)
+        depth = llm_scheduler.queue_depth()
+        slo = self.slos.get(endpoint)
+        quality_eta = self.expected_latency(QUALITY_MODEL, depth)
+
+        if slo is not None and quality_eta > slo:
+            model, reason = FAST_MODEL, "slo"
+        elif complexity >= COMPLEXITY_THRESHOLD or context_chars >= LARGE_CONTEXT_CHARS:
+            model, reason = QUALITY_MODEL, "complex"
+        else:
+            model, reason = FAST_MODEL, "simple"
+
+        metrics.incr(f"routing.{endpoint}.{model}")
+        self._log({
+            "ts": round(time.time(), 3),
+            "endpoint": endpoint,
+            "model": model,
+            "reason": reason,
+            "complexity": complexity,
+            "context_chars": context_chars,
+            "queue_depth": depth,
+            "quality_eta": round(quality_eta, 3),
+            "slo": slo,
+        })
+        return model
+
+    def _log(self, decision: dict):
+        if not self.log_path:
+            return
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(
+                        target=self._write_loop, name="model-router-log", daemon=True,
+                    )
+                    self._writer.start()
+        try:
+            self._pending.put_nowait(decision)
+        except queue.Full:
+            metrics.incr("routing.log_dropped")
+
+    def flush(self, timeout: Optional[float] = None):
+        """Block until every queued decision has been written (tests, shutdown)."""
+        if self._writer is None:
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._pending.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            time.sleep(0.01)
+
+    def _write_loop(self):
+        while True:
+            batch = [self._pending.get()]
+            while True:
+                try:
+                    batch.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(d) + "\n" for d in batch))
+            except OSError as err:
+                print(f"[ai_tutor.model_router] Could not log decisions: {err}")
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
+
+
+model_router = ModelRouter(
+    slos=get_setting("AI_TUTOR_LATENCY_SLO", {"chat": 30.0, "video_ask": 20.0, "ncert": 20.0}),
+    log_path=get_setting("AI_TUTOR_ROUTING_LOG"),
+)
@@ -0,0 +1,213 @@
+# ai_tutor/prefetch.py
+"""
+Topic prefetch: warm retrieval as soon as a session's topic is set.
+
+set_session_context → TopicPrefetcher.schedule(session_id) runs in the background:
+- pins the topic's top NCERT chunks as the session's "warm_pool" (index positions)
+- optionally (AI_TUTOR_PREFETCH_VIDEO) searches YouTube for the topic and
+  prepares the best match, recorded as "prefetched_video"
+
+Questions then search the small warm pool first and only fall back to the
+full index when the pool has nothing close enough.
+
+SpeculativePreparer does the same for YouTube search results: captions-only
+preparation of the top hits in the background, so the video a student picks
+is usually warm already.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from . import metrics
+
+
+class TopicPrefetcher:
+    def __init__(
+        self,
+        store,
+        pool_search: Optional[Callable[[str, int], List[Tuple[int, float]]]],
+        pool_size: int = 48,
+        video_search: Optional[Callable[[str], list]] = None,
+        video_prepare: Optional[Callable[[str], None]] = None,
+    ):
+        self.store = store
+        self.pool_search = pool_search
+        self.pool_size = pool_size
+        self.video_search = video_search
+        self.video_prepare = video_prepare
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="topic-prefetch")
+
+    def schedule(self, session_id: str):
+        self._pool.submit(self._run, session_id)
+
+    def _run(self, session_id: str):
+        sess = self.store.get(session_id)
+        if sess is None or not sess.get("topic"):
+            return
+        topic = sess["topic"]
+        query = " ".join([topic, *(sess.get("keywords") or [])])
+
+        started = time.monotonic()
+        warm_pool = None
+        if self.pool_search is not None:
+            try:
+                warm_pool = [pos for pos, _ in self.pool_search(query, self.pool_size)]
+            except Exception as err:
+                print(f"[ai_tutor.prefetch] NCERT pool failed for {topic!r}: {err}")
+        metrics.observe("prefetch.ncert_seconds", time.monotonic() - started)
+
+        video_id = None
+        if self.video_search is not None and self.video_prepare is not None:
+            try:
+                videos = self.video_search(topic)
+                if videos:
+                    video_id = videos[0]["video_id"]
+                    self.video_prepare(video_id)
+            except Exception as err:
+                print(f"[ai_tutor.prefetch] Video prefetch failed for {topic!r}: {err}")
+                video_id = None
+
+        def attach(sess):
+            # Only if the topic hasn't changed meanwhile; other keys are left as they are now
+            if sess.get("topic") != topic:
+                return
+            if warm_pool is not None:
+                sess["warm_pool"] = warm_pool
+            if video_id is not None:
+                sess["prefetched_video"] = video_id
+
+        if self.store.update(session_id, attach) is not None:
+            metrics.incr("prefetch.completed")
+
+
+class PrefetchCancelled(Exception):
+    pass
+
+
+class SpeculativePreparer:
+    """
+    Captions-only preparation of the top search results, before the student picks one.
+
+    schedule(group, videos) queues the top_n videos of a search (group = normalized
+    query); a newer search for the same group replaces its pending items, and
+    picked(video_id) cancels the rest of that video's group, including a running
+    preparation (checked at every progress callback). One worker thread, which
+    waits while busy() reports user-requested preparations in progress, both
+    before starting and between batches of a running preparation (unless the
+    student picked that very video); at most `budget` speculative preparations
+    start per `window` seconds; videos longer than max_duration are skipped.
+    """
+
+    def __init__(
+        self,
+        prepare: Callable,
+        is_warm: Callable[[str], bool],
+        top_n: int = 3,
+        budget: int = 30,
+        window: float = 3600,
+        max_duration: Optional[float] = 1800,
+        busy: Optional[Callable[[], bool]] = None,
+        poll_interval: float = 0.5,
+    ):
+        """prepare(video_id, progress=callback(state, fraction))"""
+        self.prepare = prepare
+        self.is_warm = is_warm
+        self.top_n = top_n
+        self.budget = budget
+        self.window = window
+        self.max_duration = max_duration
+        self.busy = busy or (lambda: False)
+        self.poll_interval = poll_interval
+        self._pending: "deque[Tuple[str, str]]" = deque()
+        self._running: Optional[Tuple[str, str]] = None
+        self._cancel_running = False
+        self._running_picked = False   # the student chose the running video: never pause it
+        self._started: "deque[float]" = deque()
+        self._cond = threading.Condition()
+        threading.Thread(target=self._worker, name="speculative-prepare", daemon=True).start()
+
+    def schedule(self, group: str, videos: List[dict]):
+        picks = []
+        for v in videos[: self.top_n]:
+            duration = v.get("duration")
+            if self.max_duration and duration and duration > self.max_duration:
+                continue
+            if v.get("video_id"):
+                picks.append(v["video_id"])
+        with self._cond:
+            self._pending = deque(item for item in self._pending if item[0] != group)
+            self._pending.extend((group, vid) for vid in picks)
+            # Bound the backlog: the oldest searches are the least likely to be picked
+            while len(self._pending) > self.top_n * 8:
+                self._pending.popleft()
+            self._cond.notify()
+
+    def picked(self, video_id: str):
+        """The student chose video_id: drop the other speculative work from its search."""
+        with self._cond:
+            groups = {g for g, vid in self._pending if vid == video_id}
+            if self._running is not None and self._running[1] == video_id:
+                groups.add(self._running[0])
+                self._running_picked = True
+            if not groups:
+                return
+            before = len(self._pending)
+            self._pending = deque(item for item in self._pending if item[0] not in groups or item[1] == video_id)
+            cancelled = before - len(self._pending)
+            if self._running is not None and self._running[0] in groups and self._running[1] != video_id:
+                self._cancel_running = True
+                cancelled += 1
+        if cancelled:
+            metrics.incr("speculative.cancelled", cancelled)
+
+    def _check_cancelled(self, state, fraction=None):
+        """Progress callback of a running preparation: pause while busy, stop if cancelled."""
+        while self.busy() and not self._cancel_running and not self._running_picked:
+            time.sleep(self.poll_interval)
+        if self._cancel_running:
+            raise PrefetchCancelled()
+
+    def _within_budget(self) -> bool:
+        now = time.monotonic()
+        while self._started and self._started[0] < now - self.window:
+            self._started.popleft()
+        return len(self._started) < self.budget
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                self._running, self._cancel_running = self._pending.popleft(), False
+                self._running_picked = False
+            video_id = self._running[1]
+
+            try:
+                while self.busy() and not self._cancel_running:   # user-requested preparations first
+                    time.sleep(self.poll_interval)
+                if self._cancel_running or self.is_warm(video_id):
+                    continue
+                with self._cond:
+                    if not self._within_budget():
+                        metrics.incr("speculative.over_budget")
+                        continue
+                    self._started.append(time.monotonic())
+                self._prepare_one(video_id)
+            finally:
+                with self._cond:
+                    self._running = None
+
+    def _prepare_one(self, video_id: str):
+        started = time.monotonic()
+        try:
+            self.prepare(video_id, progress=self._check_cancelled)
+            metrics.incr("speculative.prepared")
+            metrics.observe("speculative.seconds", time.monotonic() - started)
+        except PrefetchCancelled:
+            pass
+        except Exception as err:
+            metrics.incr("speculative.failed")
+            print(f"[ai_tutor.prefetch] Speculative prepare skipped {video_id}: {err}")
@@ -0,0 +1,58 @@
+# ai_tutor/projection.py
+"""
+Response shaping for the chat endpoint.
+
+By default ChatView returns a compact payload: the answer, retrieval status,
+and refs (source ids + scores), without the raw NCERT chunks, YouTube results
+or session dict. Clients ask for more with:
+- include=session,ncert,youtube   (or include=all for the full result)
+- fields=answer,refs              (exact top-level fields; overrides the default set)
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+COMPACT_FIELDS = ("ok", "session_id", "question", "answer", "model", "sources", "refs")
+EXPANDABLE = ("session", "ncert", "youtube")
+
+
+def parse_list(value: Union[None, str, Iterable[str]]) -> Optional[List[str]]:
+    """'a, b' / ['a', 'b'] → ['a', 'b']; None or empty → None."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        items = value.split(",")
+    else:
+        items = list(value)
+    items = [str(i).strip() for i in items if str(i).strip()]
+    return items or None
+
+
+def refs(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Source ids and scores only."""
+    out = []
+    for hit in (result.get("ncert") or {}).get("hits", []):
+        out.append({"source": "ncert", "id": hit["id"], "score": hit["score"]})
+    for rank, video in enumerate((result.get("youtube") or {}).get("results", []), start=1):
+        out.append({"source": "youtube", "id": video.get("video_id"), "rank": rank})
+    return out
+
+
+def shape_chat_response(result: Dict[str, Any], fields=None, include=None) -> Dict[str, Any]:
+    fields = parse_list(fields)
+    include = parse_list(include) or []
+
+    if "all" in include or fields == ["all"]:
+        full = dict(result)
+        full["refs"] = refs(result)
+        return full
+
+    wanted = list(fields or COMPACT_FIELDS)
+    wanted += [name for name in include if name in EXPANDABLE and name not in wanted]
+
+    shaped = {}
+    for name in wanted:
+        if name == "refs":
+            shaped["refs"] = refs(result)
+        elif name in result:
+            shaped[name] = result[name]
+    return shaped
@@ -0,0 +1,136 @@
+# ai_tutor/prompts.py
+"""
+Prompt layouts for every LLM call.
+
+The fixed instructions go FIRST, as the system message, and are byte-for-byte
+identical across requests; per-request context and the question follow in the
+user message. Ollama can then reuse the already-evaluated system prefix
+instead of re-processing it for every student.
+"""
+
+from typing import Dict, List
+
+# ================================================================
+#  HYBRID TUTOR (controller.handle_student_query)
+# ================================================================
+
+TUTOR_SYSTEM_PROMPT = """You are an intelligent NCERT science tutor.
+
+Use the HYBRID CONTEXT as reference, but you are allowed to use your own
+scientific knowledge to explain concepts clearly, deeply, and with helpful examples.
+
+INSTRUCTIONS:
+- Use NCERT FIRST.
+- Use YouTube content as supportive info.
+- Use your own knowledge to expand, clarify, and give real-life examples.
+- Give a detailed explanation suitable for Class 6–10 students.
+- Structure the answer: introduction → explanation → examples → summary.
+- Do NOT stay limited only to the context.
+- Do NOT hallucinate wrong facts.
+
+General Science Knowledge:
+- Acids release H+ ions.
+- Bases release OH- ions.
+- Neutralisation forms salt and water.
+Use background ONLY to enrich explanations."""
+
+
+def tutor_messages(context_text: str, question: str, memory: str = "") -> List[Dict[str, str]]:
+    conversation = f"CONVERSATION SO FAR:\n{memory}\n\n" if memory else ""
+    user = (
+        "------------------------\n"
+        "HYBRID CONTEXT:\n"
+        f"{context_text}\n"
+        "------------------------\n\n"
+        f"{conversation}"
+        f"Question: {question}\n\n"
+        "Write a clear, structured, detailed explanation:"
+    )
+    return [
+        {"role": "system", "content": TUTOR_SYSTEM_PROMPT},
+        {"role": "user", "content": user},
+    ]
+
+
+# ================================================================
+#  YOUTUBE VIDEO Q&A (YouTubeRAG.ask_video)
+# ================================================================
+
+VIDEO_SYSTEM_PROMPT = """You are a friendly science tutor for class 6–10 students.
+Use the video transcript context to answer clearly and simply.
+
+If the answer is not in the transcript, say so briefly."""
+
+
+def video_messages(context_text: str, question: str) -> List[Dict[str, str]]:
+    user = f"Context:\n{context_text}\n\nStudent question: {question}\n\nAnswer:"
+    return [
+        {"role": "system", "content": VIDEO_SYSTEM_PROMPT},
+        {"role": "user", "content": user},
+    ]
+
+
+# ================================================================
+#  NCERT RAG (RAGService.ask)
+# ================================================================
+
+NCERT_SYSTEM_PROMPT = "Use the context to answer."
+
+
+def ncert_messages(context_text: str, question: str) -> List[Dict[str, str]]:
+    user = f"Context:\n{context_text}\n\nQuestion: {question}\nAnswer:"
+    return [
+        {"role": "system", "content": NCERT_SYSTEM_PROMPT},
+        {"role": "user", "content": user},
+    ]
+
+
+# ================================================================
+#  DUAL ANSWER (RAGService.stream_dual: Streamlit / CLI)
+# ================================================================
+
+CONTEXT_ANSWER_SYSTEM_PROMPT = (
+    "Answer the following question using the given NCERT context. "
+    "Provide a clear, concise, and student-friendly explanation."
+)
+
+INDEPENDENT_ANSWER_SYSTEM_PROMPT = (
+    "Answer the following question independently, without using any external context. "
+    "Explain clearly in a way a school student can understand, with examples if needed."
+)
+
+
+def context_answer_messages(context_text: str, question: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": CONTEXT_ANSWER_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Context:\n{context_text}\n\nQuestion: {question}\nAnswer:"},
+    ]
+
+
+def independent_answer_messages(question: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": INDEPENDENT_ANSWER_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Question: {question}\nAnswer:"},
+    ]
+
+
+# ================================================================
+#  CONVERSATION MEMORY COMPACTION (ai_tutor.memory)
+# ================================================================
+
+SUMMARY_SYSTEM_PROMPT = """You maintain the running memory of a tutoring conversation.
+Merge the previous summary and the new turns into ONE short summary (max 120 words).
+Keep: the topics covered, what the student asked, misconceptions, and what was already explained.
+Drop greetings and repeated explanations. Write plain sentences, no headings."""
+
+
+def summary_messages(previous_summary: str, turns_text: str) -> List[Dict[str, str]]:
+    user = (
+        f"Previous summary:\n{previous_summary or '(none)'}\n\n"
+        f"New turns:\n{turns_text}\n\n"
+        "Updated summary:"
+    )
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": user},
+    ]
@@ -1,10 +1,18 @@
 # rag_service.py
 import pickle
+import queue
+import threading
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from ollama import chat
 from ai_tutor import tutor_retrieval
+from ai_tutor.scheduler import PRIORITY_INTERACTIVE
+from ai_tutor.llm_loader import chat_messages, stream_messages
+from ai_tutor.embeddings import get_embedder
+from ai_tutor.model_router import model_router
+from ai_tutor.prompts import ncert_messages, context_answer_messages, independent_answer_messages
+
+DUAL_FAILED_NOTE = "\n\n_This answer could not be generated right now._"
+
 
 class RAGService:
     def __init__(self, index_path="ncert_faiss.index", metadata_path="faiss_metadata.pkl"):
@@ -23,32 +31,120 @@ class RAGService:
         self.chunk_ids = list(self.metadata.keys())
 
         print("🤖 Loading embedding model...")
-        self.embedder = SentenceTransformer("all-MiniLM-L6-v2")
+        self.embedder = get_embedder("all-MiniLM-L6-v2")   # shared with YouTubeRAG / domain guard
+
+        # Warm candidate pools (topic prefetch): positions → stacked vectors
+        self._pool_cache = {}
+        self._pool_lock = threading.Lock()
 
         print("✅ RAG system initialized successfully!\n")
 
-    def search(self, query, k=5):
-        """Search FAISS index and return top-k text chunks as strings."""
-        query_vec = self.embedder.encode([query], convert_to_numpy=True).astype('float32')
-        distances, indices = self.index.search(query_vec, k)
+    def _embed_query(self, query):
+        return self.embedder.encode([query], convert_to_numpy=True).astype('float32')
+
+    def search_scored(self, query, k=5):
+        """Top-k over the whole index as [(position, L2 distance)], best first."""
+        distances, indices = self.index.search(self._embed_query(query), k)
+        return [(int(i), float(d)) for i, d in zip(indices[0], distances[0]) if i >= 0]
 
-        chunks = []
-        for idx in indices[0]:
-            chunk_id = self.chunk_ids[int(idx)]
-            chunk_text = self.metadata[chunk_id]
-            chunks.append(chunk_text)
+    def _pool_vectors(self, positions):
+        key = tuple(positions)
+        vectors = self._pool_cache.get(key)
+        if vectors is None:
+            vectors = np.vstack([self.index.reconstruct(int(p)) for p in positions]).astype('float32')
+            with self._pool_lock:
+                self._pool_cache[key] = vectors
+                if len(self._pool_cache) > 256:
+                    self._pool_cache.pop(next(iter(self._pool_cache)))
+        return vectors
 
-        return chunks
+    def search_in_pool(self, query, positions, k=5):
+        """Top-k restricted to a small candidate pool of index positions (exact L2, NumPy)."""
+        if not positions:
+            return []
+        vectors = self._pool_vectors(positions)
+        distances = ((vectors - self._embed_query(query)) ** 2).sum(axis=1)
+        order = np.argsort(distances)[:k]
+        return [(int(positions[i]), float(distances[i])) for i in order]
 
-    def ask(self, question, top_k=5):
+    def text_at(self, position):
+        return self.metadata[self.chunk_ids[int(position)]]
+
+    def search(self, query, k=5):
+        """Search FAISS index and return top-k text chunks as strings."""
+        return [self.text_at(pos) for pos, _ in self.search_scored(query, k)]
+
+    def ask(self, question, top_k=5, priority=PRIORITY_INTERACTIVE):
         """Retrieve context and query LLM (Ollama)."""
         context_chunks = self.search(question, k=top_k)
         full_context = "\n\n".join(context_chunks)
 
-        prompt = f"Use the context to answer.\n\nContext:\n{full_context}\n\nQuestion: {question}\nAnswer:"
-
-        response = chat(
-            model="llama3:latest",
-            messages=[{"role": "user", "content": prompt}]
+        return chat_messages(
+            ncert_messages(full_context, question),
+            model=model_router.choose("ncert", question, context_chars=len(full_context)),
+            priority=priority,
         )
-        return response.message.content
+
+    def stream_dual(self, question, context_chunks=None, top_k=5, model="llama3:latest"):
+        """
+        Generate the context-grounded and the independent answer concurrently.
+        Yields ("context" | "independent", token) in arrival order.
+
+        If one branch fails, the other keeps streaming and the failed panel gets
+        DUAL_FAILED_NOTE; only if both fail is the first error raised. Closing the
+        generator early stops both branches (and frees their scheduler slots).
+        """
+        if context_chunks is None:
+            context_chunks = self.search(question, k=top_k)
+
+        jobs = {
+            "context": context_answer_messages("\n".join(context_chunks), question),
+            "independent": independent_answer_messages(question),
+        }
+
+        events = queue.Queue()
+        stop = threading.Event()
+        _DONE = object()
+
+        def worker(panel, messages):
+            stream = stream_messages(messages, model=model)
+            try:
+                for token in stream:
+                    if stop.is_set():
+                        break
+                    events.put((panel, token))
+            except Exception as err:
+                events.put((panel, err))
+            finally:
+                stream.close()   # leaves the scheduler slot even when stopped mid-stream
+                events.put((panel, _DONE))
+
+        for panel, messages in jobs.items():
+            threading.Thread(target=worker, args=(panel, messages), daemon=True).start()
+
+        errors = {}
+        remaining = len(jobs)
+        try:
+            while remaining:
+                panel, item = events.get()
+                if item is _DONE:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    errors[panel] = item
+                    print(f"[RAGService] {panel} answer failed: {item}")
+                else:
+                    yield panel, item
+        finally:
+            stop.set()
+
+        if len(errors) == len(jobs):
+            raise next(iter(errors.values()))
+        for panel in errors:
+            yield panel, DUAL_FAILED_NOTE
+
+    def ask_dual(self, question, context_chunks=None, top_k=5, model="llama3:latest"):
+        """Both answers, generated concurrently: {"context": ..., "independent": ...}."""
+        answers = {"context": "", "independent": ""}
+        for panel, token in self.stream_dual(question, context_chunks, top_k, model):
+            answers[panel] += token
+        return answers
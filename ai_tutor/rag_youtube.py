@@ -3,24 +3,65 @@
 Backend YouTube RAG:
 - search_youtube(query) → list of videos
 - prepare_video(video_id) → build & cache transcripts, chunks, embeddings
+  (in memory, and on disk via ai_tutor.video_store so restarts/new workers reuse them).
+  Pipelined: segments stream into the chunker and finished chunks are embedded in
+  small batches and appended to the video's index, so ask_video can answer from
+  the part already covered while the rest is still transcribing.
 - ask_video(question, video_id, timestamp=None) → returns LLM answer
+- search_prepared(query) → ranked (video, timestamp) hits across the prepared
+  videos held in memory (ai_tutor.global_index), without a YouTube search
 
 Transcripts NEVER exposed to UI.
 """
 
 import os
+import re
+import threading
+import time
+from contextlib import nullcontext
 from typing import List, Dict, Any, Optional
 
+from . import metrics
+from .coalesce import SingleFlight, normalize_text
+from .scheduler import SchedulerBusy, PRIORITY_INTERACTIVE
+from .prompts import video_messages
+from .youtube_provider import get_youtube_provider
+from .video_store import VideoStore
+from .video_cache import PreparedVideoCache, record_bytes
+from .search_cache import get_search_cache
+from .prefetch import SpeculativePreparer
+from .time_index import TimeIndex
+from .global_index import get_global_index
+from .vector_arena import get_vector_arena, l2_distances, top_k as closest
+from .conf import get_setting
+
 # --- FFmpeg Path Fix (Windows) ---
 DEFAULT_FFMPEG = r"C:\Users\kruth\Downloads\ffmpeg-8.0.1-essentials_build\ffmpeg-8.0.1-essentials_build\bin"
 os.environ["PATH"] += os.pathsep + os.getenv("FFMPEG_PATH", DEFAULT_FFMPEG)
 
+# Shared by every YouTubeRAG instance in the process (views, core.views, controller)
+_ask_flight = SingleFlight("video_ask")
+_prepare_flight = SingleFlight("video_prepare")
+_search_flight = SingleFlight("youtube_search")
+
+TIME_MODES = ("auto", "bias", "boost", "restrict")
+# Questions about "right here" in the video ("what did she just say?", "explain
+# this part") → "auto" searches only around the playback position. Phrases, not
+# single words: "Is this just for plants?" must not lose the rest of the video.
+_DEICTIC = re.compile(
+    r"\b(?:(?:just|previously) (?:said|say|says|mentioned|explained|showed|shown|did|wrote|drew)"
+    r"|(?:said|mentioned|explained|showed|shown) (?:earlier|before|previously|here)"
+    r"|right now|this (?:part|bit|step|section)|a (?:moment|minute|second|few seconds) ago)\b",
+    re.IGNORECASE,
+)
+
+
 class YouTubeRAG:
     def __init__(
         self,
         embed_model_name="all-MiniLM-L6-v2",
         whisper_size="base",
-        llm_model="llama3.2:1b",  # ⭐ small model that WILL run on your RAM
+        llm_model=None,  # None → routed per question (ai_tutor.model_router); e.g. "llama3.2:1b" pins it
         ffmpeg_location=None,
     ):
         self.embed_model_name = embed_model_name
@@ -28,10 +69,46 @@ class YouTubeRAG:
         self.llm_model = llm_model
         self.ffmpeg_location = ffmpeg_location
 
-        self._videos: Dict[str, Dict[str, Any]] = {}
+        # In-memory LRU (byte-bounded); evicted videos stay available on disk
+        self._videos = PreparedVideoCache(
+            get_setting("AI_TUTOR_VIDEO_CACHE_MAX_BYTES", 256 * 1024 * 1024),
+            on_evict=self._spill_to_disk,
+        )
+        self.provider = get_youtube_provider(ffmpeg_location)
+        self.search_cache = get_search_cache()
+        # Chunk vectors of every video live in one shared arena (no per-video FAISS index)
+        self.arena = get_vector_arena(embed_model_name)
+        self.global_index = get_global_index(embed_model_name)
+        self.store = VideoStore(
+            get_setting("AI_TUTOR_VIDEO_CACHE_DIR", "video_cache"),
+            legacy_dir=get_setting("AI_TUTOR_LEGACY_VIDEO_INDEX_DIR", "video_indices"),
+        )
+
+        # Videos being prepared right now, searchable as chunks are embedded
+        self._building: Dict[str, Dict[str, Any]] = {}
+        self._embed_batch = get_setting("AI_TUTOR_PREPARE_EMBED_BATCH", 8)
+        self.time_mode = get_setting("AI_TUTOR_VIDEO_TIME_MODE", "bias")
+        self.time_window = get_setting("AI_TUTOR_VIDEO_TIME_WINDOW", (90.0, 15.0))   # (before, after) seconds
+        self.time_boost = get_setting("AI_TUTOR_VIDEO_TIME_BOOST", 0.75)
+        self._user_builds = 0
+        self._user_builds_lock = threading.Lock()
+        self.warm_max = get_setting("AI_TUTOR_GLOBAL_INDEX_WARM_MAX", 200)
+        self._warmed = False
+        self._warm_lock = threading.Lock()
+
+        # Optional: captions-only preparation of top search results before a pick
+        self.speculative = None
+        if get_setting("AI_TUTOR_SPECULATIVE_PREPARE", False):
+            self.speculative = SpeculativePreparer(
+                lambda vid, progress=None: self.prepare_video(vid, progress, speculative=True),
+                is_warm=lambda vid: self.is_prepared(vid) or self.store.exists(vid),
+                top_n=get_setting("AI_TUTOR_SPECULATIVE_TOP_N", 3),
+                budget=get_setting("AI_TUTOR_SPECULATIVE_BUDGET", 30),
+                max_duration=get_setting("AI_TUTOR_SPECULATIVE_MAX_DURATION", 1800),
+                busy=lambda: self._user_builds > 0,
+            )
 
         self._embedder = None
-        self._whisper = None
 
         print("YouTubeRAG backend initialized.")
 
@@ -40,21 +117,21 @@ class YouTubeRAG:
     # ----------------------------------------------------
     def _get_embedder(self):
         if self._embedder is None:
-            from sentence_transformers import SentenceTransformer
-            self._embedder = SentenceTransformer(self.embed_model_name)
+            from .embeddings import get_embedder
+            self._embedder = get_embedder(self.embed_model_name)
         return self._embedder
 
-    def _get_whisper(self):
-        if self._whisper is None:
-            import whisper
-            self._whisper = whisper.load_model(self.whisper_size)
-        return self._whisper
-
-    def _llm_call(self, prompt: str) -> str:
-        from ollama import chat
+    def _llm_call(self, messages, priority=PRIORITY_INTERACTIVE, question="") -> str:
+        from .llm_loader import chat_messages
+        model = self.llm_model
+        if model is None:
+            from .model_router import model_router
+            context_chars = sum(len(m["content"]) for m in messages if m["role"] == "user")
+            model = model_router.choose("video_ask", question, context_chars=context_chars)
         try:
-            resp = chat(model=self.llm_model, messages=[{"role": "user", "content": prompt}])
-            return resp.message.content
+            return chat_messages(messages, model=model, priority=priority)
+        except SchedulerBusy:
+            raise
         except Exception as e:
             raise RuntimeError(f"LLM call failed: {e}")
 
@@ -62,95 +139,67 @@ class YouTubeRAG:
     # 1) SEARCH YOUTUBE
     # ----------------------------------------------------
     def search_youtube(self, query: str, max_results: int = 5):
-        from yt_dlp import YoutubeDL
-
-        search_query = f"ytsearch{max_results}:{query}"
-        ydl_opts = {"quiet": True, "extract_flat": "in_playlist"}
+        results = self.search_cache.get(query, max_results)
+        if results is None:
+            def live():
+                found = self.provider.search(query, max_results)
+                self.search_cache.put(query, max_results, found)
+                return found
 
-        if self.ffmpeg_location:
-            ydl_opts["ffmpeg_location"] = self.ffmpeg_location
+            results = [dict(v) for v in _search_flight.do(self.search_cache.key(query, max_results), live)]
 
-        with YoutubeDL(ydl_opts) as ydl:
-            data = ydl.extract_info(search_query, download=False)
-
-        return [
-            {
-                "title": e.get("title"),
-                "video_id": e.get("id"),
-                "channel": e.get("channel"),
-                "link": f"https://www.youtube.com/watch?v={e.get('id')}",
-                "duration": e.get("duration"),
-            }
-            for e in data.get("entries", [])
-        ]
+        if self.speculative is not None:
+            self.speculative.schedule(normalize_text(query), results)
+        return results
 
     # ----------------------------------------------------
     # 2) FETCH SEGMENTS — CAPTIONS FIRST, WHISPER FALLBACK
     # ----------------------------------------------------
-    def _fetch_segments(self, video_id: str):
-        """returns [{'start':..., 'end':..., 'text':...}]"""
+    def _fetch_segments(self, video_id: str, progress=None, timings=None, captions_only=False):
+        """{'start':..., 'end':..., 'text':...} in order: a list for captions, a stream for Whisper"""
+        timings = {} if timings is None else timings
 
         # Try official YouTube transcripts
-        try:
-            from youtube_transcript_api import YouTubeTranscriptApi
-            t = YouTubeTranscriptApi.list_transcripts(video_id)
-
-            try:
-                tr = t.find_transcript(["en", "en-US", "en-GB"])
-            except:
-                tr = next(iter(t._transcripts.values()))
-
-            fetched = tr.fetch()
-            return [
-                {
-                    "start": float(s["start"]),
-                    "end": float(s["start"] + s["duration"]),
-                    "text": s["text"].strip(),
-                }
-                for s in fetched if s.get("text")
-            ]
-        except:
-            pass  # fallback → whisper
-
-        # Whisper fallback
-        from yt_dlp import YoutubeDL
-        whisper_model = self._get_whisper()
-
-        audio_dir = os.path.join(os.getcwd(), "audio_temp")
-        os.makedirs(audio_dir, exist_ok=True)
-
-        outtmpl = os.path.join(audio_dir, "%(id)s.%(ext)s")
-        ydl_opts = {
-            "format": "bestaudio/best",
-            "outtmpl": outtmpl,
-            "quiet": True,
-            "postprocessors": [
-                {"key": "FFmpegExtractAudio", "preferredcodec": "mp3"}
-            ],
-        }
-
-        with YoutubeDL(ydl_opts) as ydl:
-            ydl.download([f"https://www.youtube.com/watch?v={video_id}"])
-
-        audio_path = os.path.join(audio_dir, f"{video_id}.mp3")
-        result = whisper_model.transcribe(audio_path)
-
-        return [
-            {
-                "start": float(s["start"]),
-                "end": float(s["end"]),
-                "text": s["text"].strip(),
-            }
-            for s in result.get("segments", [])
-        ]
+        started = time.monotonic()
+        segments = self.provider.fetch_captions(video_id)
+        timings["captions"] = round(time.monotonic() - started, 3)
+        if segments:
+            return list(segments)   # a list: _build_record can size its progress from it
+        if captions_only or not self.provider.supports_audio:
+            return []
+
+        # Speech-to-text fallback: smallest audio stream → ffmpeg → 16 kHz PCM,
+        # windows transcribed in parallel worker processes as the audio arrives
+        if progress:
+            progress("transcribing", 0.2)
+        from .audio import stream_pcm
+        from .transcription import get_transcriber
+
+        def timed(blocks):
+            # "download": until the first PCM block (stream URL resolved and ffmpeg
+            # decoding, or the whole file when direct streaming fell back)
+            started = time.monotonic()
+            for block in blocks:
+                if "download" not in timings:
+                    timings["download"] = round(time.monotonic() - started, 3)
+                yield block
+
+        return get_transcriber(self.whisper_size).iter_transcribe_stream(
+            timed(stream_pcm(video_id, ffmpeg_location=self.ffmpeg_location))
+        )
 
     # ----------------------------------------------------
     # 3) CHUNK
     # ----------------------------------------------------
     def _chunk_segments(self, segments, max_words=300):
-        chunks = []
+        """[(text, start, end)] — up to max_words per chunk, on segment boundaries."""
+        return list(self._iter_chunks(segments, max_words))
+
+    def _iter_chunks(self, segments, max_words=300):
+        """Same chunks as _chunk_segments, yielded as soon as each one is complete."""
         buf = []
         current_start = None
+        current_end = None
 
         for s in segments:
             words = s["text"].split()
@@ -158,67 +207,362 @@ class YouTubeRAG:
                 current_start = s["start"]
 
             if len(buf) + len(words) > max_words:
-                chunks.append((" ".join(buf), current_start))
+                yield (" ".join(buf), current_start, current_end)
                 buf = []
                 current_start = s["start"]
 
             buf.extend(words)
+            current_end = s.get("end", s["start"])
 
         if buf:
-            chunks.append((" ".join(buf), current_start))
-
-        return chunks
+            yield (" ".join(buf), current_start, current_end)
 
     # ----------------------------------------------------
-    # 4) PREPARE VIDEO (CACHE)
+    # 4) PREPARE VIDEO (CACHE: memory → disk → build)
     # ----------------------------------------------------
-    def prepare_video(self, video_id: str):
-        if video_id in self._videos:
-            return
-
-        segments = self._fetch_segments(video_id)
+    def prepare_video(self, video_id: str, progress=None, speculative=False):
+        """
+        Returns the in-memory record (chunks, starts, ends, time_index, timings);
+        the vectors are in self.arena.
+        progress(state, fraction) is called as stages start (see ai_tutor.jobs).
+        speculative=True is the background prefetch: captions only, no Whisper,
+        and the result only goes to the on-disk store (returns None).
+        """
+        if not speculative and self.speculative is not None:
+            self.speculative.picked(video_id)
+
+        if speculative:
+            # Own flight key so a real request never inherits a captions-only
+            # failure; the store lock still serialises the two
+            _prepare_flight.do(
+                (self.embed_model_name, video_id, True),
+                lambda: self._prepare_speculative(video_id, progress),
+            )
+            return None
+
+        cached = self._videos.get(video_id)
+        if cached is not None:
+            return cached
+
+        # One preparation per video: threads share the leader's result in-process,
+        # and the store's file lock makes other workers wait, then load from disk.
+        indexed = _prepare_flight.do(
+            (self.embed_model_name, video_id, False),
+            lambda: self._prepare_locked(video_id, progress),
+        )
+        if not self.is_prepared(video_id):
+            self._videos.put(video_id, indexed)
+        return indexed
+
+    def _prepare_locked(self, video_id: str, progress=None):
+        with self.store.lock(video_id):
+            cached = self._videos.get(video_id)
+            if cached is not None:
+                return cached   # prepared by another run meanwhile
+            rec = self.store.load(video_id, self.embed_model_name)
+            if rec is not None:
+                indexed = self._index_record(video_id, rec)
+            else:
+                # Counted only while building (not while waiting for the lock, which
+                # may be held by the speculative build it would otherwise pause)
+                with self._user_builds_lock:
+                    self._user_builds += 1   # holds back speculative work (see SpeculativePreparer.busy)
+                try:
+                    built = self._build_record(video_id, progress)
+                finally:
+                    self._building.pop(video_id, None)
+                    with self._user_builds_lock:
+                        self._user_builds -= 1
+                try:
+                    self.store.save(video_id, built, self.embed_model_name)
+                except OSError as err:
+                    print(f"[YouTubeRAG] Could not persist {video_id}: {err}")
+                # Raw segments live on disk only; vectors move into the arena
+                indexed = self._index_record(video_id, built)
+            self.global_index.add(video_id, indexed)
+
+        self._videos.put(video_id, indexed)
+        return indexed
+
+    def _prepare_speculative(self, video_id: str, progress=None):
+        """
+        Captions-only build written to the store only: it never enters the LRU, the
+        arena or the global index, so unpicked videos cannot evict the ones students
+        are asking about. A later prepare_video loads it from disk.
+        """
+        with self.store.lock(video_id):
+            if video_id in self._videos or self.store.exists(video_id):
+                return
+            try:
+                built = self._build_record(video_id, progress, captions_only=True)
+            finally:
+                self._building.pop(video_id, None)
+            self.store.save(video_id, built, self.embed_model_name)
+
+    def _spill_to_disk(self, video_id: str, rec):
+        """
+        LRU eviction hook: make sure the video can be reloaded without re-transcribing,
+        then free its arena rows and global-index entry. The next prepare_video loads
+        it back from disk through _index_record.
+        """
+        if not self.store.exists(video_id):
+            vectors = self.arena.view(video_id)
+            if vectors is not None:
+                self.store.save(video_id, {**rec, "vectors": vectors, "segments": []}, self.embed_model_name)
+        if self.is_prepared(video_id):
+            return   # loaded again while we were saving
+        # A prepare_video racing past the check above has put new rows / a new
+        # global-index entry under a new slot: only this record's are freed.
+        slot = rec.get("arena_slot")
+        self.global_index.remove(video_id, expected=slot)
+        self.arena.remove(video_id, expected=slot)
+
+    def is_prepared(self, video_id: str) -> bool:
+        """Already in memory (no transcript / embedding work needed)."""
+        return video_id in self._videos
+
+    def is_queryable(self, video_id: str) -> bool:
+        """Prepared, or still preparing with at least one chunk embedded."""
+        if self.is_prepared(video_id):
+            return True
+        partial = self._building.get(video_id)
+        return partial is not None and len(partial["chunks"]) > 0
+
+    def cache_stats(self):
+        return self._videos.stats()
+
+    def _build_record(self, video_id: str, progress=None, captions_only=False, max_words=300):
+        """
+        Stream segments → chunks → embedding batches into a partial record that
+        _retrieve can search (under its lock) while the build is still running.
+        The job is "embedding" from the first flushed batch on, and its progress
+        advances with every batch.
+        """
+        import numpy as np
+
+        started = time.monotonic()
+        timings: Dict[str, float] = {}
+        report = progress or (lambda state, fraction=None: None)
+        report("fetching", 0.05)
+
+        partial = {
+            "chunks": [], "starts": [], "ends": [],
+            "vectors": None, "lock": threading.Lock(),
+        }
+        self._building[video_id] = partial
+        embedder = self._get_embedder()
+        segments, batch = [], []
+        embed_s = 0.0
+        source = self._fetch_segments(video_id, report, timings, captions_only)
+        # Captions arrive whole, so the chunk count is known up front (within a
+        # chunk: chunks end on segment boundaries); a Whisper stream's is not
+        expected = None
+        if isinstance(source, list):
+            expected = max(1, -(-sum(len(seg["text"].split()) for seg in source) // max_words))
+        flushed = 0
+        buf = {"rows": None}
+
+        def flush():
+            nonlocal embed_s, flushed
+            t0 = time.monotonic()
+            vecs = embedder.encode([c[0] for c in batch], convert_to_numpy=True).astype("float32")
+            embed_s += time.monotonic() - t0
+            with partial["lock"]:
+                # Append into a doubling buffer; rows are only written past the
+                # prefix readers hold, so their snapshot stays consistent
+                n = len(partial["chunks"])
+                capacity = 0 if buf["rows"] is None else len(buf["rows"])
+                if n + len(vecs) > capacity:
+                    grown = np.empty((max(2 * capacity, n + len(vecs), 64), vecs.shape[1]), "float32")
+                    if n:
+                        grown[:n] = partial["vectors"]
+                    buf["rows"] = grown
+                buf["rows"][n:n + len(vecs)] = vecs
+                partial["vectors"] = buf["rows"][:n + len(vecs)]
+                partial["chunks"].extend(c[0] for c in batch)
+                partial["starts"].extend(c[1] for c in batch)
+                partial["ends"].extend(c[2] for c in batch)
+            if "first_chunk" not in timings:
+                timings["first_chunk"] = round(time.monotonic() - started, 3)
+            batch.clear()
+            # Also the heartbeat that lets a speculative run be cancelled between batches
+            flushed += 1
+            done = len(partial["chunks"]) / expected if expected else 1 - 0.8 ** flushed
+            report("embedding", 0.1 + 0.85 * min(done, 1.0))
+
+        def recorded(source):
+            for seg in source:
+                segments.append(seg)
+                yield seg
+
+        for chunk in self._iter_chunks(recorded(source), max_words):
+            batch.append(chunk)
+            if len(batch) >= self._embed_batch:
+                flush()
         if not segments:
-            raise RuntimeError("No transcript available")
-
-        chunks = self._chunk_segments(segments)
-        texts = [c[0] for c in chunks]
-        starts = [c[1] for c in chunks]
+            raise RuntimeError("No captions available" if captions_only else "No transcript available")
+        if batch:
+            flush()
+
+        timings["embed"] = round(embed_s, 3)
+        timings["total"] = round(time.monotonic() - started, 3)
+        # Time spent waiting on captions / audio / transcription, i.e. not embedding
+        timings["transcript"] = round(timings["total"] - embed_s, 3)
+        for stage, seconds in timings.items():
+            metrics.observe(f"video_prepare.{stage}", seconds)
+
+        return {
+            "segments": segments,
+            "chunks": partial["chunks"],
+            "starts": partial["starts"],
+            "ends": partial["ends"],
+            "vectors": partial["vectors"],
+            "timings": timings,
+        }
 
-        embedder = self._get_embedder()
-        vectors = embedder.encode(texts, convert_to_numpy=True).astype("float32")
-
-        import faiss
-        dim = vectors.shape[1]
-        index = faiss.IndexFlatL2(dim)
-        index.add(vectors)
-
-        self._videos[video_id] = {
-            "chunks": texts,
-            "starts": starts,
-            "index": index,
-            "vectors": vectors,
+    def _index_record(self, video_id: str, rec):
+        """
+        In-memory record: vectors go to the arena, the record keeps text + timestamps,
+        the slot of its arena rows and their size (charged to the LRU budget).
+        """
+        slot = self.arena.put(video_id, rec["vectors"])
+        return {
+            "chunks": rec["chunks"],
+            "starts": rec["starts"],
+            "ends": rec["ends"],
+            "time_index": TimeIndex(rec["starts"], rec["ends"]),
+            "timings": rec.get("timings"),
+            "arena_slot": slot,
+            "vector_bytes": len(rec["vectors"]) * self.arena.dim * 4,   # float32 rows
         }
 
+    def _vector_rows(self, video_id: str):
+        """
+        (vectors, squared norms or None) of a prepared video. If the LRU evicted it
+        after _retrieve got its record, the rows come straight from disk.
+        """
+        rows = self.arena.rows(video_id)
+        if rows is not None:
+            return rows
+        stored = self.store.load(video_id, self.embed_model_name)
+        if stored is None:
+            raise RuntimeError(f"Video {video_id} is no longer available")
+        if self.is_prepared(video_id):
+            # Re-added to the LRU while its eviction was freeing the rows; the
+            # record's slot follows, so its own eviction frees these rows
+            slot = self.arena.put(video_id, stored["vectors"])
+            rec = self._videos.get(video_id)
+            if rec is not None:
+                rec["arena_slot"] = slot
+                self.global_index.add(video_id, rec)
+            return self.arena.rows(video_id)
+        return stored["vectors"], None
+
+    def search_prepared(self, query: str, k: int = 10, per_video: Optional[int] = 1, min_score: float = 0.0):
+        """
+        "Which prepared video explains this?" — ranked [{video_id, start, end, score, link}]
+        from the global cross-video index, no YouTube search involved.
+        """
+        self._warm_from_store()
+        q_vec = self._get_embedder().encode([query], convert_to_numpy=True).astype("float32")
+        hits = self.global_index.search(q_vec, k=k, per_video=per_video, min_score=min_score)
+        for h in hits:
+            h["link"] = f"https://www.youtube.com/watch?v={h['video_id']}&t={int(h['start'])}s"
+        return hits
+
+    def _warm_from_store(self):
+        """
+        Once per instance: load the most recently stored videos into memory (and so
+        into the global index) until the next one would overflow the LRU budget,
+        capped at warm_max (AI_TUTOR_GLOBAL_INDEX_WARM_MAX) videos.
+        """
+        if self._warmed:
+            return
+        with self._warm_lock:
+            if self._warmed:
+                return
+            self._warmed = True
+            budget = self._videos.max_bytes - self._videos.stats()["bytes"]
+            for video_id in self.store.video_ids(newest_first=True)[:self.warm_max]:
+                if self.is_prepared(video_id):
+                    continue
+                rec = self.store.load(video_id, self.embed_model_name)
+                if rec is None or not len(rec["vectors"]):
+                    continue
+                size = record_bytes(rec)
+                if size > budget:
+                    break
+                budget -= size
+                indexed = self._index_record(video_id, rec)
+                self.global_index.add(video_id, indexed)
+                self._videos.put(video_id, indexed)
+
+    def stage_timings(self, video_id: str) -> Optional[Dict[str, float]]:
+        """Seconds per preparation stage for a video in memory (None if not loaded / unknown)."""
+        rec = self._videos.get(video_id)
+        return rec.get("timings") if rec else None
+
     # ----------------------------------------------------
     # 5) RETRIEVE
     # ----------------------------------------------------
-    def _retrieve(self, video_id, question, top_k=5, timestamp=None):
-        self.prepare_video(video_id)
-        rec = self._videos[video_id]
+    def _retrieve(self, video_id, question, top_k=5, timestamp=None, time_mode=None):
+        """
+        Top chunks for question. With a playback timestamp, time_mode decides how
+        the window AI_TUTOR_VIDEO_TIME_WINDOW around it is used:
+        - "bias":     global top_k, plus the chunk playing at timestamp first
+        - "boost":    window chunks compete with the global top_k, their distance
+                      scaled by AI_TUTOR_VIDEO_TIME_BOOST
+        - "restrict": only window chunks are scored, returned in playback order
+        - "auto":     restrict for "what did she just say"-style questions, else boost
+        """
+        # Prefer a video still being built (answer from the part covered so far)
+        rec = self._building.get(video_id)
+        if rec is None or not rec["chunks"]:
+            rec = self.prepare_video(video_id)
 
         embedder = self._get_embedder()
-        q_vec = embedder.encode([question], convert_to_numpy=True).astype("float32")
-
-        distances, idx = rec["index"].search(q_vec, top_k)
-        chunks = rec["chunks"]
-
-        results = [chunks[int(i)] for i in idx[0]]
-
-        # Timestamp bias
-        if timestamp is not None:
-            nearest = min(range(len(rec["starts"])), key=lambda i: abs(rec["starts"][i] - timestamp))
-            if chunks[nearest] not in results:
-                results.insert(0, chunks[nearest])
+        q = embedder.encode([question], convert_to_numpy=True).astype("float32")[0]
+
+        mode = time_mode or self.time_mode
+        if mode == "auto":
+            mode = "restrict" if _DEICTIC.search(question) else "boost"
+
+        partial = "lock" in rec
+        with rec.get("lock") or nullcontext():
+            chunks = list(rec["chunks"])
+            if partial:
+                vectors, norms = rec["vectors"], None
+                time_index = TimeIndex(rec["starts"], rec["ends"])
+            else:
+                time_index = rec["time_index"]
+        if not partial:
+            vectors, norms = self._vector_rows(video_id)
+
+        def distances(lo=0, hi=None):
+            """Squared L2 to chunks [lo, hi): arena rows, or the partial build's own vectors."""
+            return l2_distances(vectors[lo:hi], q, None if norms is None else norms[lo:hi])
+
+        lo = hi = 0
+        if timestamp is not None and mode in ("boost", "restrict"):
+            before, after = self.time_window
+            lo, hi = time_index.window(float(timestamp), before, after)
+            window_d = distances(lo, hi)
+
+        if mode == "restrict" and hi > lo:
+            return [chunks[lo + i] for i in sorted(closest(window_d, top_k))]
+
+        all_d = distances()
+        scored = {i: float(all_d[i]) for i in closest(all_d, top_k)}
+        if hi > lo:
+            for i, d in zip(range(lo, hi), window_d):
+                scored[i] = min(scored.get(i, float("inf")), float(d) * self.time_boost)
+        results = [chunks[i] for i in sorted(scored, key=scored.get)[:top_k]]
+
+        # Timestamp bias: the chunk playing right now goes first
+        if timestamp is not None and mode == "bias":
+            nearest = chunks[time_index.at(float(timestamp))]
+            if nearest not in results:
+                results.insert(0, nearest)
                 results = results[:top_k]
 
         return results
@@ -226,21 +570,28 @@ class YouTubeRAG:
     # ----------------------------------------------------
     # 6) PUBLIC: ASK VIDEO
     # ----------------------------------------------------
-    def ask_video(self, question, video_id, timestamp=None, top_k=5):
-        context = self._retrieve(video_id, question, top_k, timestamp)
+    def ask_video(self, question, video_id, timestamp=None, top_k=5, time_mode=None):
+        if time_mode is not None and time_mode not in TIME_MODES:
+            raise ValueError(f"time_mode must be one of {TIME_MODES}")
+        # Identical in-flight questions on the same video share one retrieval + generation
+        key = (self.llm_model, video_id, normalize_text(question), timestamp, top_k, time_mode)
+        return _ask_flight.do(key, lambda: self._answer_video(question, video_id, timestamp, top_k, time_mode))
+
+    def _answer_video(self, question, video_id, timestamp=None, top_k=5, time_mode=None):
+        context = self._retrieve(video_id, question, top_k, timestamp, time_mode)
         context_text = "\n\n".join(context)
 
-        prompt = f"""
-You are a friendly science tutor for class 6–10 students.
-Use the video transcript context to answer clearly and simply.
+        return self._llm_call(video_messages(context_text, question), question=question).strip()
 
-If the answer is not in the transcript, say so briefly.
 
-Context:
-{context_text}
+_shared: Optional[YouTubeRAG] = None
+_shared_lock = threading.Lock()
 
-Student question: {question}
 
-Answer:
-"""
-        return self._llm_call(prompt).strip()
+def get_youtube_rag() -> YouTubeRAG:
+    """The process-wide YouTubeRAG (views, core.views, the controller and its prefetcher)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = YouTubeRAG()
+        return _shared
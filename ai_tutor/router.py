@@ -6,8 +6,11 @@ from ai_tutor.controller import (
     new_session,
     set_session_context,
     get_session_context,
-    handle_student_query
+    handle_student_query,
+    public_session,
 )
+from ai_tutor.projection import shape_chat_response
+from ai_tutor.scheduler import SchedulerBusy
 
 router = APIRouter(prefix="/ai_tutor", tags=["AI Tutor"])
 
@@ -22,6 +25,8 @@ class ChatRequest(BaseModel):
     session_id: str
     question: str
     use_youtube: bool = False
+    fields: str | None = None     # e.g. "answer,refs"
+    include: str | None = None    # e.g. "session,ncert,youtube" or "all"
 
 
 # Route 1 — start session
@@ -41,7 +46,7 @@ def set_context(req: ContextUpdateRequest):
             keywords=req.keywords,
             mode=req.mode
         )
-        return {"ok": True, "session": updated}
+        return {"ok": True, "session": public_session(updated)}
     except KeyError:
         raise HTTPException(status_code=404, detail="Invalid session_id")
 
@@ -49,7 +54,14 @@ def set_context(req: ContextUpdateRequest):
 # Route 3 — student chat query
 @router.post("/chat")
 def chat(req: ChatRequest):
-    result = handle_student_query(req.session_id, req.question, req.use_youtube)
+    try:
+        result = handle_student_query(req.session_id, req.question, req.use_youtube)
+    except SchedulerBusy as err:
+        raise HTTPException(
+            status_code=429,
+            detail=str(err),
+            headers={"Retry-After": str(err.retry_after)},
+        )
     if not result.get("ok"):
         raise HTTPException(status_code=400, detail=result.get("error"))
-    return result
+    return shape_chat_response(result, fields=req.fields, include=req.include)
@@ -0,0 +1,132 @@
+# ai_tutor/scheduler.py
+"""
+Bounded scheduler in front of every LLM call:
+- at most AI_TUTOR_LLM_MAX_CONCURRENCY generations run at once
+- at most AI_TUTOR_LLM_MAX_QUEUE callers wait for a slot; more → SchedulerBusy
+- waiters are served by priority class (interactive chat before batch jobs),
+  FIFO within a class
+- queue-wait and run-time histograms go to ai_tutor.metrics
+
+Views turn SchedulerBusy into HTTP 429 with a Retry-After header.
+"""
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable
+
+from . import metrics
+from .conf import get_setting
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+_PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+
+class SchedulerBusy(Exception):
+    """Raised when the queue is full or the wait for a slot timed out."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency=2, max_queue=32, max_wait=60.0):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max(0, int(max_queue))
+        self.max_wait = max_wait
+
+        self._cond = threading.Condition()
+        self._waiting = []            # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._running = 0
+        self._avg_run = 5.0           # EWMA of generation time, seeds Retry-After
+
+        metrics.register_gauge("llm.running", lambda: self._running)
+        metrics.register_gauge("llm.queued", lambda: len(self._waiting))
+
+    # ----------------------------------------------------
+    # STATE
+    # ----------------------------------------------------
+    def queue_depth(self) -> int:
+        return len(self._waiting)
+
+    def running(self) -> int:
+        return self._running
+
+    def retry_after(self) -> int:
+        """Rough seconds until a new request would get a slot."""
+        ahead = len(self._waiting) + 1
+        return max(1, math.ceil(self._avg_run * ahead / self.max_concurrency))
+
+    # ----------------------------------------------------
+    # ACQUIRE / RELEASE
+    # ----------------------------------------------------
+    def _acquire(self, priority: int):
+        label = _PRIORITY_NAMES.get(priority, str(priority))
+        enqueued = time.monotonic()
+
+        with self._cond:
+            if self._running < self.max_concurrency and not self._waiting:
+                self._running += 1
+                metrics.observe(f"llm.queue_wait.{label}", 0.0)
+                return
+
+            if len(self._waiting) >= self.max_queue:
+                metrics.incr("llm.rejected.queue_full")
+                raise SchedulerBusy("LLM queue is full", self.retry_after())
+
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._waiting, ticket)
+            deadline = None if self.max_wait is None else enqueued + self.max_wait
+
+            while not (self._waiting[0] == ticket and self._running < self.max_concurrency):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                    metrics.incr("llm.rejected.timeout")
+                    raise SchedulerBusy("Timed out waiting for an LLM slot", self.retry_after())
+                self._cond.wait(remaining)
+
+            heapq.heappop(self._waiting)
+            self._running += 1
+            self._cond.notify_all()
+
+        metrics.observe(f"llm.queue_wait.{label}", time.monotonic() - enqueued)
+
+    def _release(self, run_seconds: float):
+        with self._cond:
+            self._running -= 1
+            self._avg_run = 0.8 * self._avg_run + 0.2 * run_seconds
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority: int = PRIORITY_INTERACTIVE):
+        """Hold one generation slot for the duration of the block (e.g. a token stream)."""
+        self._acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            metrics.observe("llm.run_seconds", elapsed)
+            self._release(elapsed)
+
+    def run(self, fn: Callable[[], Any], priority: int = PRIORITY_INTERACTIVE) -> Any:
+        """Run fn() once a slot is free. Raises SchedulerBusy instead of queueing unboundedly."""
+        with self.slot(priority):
+            return fn()
+
+
+llm_scheduler = LLMScheduler(
+    max_concurrency=get_setting("AI_TUTOR_LLM_MAX_CONCURRENCY", 2),
+    max_queue=get_setting("AI_TUTOR_LLM_MAX_QUEUE", 32),
+    max_wait=get_setting("AI_TUTOR_LLM_MAX_WAIT", 60.0),
+)
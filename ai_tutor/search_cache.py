@@ -0,0 +1,142 @@
+# ai_tutor/search_cache.py
+"""
+TTL + size-bounded cache of YouTube search results, shared by every YouTubeRAG
+in the process (views, core.views, controller, app1.py).
+
+Keys are (normalize_text(query), max_results), so "Photosynthesis " and
+"photosynthesis" hit the same entry. Entries expire after AI_TUTOR_SEARCH_CACHE_TTL
+seconds; past AI_TUTOR_SEARCH_CACHE_MAX_ENTRIES the least recently used go first.
+With AI_TUTOR_SEARCH_CACHE_PATH set, live entries are also written to a JSON file
+(atomically) and reloaded on start, so restarts keep warm topic searches. Writes
+are debounced: a put schedules one background save save_delay seconds later,
+which snapshots the entries under the lock and writes outside it, so searches
+never wait on the disk. flush() writes pending changes now (also at exit).
+
+Hits and misses are counted in ai_tutor.metrics (youtube_search.cache_*).
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from . import metrics
+from .coalesce import normalize_text
+from .conf import get_setting
+
+
+class SearchCache:
+    def __init__(
+        self,
+        ttl: float = 6 * 3600,
+        max_entries: int = 512,
+        path: Optional[str] = None,
+        save_delay: float = 2.0,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = str(path) if path else None
+        self.save_delay = save_delay
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()     # one writer at a time, snapshots in order
+        self._save_timer: Optional[threading.Timer] = None
+        if self.path:
+            self._load()
+
+    @staticmethod
+    def key(query: str, max_results: int) -> Tuple[str, int]:
+        return (normalize_text(query), int(max_results))
+
+    def get(self, query: str, max_results: int) -> Optional[List[Dict]]:
+        k = self.key(query, max_results)
+        with self._lock:
+            entry = self._entries.get(k)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[k]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(k)
+        metrics.incr("youtube_search.cache_hits" if entry is not None else "youtube_search.cache_misses")
+        return [dict(v) for v in entry[1]] if entry is not None else None
+
+    def put(self, query: str, max_results: int, results: List[Dict]):
+        k = self.key(query, max_results)
+        with self._lock:
+            self._entries[k] = (time.time() + self.ttl, [dict(v) for v in results])
+            self._entries.move_to_end(k)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self.path and self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self.flush)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def flush(self):
+        """Write pending changes to disk now (no-op without a path or changes)."""
+        with self._save_lock:
+            with self._lock:
+                if self._save_timer is None:
+                    return
+                self._save_timer.cancel()
+                self._save_timer = None
+                rows = [[q, n, expires, results] for (q, n), (expires, results) in self._entries.items()]
+            self._save(rows)
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ----------------------------------------------------
+    # DISK
+    # ----------------------------------------------------
+    def _save(self, rows: List[list]):
+        """Caller holds _save_lock (not _lock)."""
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".search_cache.", dir=directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(rows, f)
+            os.replace(tmp, self.path)
+        except OSError as err:
+            print(f"[ai_tutor.search_cache] Could not persist search cache: {err}")
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                rows = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(rows, list):
+            return
+        now = time.time()
+        for row in rows[-self.max_entries:]:
+            # A malformed row (hand edits, an older format) is skipped, not fatal
+            try:
+                q, n, expires, results = row
+                key, expires = (str(q), int(n)), float(expires)
+            except (TypeError, ValueError):
+                continue
+            if expires > now and isinstance(results, list) and all(isinstance(v, dict) for v in results):
+                self._entries[key] = (expires, results)
+
+
+_cache: Optional[SearchCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchCache(
+                ttl=get_setting("AI_TUTOR_SEARCH_CACHE_TTL", 6 * 3600),
+                max_entries=get_setting("AI_TUTOR_SEARCH_CACHE_MAX_ENTRIES", 512),
+                path=get_setting("AI_TUTOR_SEARCH_CACHE_PATH"),
+            )
+            atexit.register(_cache.flush)
+        return _cache
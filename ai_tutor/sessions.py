@@ -0,0 +1,278 @@
+# ai_tutor/sessions.py
+"""
+Tutor session storage, selected by AI_TUTOR_SESSION_BACKEND:
+- "memory" → InMemorySessionStore: per-process, LRU-bounded + idle TTL
+- "cache"  → DjangoCacheSessionStore: any Django cache (Redis, memcached,
+             database, file) so every worker sees the same sessions; a
+             per-process LocMemCache alias is refused
+
+Sessions are plain dicts. Readers get() a session; writers go through
+update(session_id, fn), which applies fn to the current session and saves it
+while holding a per-session lock (a process lock for "memory"; for "cache" a
+cache.add lock key, or an O_EXCL lock file on a FileBasedCache), so concurrent writers (new turns, background compaction,
+topic prefetch) never overwrite each other's changes.
+A background sweeper evicts idle sessions; entry count and approximate
+memory are exported as metrics gauges.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from . import metrics
+from .conf import get_setting
+
+
+class SessionStore:
+    """Interface every backend implements."""
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def save(self, session_id: str, data: Dict[str, Any]):
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        raise NotImplementedError
+
+    def update(self, session_id: str, fn: Callable[[Dict[str, Any]], None]) -> Optional[Dict[str, Any]]:
+        """
+        Read-modify-write: fn(session) changes the session in place, then it is saved,
+        with no other update of the same session in between. Returns the saved
+        session, or None (fn not called) if it does not exist.
+        """
+        raise NotImplementedError
+
+    def sweep(self) -> int:
+        """Drop expired sessions; returns how many were removed."""
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+
+# ================================================================
+#  IN-MEMORY (LRU + TTL)
+# ================================================================
+
+class InMemorySessionStore(SessionStore):
+    def __init__(self, ttl: float = 7200, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()   # oldest access first
+        self._accessed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()   # serialises update(); get/save stay cheap
+
+    def _expired(self, session_id: str, now: float) -> bool:
+        return self.ttl is not None and now - self._accessed.get(session_id, now) > self.ttl
+
+    def get(self, session_id):
+        now = time.time()
+        with self._lock:
+            data = self._data.get(session_id)
+            if data is None:
+                return None
+            if self._expired(session_id, now):
+                self._drop(session_id)
+                metrics.incr("sessions.expired")
+                return None
+            self._data.move_to_end(session_id)
+            self._accessed[session_id] = now
+            return data
+
+    def save(self, session_id, data):
+        with self._lock:
+            self._data[session_id] = data
+            self._data.move_to_end(session_id)
+            self._accessed[session_id] = time.time()
+            while len(self._data) > self.max_entries:
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+                metrics.incr("sessions.evicted")
+
+    def delete(self, session_id):
+        with self._lock:
+            self._drop(session_id)
+
+    def update(self, session_id, fn):
+        with self._write_lock:
+            data = self.get(session_id)
+            if data is None:
+                return None
+            fn(data)
+            self.save(session_id, data)
+            return data
+
+    def _drop(self, session_id):
+        self._data.pop(session_id, None)
+        self._accessed.pop(session_id, None)
+
+    def sweep(self):
+        now = time.time()
+        with self._lock:
+            # Oldest access first, so stop at the first live session
+            expired = []
+            for sid in self._data:
+                if not self._expired(sid, now):
+                    break
+                expired.append(sid)
+            for sid in expired:
+                self._drop(sid)
+        if expired:
+            metrics.incr("sessions.expired", len(expired))
+        return len(expired)
+
+    def stats(self):
+        with self._lock:
+            sessions = list(self._data.values())
+        approx_bytes = 0
+        for s in sessions:
+            try:
+                approx_bytes += len(pickle.dumps(s))
+            except Exception:
+                pass
+        return {"backend": "memory", "entries": len(sessions), "approx_bytes": approx_bytes}
+
+
+# ================================================================
+#  SHARED (DJANGO CACHE)
+# ================================================================
+
+class DjangoCacheSessionStore(SessionStore):
+    """Shared across workers; expiry is delegated to the cache (timeout = TTL, refreshed on access)."""
+
+    def __init__(self, alias: str = "default", ttl: float = 7200, prefix: str = "ai_tutor:session:",
+                 lock_timeout: float = 10.0):
+        from django.core.cache import caches
+        from django.core.cache.backends.filebased import FileBasedCache
+        from django.core.cache.backends.locmem import LocMemCache
+
+        self.cache = caches[alias]
+        if isinstance(self.cache, LocMemCache):
+            # Each worker would get its own copy: sessions vanish between requests
+            raise ValueError(
+                f"CACHES[{alias!r}] is a per-process LocMemCache; use a shared cache "
+                f"(file, database, Redis) or AI_TUTOR_SESSION_BACKEND = \"memory\""
+            )
+        self.ttl = ttl
+        self.prefix = prefix
+        self.lock_timeout = lock_timeout
+        # FileBasedCache.add is check-then-set, not atomic: lock with O_EXCL files there
+        self._lock_dir = getattr(self.cache, "_dir", None) if isinstance(self.cache, FileBasedCache) else None
+
+    def _key(self, session_id):
+        return f"{self.prefix}{session_id}"
+
+    def _try_lock(self, lock_key: str, token: str) -> bool:
+        if self._lock_dir is None:
+            return self.cache.add(lock_key, token, self.lock_timeout)
+        path = self._lock_path(lock_key)
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > self.lock_timeout:
+                    os.remove(path)   # left behind by a crashed holder
+            except OSError:
+                pass
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(token)
+        return True
+
+    def _unlock(self, lock_key: str, token: str):
+        if self._lock_dir is None:
+            if self.cache.get(lock_key) == token:
+                self.cache.delete(lock_key)
+            return
+        path = self._lock_path(lock_key)
+        try:
+            with open(path) as f:
+                owned = f.read() == token
+            if owned:
+                os.remove(path)
+        except OSError:
+            pass
+
+    def _lock_path(self, lock_key: str) -> str:
+        os.makedirs(self._lock_dir, exist_ok=True)
+        return os.path.join(self._lock_dir, hashlib.md5(lock_key.encode()).hexdigest() + ".lock")
+
+    def get(self, session_id):
+        data = self.cache.get(self._key(session_id))
+        if data is not None:
+            self.cache.touch(self._key(session_id), self.ttl)
+        return data
+
+    def save(self, session_id, data):
+        self.cache.set(self._key(session_id), data, self.ttl)
+
+    def delete(self, session_id):
+        self.cache.delete(self._key(session_id))
+
+    def update(self, session_id, fn):
+        # Whoever adds the lock key holds the lock (cache.add is atomic on Redis,
+        # memcached and the database cache). It expires after lock_timeout, so a
+        # crashed holder cannot wedge the session.
+        lock_key, token = f"{self._key(session_id)}:lock", uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+        while not self._try_lock(lock_key, token):
+            if time.monotonic() >= deadline:
+                metrics.incr("sessions.lock_timeouts")
+                break   # the holder's key has expired by now; go ahead
+            time.sleep(0.01)
+        try:
+            data = self.get(session_id)
+            if data is None:
+                return None
+            fn(data)
+            self.save(session_id, data)
+            return data
+        finally:
+            self._unlock(lock_key, token)
+
+    def stats(self):
+        # Django's cache API cannot enumerate keys; entry counts live in the cache server
+        return {"backend": "cache"}
+
+
+# ================================================================
+#  FACTORY + SWEEPER
+# ================================================================
+
+def get_session_store() -> SessionStore:
+    backend = get_setting("AI_TUTOR_SESSION_BACKEND", "memory")
+    ttl = get_setting("AI_TUTOR_SESSION_TTL", 7200)
+    if backend == "cache":
+        return DjangoCacheSessionStore(get_setting("AI_TUTOR_SESSION_CACHE_ALIAS", "default"), ttl=ttl)
+    if backend != "memory":
+        raise ValueError(f"Unknown AI_TUTOR_SESSION_BACKEND: {backend!r}")
+    return InMemorySessionStore(ttl=ttl, max_entries=get_setting("AI_TUTOR_SESSION_MAX_ENTRIES", 10000))
+
+
+def start_sweeper(store: SessionStore, interval: float = 60.0) -> threading.Thread:
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                store.sweep()
+            except Exception as err:
+                print(f"[ai_tutor.sessions] Sweep failed: {err}")
+
+    t = threading.Thread(target=loop, name="session-sweeper", daemon=True)
+    t.start()
+    return t
+
+
+def register_metrics(store: SessionStore):
+    metrics.register_gauge("sessions.entries", lambda: store.stats().get("entries"))
+    metrics.register_gauge("sessions.approx_bytes", lambda: store.stats().get("approx_bytes"))
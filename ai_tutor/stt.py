@@ -0,0 +1,74 @@
+# ai_tutor/stt.py
+"""
+Speech-to-text engines behind one interface, selected by AI_TUTOR_STT_BACKEND:
+- "whisper"        → openai-whisper (PyTorch, fp32) — the original backend
+- "faster_whisper" → CTranslate2 / faster-whisper with int8 weights on CPU
+
+Every engine returns segments as [{'start', 'end', 'text'}], so YouTubeRAG,
+YouTubeService and ai_tutor.transcription do not care which one is active.
+"""
+
+from typing import Dict, List
+
+from .conf import get_setting
+
+SAMPLE_RATE = 16000
+
+
+class STTEngine:
+    name = "base"
+
+    def transcribe_array(self, audio) -> List[Dict]:
+        """float32 mono PCM at 16 kHz → segments."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _segment(start, end, text) -> Dict:
+        return {"start": round(float(start), 3), "end": round(float(end), 3), "text": text.strip()}
+
+
+class WhisperEngine(STTEngine):
+    name = "whisper"
+
+    def __init__(self, model_size="base", threads=None):
+        import whisper
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        self.model = whisper.load_model(model_size)
+
+    def transcribe_array(self, audio):
+        result = self.model.transcribe(audio, fp16=False, condition_on_previous_text=False)
+        return [
+            self._segment(s["start"], s["end"], s["text"])
+            for s in result.get("segments", [])
+            if s.get("text", "").strip()
+        ]
+
+
+class FasterWhisperEngine(STTEngine):
+    name = "faster_whisper"
+
+    def __init__(self, model_size="base", threads=None, compute_type="int8"):
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(model_size, device="cpu", compute_type=compute_type, cpu_threads=threads or 0)
+
+    def transcribe_array(self, audio):
+        segments, _info = self.model.transcribe(audio, beam_size=5, condition_on_previous_text=False)
+        # segments is a lazy generator: decoding happens while we iterate
+        return [self._segment(s.start, s.end, s.text) for s in segments if s.text.strip()]
+
+
+ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+}
+
+
+def load_engine(backend: str = None, model_size: str = "base", threads: int = None) -> STTEngine:
+    backend = backend or get_setting("AI_TUTOR_STT_BACKEND", "whisper")
+    try:
+        engine_cls = ENGINES[backend]
+    except KeyError:
+        raise ValueError(f"Unknown AI_TUTOR_STT_BACKEND: {backend!r} (choose from {sorted(ENGINES)})")
+    return engine_cls(model_size, threads=threads)
@@ -1,5 +1,4 @@
-from rag_service import RAGService
-from ollama import chat
+from ai_tutor.rag_service import RAGService
 
 # Initialize RAG service
 rag = RAGService()
@@ -17,31 +16,13 @@ while True:
         snippet = chunk_text[:200] + ("..." if len(chunk_text) > 200 else "")
         print(f"{i+1}. {chunk_id}: {snippet}\n")
 
-    # --- Section 2: LLM answer using context ---
-    print("\n🤖 LLM is generating answer using context...\n")
-    prompt_with_context = f"Answer the following question using the given NCERT context. " \
-                          f"Provide a clear, concise, and student-friendly explanation.\n\n" \
-                          f"Context:\n{chr(10).join(context_chunks)}\n\nQuestion: {q}\nAnswer:"
-    
-    response_context = chat(
-        model="llama3:latest",
-        messages=[{"role": "user", "content": prompt_with_context}]
-    )
-    answer_with_context = response_context.message.content
+    # --- Sections 2 + 3: both answers, generated concurrently ---
+    print("\n🤖 LLM is generating the context answer and the independent answer...\n")
+    answers = rag.ask_dual(q, context_chunks=context_chunks)
+
     print("\n================ Answer Using Context ================\n")
-    print(answer_with_context)
+    print(answers["context"])
 
-    # --- Section 3: LLM independent answer ---
-    print("\n🤖 LLM is generating independent answer...\n")
-    prompt_independent = f"Answer the following question independently, without using any external context. " \
-                         f"Explain clearly in a way a school student can understand, with examples if needed.\n\n" \
-                         f"Question: {q}\nAnswer:"
-    
-    response_independent = chat(
-        model="llama3:latest",
-        messages=[{"role": "user", "content": prompt_independent}]
-    )
-    answer_independent = response_independent.message.content
     print("\n================ Independent Answer =================\n")
-    print(answer_independent)
+    print(answers["independent"])
     print("\n=====================================================\n")
@@ -0,0 +1,64 @@
+# Minimal Django settings for the unit tests: they exercise ai_tutor modules
+# directly and need no project apps, URLconf or database. Anything the modules
+# write at import time goes to a throwaway directory.
+import itertools
+import os
+import tempfile
+import zlib
+
+import django
+import numpy as np
+import pytest
+from django.conf import settings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "youtube")
+
+if not settings.configured:
+    _scratch = tempfile.mkdtemp(prefix="ai_tutor_tests.")
+    settings.configure(
+        INSTALLED_APPS=["django.contrib.contenttypes", "django.contrib.auth", "rest_framework"],
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        AI_TUTOR_VIDEO_CACHE_DIR=f"{_scratch}/video_cache",
+        AI_TUTOR_LEGACY_VIDEO_INDEX_DIR=None,
+        AI_TUTOR_AUDIO_TEMP_DIR=f"{_scratch}/audio_temp",
+        AI_TUTOR_SEARCH_CACHE_PATH=None,
+        AI_TUTOR_ROUTING_LOG=None,
+        AI_TUTOR_YOUTUBE_BACKEND="fixtures",
+        AI_TUTOR_YOUTUBE_FIXTURES=FIXTURES,
+    )
+    django.setup()
+
+_models = itertools.count()
+
+
+class FakeEmbedder:
+    """Bag of hashed words, L2-normalised like all-MiniLM-L6-v2."""
+
+    dim = 32
+
+    def encode(self, texts, convert_to_numpy=True):
+        out = np.zeros((len(texts), self.dim), "float32")
+        for row, text in zip(out, texts):
+            for word in text.lower().split():
+                row[zlib.crc32(word.encode()) % self.dim] += 1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1.0, norms)
+
+
+@pytest.fixture
+def make_rag(tmp_path):
+    """YouTubeRAG on the bundled fixtures, a temp store, a fake embedder and its own arena."""
+    from django.test import override_settings
+
+    from ai_tutor.rag_youtube import YouTubeRAG
+
+    def make(max_bytes=256 * 1024 * 1024, model=None, **overrides):
+        with override_settings(AI_TUTOR_VIDEO_CACHE_DIR=str(tmp_path / "store"),
+                               AI_TUTOR_VIDEO_CACHE_MAX_BYTES=max_bytes, **overrides):
+            rag = YouTubeRAG(embed_model_name=model or f"fake-{next(_models)}")
+        rag._embedder = FakeEmbedder()
+        rag._embed_batch = 1
+        return rag
+
+    return make
@@ -0,0 +1,44 @@
+import threading
+import time
+
+import pytest
+
+from ai_tutor.coalesce import SingleFlight, normalize_text
+
+
+def test_normalize_text_folds_case_and_whitespace():
+    assert normalize_text("  What IS   an Acid? ") == normalize_text("what is an acid?")
+
+
+def test_concurrent_identical_calls_share_one_run():
+    flight = SingleFlight("test_share")
+    release, started = threading.Event(), threading.Event()
+    runs, results = [], []
+
+    def slow():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return "answer"
+
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(4)]
+    for t in followers:
+        t.start()
+    while flight.followers < 4:
+        time.sleep(0.001)
+    release.set()
+    for t in [leader, *followers]:
+        t.join(5)
+
+    assert runs == [1] and results == ["answer"] * 5
+    assert flight.in_flight() == 0 and flight.coalescing_rate() == 0.8
+
+
+def test_followers_get_the_leaders_exception_and_key_is_freed():
+    flight = SingleFlight("test_error")
+    with pytest.raises(ValueError):
+        flight.do("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert flight.do("k", lambda: 42) == 42   # nothing cached after completion
@@ -0,0 +1,35 @@
+import threading
+import time
+
+from ai_tutor import controller
+
+
+def test_hung_youtube_searches_never_starve_ncert(monkeypatch):
+    release = threading.Event()
+
+    def hung_search(query):
+        release.wait(10)
+        return {"source": "youtube", "results": [{"title": query}]}
+
+    monkeypatch.setattr(controller, "_search_youtube", hung_search)
+    monkeypatch.setattr(controller, "_search_ncert", lambda q, pool=None: {"source": "ncert", "results": [q]})
+    monkeypatch.setattr(controller, "RETRIEVAL_DEADLINES", {"ncert": 1.0, "youtube": 0.05})
+    workers = controller.RETRIEVAL_WORKERS.get("youtube", 4)
+
+    try:
+        statuses = [controller._fan_out(f"q{i}", use_youtube=True)[1] for i in range(workers + 3)]
+        assert all(s["ncert"] == "ok" for s in statuses)
+        assert [s["youtube"] for s in statuses] == ["timeout"] * workers + ["busy"] * 3
+    finally:
+        release.set()
+
+    # Stragglers finish and give their slots back
+    deadline = time.monotonic() + 5
+    monkeypatch.setattr(controller, "RETRIEVAL_DEADLINES", {"ncert": 1.0, "youtube": 1.0})
+    while time.monotonic() < deadline:
+        results, status = controller._fan_out("again", use_youtube=True)
+        if status["youtube"] == "ok":
+            break
+        time.sleep(0.01)
+    assert status == {"ncert": "ok", "youtube": "ok"}
+    assert results["youtube"]["results"] == [{"title": "again"}]
@@ -0,0 +1,37 @@
+from ai_tutor.global_index import GlobalVideoIndex
+from ai_tutor.vector_arena import VectorArena
+
+VIDEOS = ["fxAcidBas01", "fxPhotosy02", "fxForceMo03"]
+
+
+def test_search_ranks_the_matching_video_first(make_rag):
+    rag = make_rag()
+    for video_id in VIDEOS:
+        rag.prepare_video(video_id)
+    hits = rag.search_prepared("photosynthesis chlorophyll sunlight", k=3)
+    assert hits[0]["video_id"] == "fxPhotosy02"
+    assert {h["video_id"] for h in hits} == set(VIDEOS)
+    assert hits[0]["link"].startswith("https://www.youtube.com/watch?v=fxPhotosy02&t=")
+
+
+def test_evicted_video_leaves_the_global_index(make_rag):
+    rag = make_rag(max_bytes=1)   # every put evicts all but the newest video
+    rag.prepare_video("fxAcidBas01")
+    rag.prepare_video("fxPhotosy02")
+    assert "fxAcidBas01" not in rag.global_index
+    assert "fxPhotosy02" in rag.global_index
+    rag._warmed = True   # no reload from disk for this check
+    assert {h["video_id"] for h in rag.search_prepared("acid base", k=5, per_video=None)} == {"fxPhotosy02"}
+
+
+def test_warm_up_is_bounded(make_rag):
+    writer = make_rag(model="fake-shared")
+    for video_id in VIDEOS:
+        writer.prepare_video(video_id)
+
+    rag = make_rag(model="fake-shared", AI_TUTOR_GLOBAL_INDEX_WARM_MAX=2)
+    rag.arena = VectorArena()
+    rag.global_index = GlobalVideoIndex("fake-shared", arena=rag.arena)
+    rag.search_prepared("acid")
+    assert rag.global_index.stats()["videos"] == 2
+    assert rag.cache_stats()["entries"] == 2
@@ -0,0 +1,30 @@
+from ai_tutor import model_router as mr
+
+
+def test_explanatory_questions_go_to_the_quality_model():
+    router = mr.ModelRouter(slos={"video_ask": 20.0})
+    assert mr.question_complexity("Explain acids and bases") >= mr.COMPLEXITY_THRESHOLD
+    assert router.choose("video_ask", "Explain acids and bases") == mr.QUALITY_MODEL
+
+
+def test_short_factual_questions_go_to_the_fast_model():
+    router = mr.ModelRouter()
+    assert router.choose("chat", "What is photosynthesis?") == mr.FAST_MODEL
+
+
+def test_default_video_slo_leaves_room_for_the_quality_model():
+    assert mr.model_router.slos["video_ask"] > mr._DEFAULT_LATENCY[mr.QUALITY_MODEL]
+
+
+def test_slo_below_quality_eta_falls_back_to_fast_model():
+    router = mr.ModelRouter(slos={"video_ask": 1.0})
+    assert router.choose("video_ask", "Explain acids and bases") == mr.FAST_MODEL
+
+
+def test_decisions_are_written_in_the_background(tmp_path):
+    path = tmp_path / "logs" / "routing.jsonl"
+    router = mr.ModelRouter(log_path=str(path))
+    for _ in range(20):
+        router.choose("chat", "hi")
+    router.flush(timeout=5)
+    assert len(path.read_text().splitlines()) == 20
@@ -0,0 +1,74 @@
+import pytest
+
+from ai_tutor.jobs import PrepareJobQueue
+
+VIDEO = "fxAcidBas01"   # bundled fixture transcript, ~850 words → 3 chunks
+
+
+@pytest.fixture
+def rag(make_rag):
+    return make_rag()
+
+
+def test_captioned_build_reports_embedding_per_batch(rag):
+    trace = []
+    rec = rag._build_record(VIDEO, progress=lambda state, fraction=None: trace.append((state, fraction)))
+
+    assert trace[0] == ("fetching", 0.05)
+    embedding = [f for state, f in trace if state == "embedding"]
+    assert len(embedding) == len(rec["chunks"]) >= 3
+    assert embedding == sorted(set(embedding))
+    assert 0.9 <= embedding[-1] <= 0.95
+
+
+def test_partial_vectors_grow_without_losing_rows(rag):
+    rec = rag._build_record(VIDEO)
+    expected = rag._get_embedder().encode(rec["chunks"])
+    assert rec["vectors"].shape == expected.shape
+    assert (rec["vectors"] == expected).all()
+
+
+def test_job_moves_through_embedding_to_ready(rag):
+    states = []
+
+    def prepare(video_id, progress):
+        def track(state, fraction=None):
+            states.append(state)
+            progress(state, fraction)
+        return rag.prepare_video(video_id, progress=track)
+
+    job = PrepareJobQueue(prepare, workers=1).submit(VIDEO)
+    assert job.wait(10)
+    assert job.state == "ready" and job.progress == 1.0
+    assert states[0] == "fetching" and states[-1] == "embedding"
+    assert job.timings and "first_chunk" in job.timings
+
+
+def test_whisper_build_times_audio_acquisition(rag, monkeypatch):
+    import time
+
+    from ai_tutor import audio, transcription
+
+    class NoCaptions:
+        supports_audio = True
+
+        def fetch_captions(self, video_id):
+            return []
+
+    class Transcriber:
+        def iter_transcribe_stream(self, blocks):
+            for i, _ in enumerate(blocks):
+                yield {"start": 10.0 * i, "end": 10.0 * (i + 1), "text": "acids taste sour " * 20}
+
+    def slow_stream(video_id, ffmpeg_location=None):
+        time.sleep(0.05)   # resolving the stream before the first block
+        yield from range(3)
+
+    monkeypatch.setattr(audio, "stream_pcm", slow_stream)
+    monkeypatch.setattr(transcription, "get_transcriber", lambda size: Transcriber())
+    rag.provider = NoCaptions()
+
+    trace = []
+    rec = rag._build_record("fxNoCapts04", progress=lambda state, fraction=None: trace.append(state))
+    assert "transcribing" in trace and len(rec["chunks"]) >= 1
+    assert 0.05 <= rec["timings"]["download"] <= rec["timings"]["first_chunk"]
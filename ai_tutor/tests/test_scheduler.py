@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from ai_tutor.scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, LLMScheduler, SchedulerBusy
+
+
+def hold_slots(scheduler, n):
+    """Occupy n slots until the returned event is set."""
+    release, held = threading.Event(), threading.Barrier(n + 1)
+
+    def hold():
+        with scheduler.slot():
+            held.wait(5)
+            release.wait(5)
+
+    threads = [threading.Thread(target=hold) for _ in range(n)]
+    for t in threads:
+        t.start()
+    held.wait(5)
+    return release, threads
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=0, max_wait=5)
+    release, threads = hold_slots(scheduler, 1)
+    with pytest.raises(SchedulerBusy) as err:
+        scheduler.run(lambda: "never")
+    assert err.value.retry_after >= 1
+    release.set()
+    for t in threads:
+        t.join(5)
+    assert scheduler.run(lambda: "ok") == "ok"
+
+
+def test_wait_timeout_raises_busy():
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=4, max_wait=0.05)
+    release, threads = hold_slots(scheduler, 1)
+    with pytest.raises(SchedulerBusy):
+        scheduler.run(lambda: "never")
+    assert scheduler.queue_depth() == 0
+    release.set()
+    for t in threads:
+        t.join(5)
+
+
+def test_interactive_waiters_go_before_batch():
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=8, max_wait=5)
+    release, threads = hold_slots(scheduler, 1)
+    order = []
+
+    def call(priority, name):
+        scheduler.run(lambda: order.append(name), priority=priority)
+
+    waiters = [threading.Thread(target=call, args=(PRIORITY_BATCH, "batch"))]
+    waiters[0].start()
+    while scheduler.queue_depth() < 1:
+        time.sleep(0.001)
+    waiters.append(threading.Thread(target=call, args=(PRIORITY_INTERACTIVE, "chat")))
+    waiters[1].start()
+    while scheduler.queue_depth() < 2:
+        time.sleep(0.001)
+    release.set()
+    for t in threads + waiters:
+        t.join(5)
+    assert order == ["chat", "batch"]
+
+
+def test_busy_becomes_http_429():
+    from ai_tutor.views import busy_response
+
+    response = busy_response(SchedulerBusy("LLM queue is full", 7))
+    assert response.status_code == 429
+    assert response["Retry-After"] == "7"
@@ -0,0 +1,46 @@
+import json
+import time
+
+from ai_tutor.search_cache import SearchCache
+
+VIDEOS = [{"video_id": "fxAcidBas01", "title": "Acids and bases"}]
+
+
+def test_put_saves_in_the_background_and_reloads(tmp_path):
+    path = tmp_path / "search_cache.json"
+    cache = SearchCache(path=path, save_delay=60)
+    cache.put("Photosynthesis ", 5, VIDEOS)
+    cache.put("acids", 5, VIDEOS)
+    assert not path.exists()   # debounced: nothing written while searches run
+
+    cache.flush()
+    assert len(json.loads(path.read_text())) == 2
+    assert SearchCache(path=path).get("photosynthesis", 5) == VIDEOS
+
+
+def test_debounced_save_runs_without_flush(tmp_path):
+    path = tmp_path / "search_cache.json"
+    SearchCache(path=path, save_delay=0.01).put("acids", 5, VIDEOS)
+    deadline = time.time() + 5
+    while not path.exists() and time.time() < deadline:
+        time.sleep(0.01)
+    assert SearchCache(path=path).get("acids", 5) == VIDEOS
+
+
+def test_malformed_rows_are_skipped_on_load(tmp_path):
+    path = tmp_path / "search_cache.json"
+    future = time.time() + 3600
+    path.write_text(json.dumps([
+        ["acids", 5, future, VIDEOS],
+        ["short row"],
+        ["bases", "five", future, VIDEOS],
+        ["salts", 5, "soon", VIDEOS],
+        ["force", 5, future, "not a list"],
+        ["expired", 5, 0, VIDEOS],
+        7,
+    ]))
+    cache = SearchCache(path=path)
+    assert len(cache) == 1 and cache.get("acids", 5) == VIDEOS
+
+    path.write_text(json.dumps({"not": "rows"}))
+    assert len(SearchCache(path=path)) == 0
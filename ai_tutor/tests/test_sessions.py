@@ -0,0 +1,108 @@
+import pytest
+from django.test import override_settings
+
+from ai_tutor import sessions
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = sessions.InMemorySessionStore(ttl=None, max_entries=2)
+    store.save("a", {"n": 1})
+    store.save("b", {"n": 2})
+    store.get("a")
+    store.save("c", {"n": 3})
+    assert "a" in store and "c" in store
+    assert "b" not in store
+
+
+def test_memory_store_expires_idle_sessions(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sessions.time, "time", lambda: now[0])
+    store = sessions.InMemorySessionStore(ttl=60, max_entries=10)
+    store.save("a", {})
+    store.save("b", {})
+    now[0] += 30
+    store.get("b")
+    now[0] += 45
+    assert store.sweep() == 1
+    assert store.get("a") is None
+    assert store.get("b") == {}
+
+
+def test_cache_store_refuses_per_process_locmem():
+    caches = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    with override_settings(CACHES=caches):
+        with pytest.raises(ValueError):
+            sessions.DjangoCacheSessionStore("default")
+
+
+def test_cache_store_round_trips_through_a_shared_cache(tmp_path):
+    caches = {"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": str(tmp_path),
+    }}
+    with override_settings(CACHES=caches):
+        store = sessions.DjangoCacheSessionStore("default", ttl=60)
+        store.save("s1", {"history": ["hi"]})
+        assert sessions.DjangoCacheSessionStore("default").get("s1") == {"history": ["hi"]}
+        store.delete("s1")
+        assert store.get("s1") is None
+
+
+def _file_store(tmp_path):
+    caches = {"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": str(tmp_path),
+    }}
+    return override_settings(CACHES=caches)
+
+
+def _concurrent_appends(store, n=20):
+    import threading
+
+    store.save("s1", {"history": []})
+    threads = [
+        threading.Thread(target=store.update, args=("s1", lambda s, i=i: s["history"].append(i)))
+        for i in range(n)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    return sorted(store.get("s1")["history"])
+
+
+def test_memory_store_updates_do_not_lose_writes():
+    store = sessions.InMemorySessionStore(ttl=None)
+    assert _concurrent_appends(store) == list(range(20))
+    assert store.update("missing", lambda s: s.clear()) is None
+
+
+def test_cache_store_updates_do_not_lose_writes(tmp_path):
+    with _file_store(tmp_path):
+        # Two store objects, as two workers would have
+        a = sessions.DjangoCacheSessionStore("default", ttl=60)
+        assert _concurrent_appends(a) == list(range(20))
+        b = sessions.DjangoCacheSessionStore("default", ttl=60)
+        b.update("s1", lambda s: s.__setitem__("topic", "acids"))
+        assert a.get("s1")["topic"] == "acids" and len(a.get("s1")["history"]) == 20
+
+
+def test_compaction_keeps_turns_appended_while_summarising(monkeypatch):
+    from ai_tutor import llm_loader
+    from ai_tutor.memory import ConversationMemory
+
+    store = sessions.InMemorySessionStore(ttl=None)
+    memory = ConversationMemory(store, compact_tokens=10**6, keep_turns=1)
+    store.save("s1", {"history": []})
+    for i in range(3):
+        memory.append_turn("s1", f"q{i}", f"a{i}")
+
+    def summarise(messages, **kwargs):
+        memory.append_turn("s1", "late question", "late answer")   # lands mid-compaction
+        return "summary of q0 q1"
+
+    monkeypatch.setattr(llm_loader, "chat_messages", summarise)
+    memory._compact("s1")
+    sess = store.get("s1")
+    assert sess["summary"] == "summary of q0 q1"
+    assert [t["content"] for t in sess["history"]] == ["q2", "a2", "late question", "late answer"]
@@ -0,0 +1,7 @@
+from ai_tutor import controller, views
+from ai_tutor.rag_youtube import get_youtube_rag
+
+
+def test_views_and_controller_share_one_youtube_rag():
+    assert views.yt_rag is get_youtube_rag()
+    assert controller.yt_rag_backend is views.yt_rag
@@ -0,0 +1,145 @@
+import threading
+import time
+
+from ai_tutor.prefetch import SpeculativePreparer
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+class GatedPrepare:
+    """Stub prepare: one progress call, wait for the gate, a second progress call, done."""
+
+    def __init__(self):
+        self.reached = threading.Event()
+        self.gate = threading.Event()
+        self.done = []
+
+    def __call__(self, video_id, progress):
+        progress("fetching", 0.05)
+        self.reached.set()
+        self.gate.wait(5)
+        progress("embedding", 0.5)
+        self.done.append(video_id)
+
+
+def test_speculative_build_goes_to_the_store_only(make_rag):
+    rag = make_rag()
+    rag.prepare_video("fxAcidBas01")
+
+    assert rag.prepare_video("fxPhotosy02", speculative=True) is None
+    assert rag.store.exists("fxPhotosy02")
+    assert "fxPhotosy02" not in rag.arena and "fxPhotosy02" not in rag.global_index
+    assert not rag.is_prepared("fxPhotosy02")
+    assert rag.cache_stats()["entries"] == 1
+
+    # Picking it later is a disk load, not a rebuild
+    rag._embedder = None
+    rec = rag.prepare_video("fxPhotosy02")
+    assert rec["chunks"] and "fxPhotosy02" in rag.arena and "fxPhotosy02" in rag.global_index
+
+
+def test_running_build_pauses_between_batches_while_busy():
+    busy, prepare = threading.Event(), GatedPrepare()
+    preparer = SpeculativePreparer(prepare, is_warm=lambda vid: False, busy=busy.is_set, poll_interval=0.005)
+    preparer.schedule("acids", [{"video_id": "fxAcidBas01"}])
+    assert prepare.reached.wait(5)
+
+    busy.set()          # a user build starts mid-way
+    prepare.gate.set()
+    time.sleep(0.1)
+    assert prepare.done == []
+    busy.clear()
+    wait_until(lambda: prepare.done == ["fxAcidBas01"])
+
+
+def test_picked_running_build_is_not_paused():
+    busy, prepare = threading.Event(), GatedPrepare()
+    preparer = SpeculativePreparer(prepare, is_warm=lambda vid: False, busy=busy.is_set, poll_interval=0.005)
+    preparer.schedule("acids", [{"video_id": "fxAcidBas01"}])
+    assert prepare.reached.wait(5)
+
+    busy.set()
+    preparer.picked("fxAcidBas01")   # the student is now waiting on this very build
+    prepare.gate.set()
+    wait_until(lambda: prepare.done == ["fxAcidBas01"])
+
+
+class Recorder:
+    """Stub prepare that records finished and cancelled videos; `hold` blocks until released."""
+
+    def __init__(self, hold=()):
+        self.hold = set(hold)
+        self.started = []
+        self.finished = []
+        self.cancelled = []
+        self.release = threading.Event()
+
+    def __call__(self, video_id, progress):
+        self.started.append(video_id)
+        try:
+            progress("fetching", 0.05)
+            if video_id in self.hold:
+                self.release.wait(5)
+            progress("embedding", 0.5)
+        except Exception:
+            self.cancelled.append(video_id)
+            raise
+        self.finished.append(video_id)
+
+
+def idle(preparer):
+    with preparer._cond:
+        return not preparer._pending and preparer._running is None
+
+
+def videos(*ids, duration=None):
+    return [{"video_id": vid, "duration": duration} for vid in ids]
+
+
+def test_newer_search_replaces_pending_items_of_its_group():
+    prepare = Recorder(hold={"blocker"})
+    preparer = SpeculativePreparer(prepare, is_warm=lambda vid: False)
+    preparer.schedule("other", videos("blocker"))
+    wait_until(lambda: prepare.started == ["blocker"])
+
+    preparer.schedule("acids", videos("a1", "a2"))
+    preparer.schedule("acids", videos("a3"))
+    preparer.schedule("bases", videos("b1"))
+    prepare.release.set()
+    wait_until(lambda: idle(preparer))
+    assert prepare.finished == ["blocker", "a3", "b1"]
+
+
+def test_picked_cancels_running_and_pending_siblings():
+    prepare = Recorder(hold={"a1"})
+    preparer = SpeculativePreparer(prepare, is_warm=lambda vid: False, top_n=3)
+    preparer.schedule("acids", videos("a1", "a2", "a3"))
+    wait_until(lambda: prepare.started == ["a1"])
+
+    preparer.picked("a3")
+    prepare.release.set()
+    wait_until(lambda: idle(preparer))
+    assert prepare.cancelled == ["a1"]
+    assert prepare.finished == ["a3"]   # the pick itself stays queued; a2 is dropped
+
+
+def test_budget_caps_starts_per_window():
+    prepare = Recorder()
+    preparer = SpeculativePreparer(prepare, is_warm=lambda vid: False, top_n=5, budget=2, window=3600)
+    preparer.schedule("acids", videos("a1", "a2", "a3", "a4"))
+    wait_until(lambda: idle(preparer))
+    assert prepare.finished == ["a1", "a2"]
+
+
+def test_long_and_warm_videos_are_skipped():
+    prepare = Recorder()
+    preparer = SpeculativePreparer(prepare, is_warm=lambda vid: vid == "warm", top_n=5, max_duration=600)
+    preparer.schedule("acids", videos("long", duration=7200) + videos("warm", "short", duration=300))
+    wait_until(lambda: idle(preparer))
+    assert prepare.started == ["short"]
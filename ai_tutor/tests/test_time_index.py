@@ -0,0 +1,59 @@
+from ai_tutor.time_index import TimeIndex
+
+# chunks: [0,10) [10,20) gap [30,40) [40,55)
+INDEX = TimeIndex([0, 10, 30, 40], [10, 20, 40, 55])
+
+
+def test_at_finds_the_playing_chunk():
+    assert INDEX.at(5) == 0
+    assert INDEX.at(10) == 1
+    assert INDEX.at(45) == 3
+
+
+def test_at_in_a_gap_or_out_of_range_picks_the_nearest_start():
+    assert INDEX.at(22) == 2     # start 30 is closer than start 10
+    assert INDEX.at(-5) == 0
+    assert INDEX.at(500) == 3
+    assert TimeIndex([], []).at(3) == -1
+
+
+def test_window_returns_overlapping_range():
+    assert INDEX.window(35, 10, 0) == (2, 3)      # [25, 35] → only the third chunk
+    assert INDEX.window(15, 0, 20) == (1, 3)      # [15, 35]
+    assert INDEX.window(25, 2, 2) == (2, 2)       # inside the gap: empty
+
+
+# Timestamp-aware retrieval on fxAcidBas01: chunks [0, 115.93) [115.93, 249.11) [249.11, 351.19)
+VIDEO = "fxAcidBas01"
+
+
+def test_auto_mode_only_restricts_on_deictic_phrases():
+    from ai_tutor.rag_youtube import _DEICTIC
+
+    for question in ("What did she just say?", "Can you explain this part?", "What was mentioned earlier?"):
+        assert _DEICTIC.search(question), question
+    for question in ("Is this just for plants?", "Why does vinegar taste sour here in India?"):
+        assert not _DEICTIC.search(question), question
+
+
+def test_restrict_returns_only_window_chunks_in_playback_order(make_rag):
+    rag = make_rag()
+    rag.time_window = (30.0, 0.0)
+    chunks = rag.prepare_video(VIDEO)["chunks"]
+
+    # Closest to the last chunk, but the window [230, 260] covers chunks 1 and 2
+    results = rag._retrieve(VIDEO, "turmeric indicator turns red in a basic solution",
+                            top_k=5, timestamp=260, time_mode="restrict")
+    assert results == chunks[1:3]
+
+
+def test_boost_can_promote_a_window_chunk_above_the_global_top_k(make_rag):
+    rag = make_rag()
+    rag.time_window = (10.0, 10.0)
+    chunks = rag.prepare_video(VIDEO)["chunks"]
+    question = "vinegar contains acetic acid and lemon contains citric acid"
+
+    rag.time_boost = 1.0
+    assert rag._retrieve(VIDEO, question, top_k=1, timestamp=300, time_mode="boost") != [chunks[2]]
+    rag.time_boost = 0.01
+    assert rag._retrieve(VIDEO, question, top_k=1, timestamp=300, time_mode="boost") == [chunks[2]]
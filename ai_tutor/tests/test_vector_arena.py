@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pytest
+
+from ai_tutor.vector_arena import VectorArena, top_k
+
+
+def unit(rng, n, dim=16):
+    v = rng.normal(size=(n, dim)).astype("float32")
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_search_matches_brute_force_across_re_puts(tmp_path, mmap):
+    rng = np.random.default_rng(0)
+    arena = VectorArena(capacity=8, directory=tmp_path if mmap else None)
+    videos = {}
+    for step in range(60):
+        vid = f"v{step % 7}"
+        videos[vid] = unit(rng, int(rng.integers(1, 12)))
+        arena.put(vid, videos[vid])
+
+    q = unit(rng, 1)[0]
+    for vid, v in videos.items():
+        expected = ((v - q) ** 2).sum(axis=1)
+        got = arena.search(vid, q, 3)
+        assert [i for i, _ in got] == top_k(expected, 3)
+        assert np.allclose([d for _, d in got], np.sort(expected)[:3], atol=1e-5)
+
+
+def test_remove_frees_rows_and_compacts():
+    rng = np.random.default_rng(1)
+    arena = VectorArena(capacity=4)
+    for i in range(300):
+        arena.put(f"v{i}", unit(rng, 10))
+    before = arena.stats()
+    for i in range(250):
+        arena.remove(f"v{i}")
+    after = arena.stats()
+    assert after["videos"] == 50 and after["rows"] == 500
+    assert after["live_bytes"] < before["live_bytes"]
+    assert after["dead_rows"] < 1024 and after["capacity"] < before["capacity"]
+    with pytest.raises(KeyError):
+        arena.distances("v0", unit(rng, 1)[0])
+
+
+def test_iter_all_is_global_nearest_first():
+    rng = np.random.default_rng(2)
+    arena = VectorArena()
+    for i in range(5):
+        arena.put(f"v{i}", unit(rng, 4))
+    arena.remove("v3")
+    q = unit(rng, 1)[0]
+    hits = list(arena.iter_all(q))
+    assert len(hits) == 16 and "v3" not in {h[0] for h in hits}
+    assert [h[2] for h in hits] == sorted(h[2] for h in hits)
+    assert list(arena.iter_all(q, allowed={"v1"})) == [h for h in hits if h[0] == "v1"]
+
+
+def test_remove_with_a_stale_slot_keeps_the_newer_put():
+    rng = np.random.default_rng(3)
+    arena = VectorArena()
+    old = arena.put("v", unit(rng, 3))
+    new = arena.put("v", unit(rng, 5))
+    assert new != old
+    assert arena.remove("v", expected=old) is False
+    assert arena.stats()["rows"] == 5
+    assert arena.remove("v", expected=new) is True
+    assert "v" not in arena and arena.remove("v") is False
+
+
+def test_mmap_files_do_not_outlive_their_generation(tmp_path, monkeypatch):
+    import ai_tutor.vector_arena as vector_arena
+
+    (tmp_path / "arena.123.7.f32").write_bytes(b"\0" * 64)   # left by an earlier run
+    arena = VectorArena(capacity=4, directory=tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+    # Windows: a file cannot be deleted while it is mapped (the current generation,
+    # and the one being allocated)
+    real_remove = os.remove
+
+    def remove(path):
+        mapped = {f"arena.{os.getpid()}.{arena._generation}.f32"}
+        if arena._data is not None:
+            mapped.add(os.path.basename(arena._data.filename))
+        if os.path.basename(path) in mapped:
+            raise PermissionError(path)
+        real_remove(path)
+
+    monkeypatch.setattr(vector_arena.os, "remove", remove)
+    rng = np.random.default_rng(4)
+    for i in range(40):
+        arena.put(f"v{i}", unit(rng, 3))
+    assert arena._generation > 3
+    assert [p.name for p in tmp_path.iterdir()] == [os.path.basename(arena._data.filename)]
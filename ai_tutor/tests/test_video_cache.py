@@ -0,0 +1,64 @@
+from ai_tutor.video_cache import PreparedVideoCache, record_bytes
+
+
+def rec(text, vector_bytes=0):
+    return {"chunks": [text], "starts": [0.0], "ends": [1.0], "vector_bytes": vector_bytes}
+
+
+def test_arena_rows_are_charged():
+    assert record_bytes(rec("abcd", vector_bytes=1536)) == 4 + 16 + 1536
+
+
+def test_lru_evicts_least_recently_used_and_reports_it():
+    evicted = []
+    cache = PreparedVideoCache(max_bytes=2 * record_bytes(rec("x" * 100)),
+                               on_evict=lambda vid, r: evicted.append(vid))
+    cache.put("a", rec("x" * 100))
+    cache.put("b", rec("x" * 100))
+    cache.get("a")
+    cache.put("c", rec("x" * 100))
+    assert evicted == ["b"]
+    assert "a" in cache and "c" in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_frees_arena_rows_and_reloads_from_disk(make_rag):
+    rag = make_rag(max_bytes=1)   # every put evicts all but the newest video
+    rag.prepare_video("fxAcidBas01")
+    rag.prepare_video("fxPhotosy02")
+    newest = rag.prepare_video("fxForceMo03")
+    after = rag.arena.stats()
+
+    assert after["videos"] == 1 and "fxForceMo03" in rag.arena
+    assert after["rows"] == len(newest["chunks"]) and after["dead_rows"] > 0
+    assert rag.store.exists("fxAcidBas01")
+    assert rag.cache_stats()["bytes"] == record_bytes(newest) > newest["vector_bytes"] > 0
+
+    # Next use loads it back from disk, into the arena and the global index
+    rag.prepare_video("fxAcidBas01")
+    assert "fxAcidBas01" in rag.arena and "fxAcidBas01" in rag.global_index
+    assert "fxForceMo03" not in rag.arena
+
+
+def test_retrieval_survives_rows_freed_mid_request(make_rag):
+    rag = make_rag()
+    rag.prepare_video("fxAcidBas01")
+    expected = rag._retrieve("fxAcidBas01", "what is a base", top_k=2)
+    rag.arena.remove("fxAcidBas01")   # as if evicted right after _retrieve fetched the record
+    assert rag._retrieve("fxAcidBas01", "what is a base", top_k=2) == expected
+    assert "fxAcidBas01" in rag.arena   # still in the LRU, so its rows are restored
+
+
+def test_late_eviction_of_an_old_record_keeps_the_reloaded_video(make_rag):
+    rag = make_rag()
+    stale = rag.prepare_video("fxAcidBas01")
+    # Evicted, then prepared again before the eviction hook got to free its rows
+    rag._videos._entries.pop("fxAcidBas01")
+    fresh = rag._index_record("fxAcidBas01", rag.store.load("fxAcidBas01", rag.embed_model_name))
+    rag.global_index.add("fxAcidBas01", fresh)
+
+    rag._spill_to_disk("fxAcidBas01", stale)
+    assert "fxAcidBas01" in rag.arena and "fxAcidBas01" in rag.global_index
+
+    rag._spill_to_disk("fxAcidBas01", fresh)
+    assert "fxAcidBas01" not in rag.arena and "fxAcidBas01" not in rag.global_index
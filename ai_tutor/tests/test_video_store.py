@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+import pytest
+
+from ai_tutor.video_store import VideoStore, is_valid_video_id
+
+VIDEO = "fxAcidBas01"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return VideoStore(tmp_path / "store", legacy_dir=None)
+
+
+def record(n=3, dim=4):
+    return {
+        "segments": [],
+        "chunks": [f"chunk {i}" for i in range(n)],
+        "starts": [float(i) for i in range(n)],
+        "ends": [float(i + 1) for i in range(n)],
+        "vectors": np.ones((n, dim), "float32"),
+    }
+
+
+@pytest.mark.parametrize("video_id", [
+    "dQw4w9WgXcQ", "a-b_c-d_e-f",
+])
+def test_accepts_youtube_ids(video_id):
+    assert is_valid_video_id(video_id)
+
+
+@pytest.mark.parametrize("video_id", [
+    "../../../etc", "../../pwned", "dQw4w9WgXc", "dQw4w9WgXcQQ", "dQw4w9WgXc/",
+    "dQw4w9WgXcQ\n", "", None, 12345678901,
+])
+def test_rejects_anything_else(video_id):
+    assert not is_valid_video_id(video_id)
+
+
+@pytest.mark.parametrize("op", ["path", "exists", "lock", "save", "load"])
+def test_store_refuses_traversal(store, op):
+    bad = "../../../revtest_pwned"
+    with pytest.raises(ValueError):
+        if op == "lock":
+            with store.lock(bad):
+                pass
+        elif op == "save":
+            store.save(bad, record(), "m")
+        elif op == "load":
+            store.load(bad, "m")
+        else:
+            getattr(store, op)(bad)
+
+
+def test_round_trip_and_listing(store):
+    store.save(VIDEO, record(), "m")
+    os.makedirs(os.path.join(store.root, "not-a-video-dir"))
+    loaded = store.load(VIDEO, "m")
+    assert loaded["chunks"] == ["chunk 0", "chunk 1", "chunk 2"]
+    assert loaded["vectors"].shape == (3, 4)
+    assert store.video_ids() == [VIDEO]
+
+
+def test_lock_is_exclusive_and_leaves_no_file(store):
+    import threading
+    import time
+
+    inside, overlaps = [0], []
+
+    def hold():
+        with store.lock(VIDEO):
+            inside[0] += 1
+            overlaps.append(inside[0])
+            time.sleep(0.02)
+            inside[0] -= 1
+
+    threads = [threading.Thread(target=hold) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert overlaps == [1] * 6
+    assert not [n for n in os.listdir(store.root) if n.endswith(".lock")]
+
+
+def test_lock_file_removed_when_the_build_fails(store):
+    with pytest.raises(RuntimeError):
+        with store.lock(VIDEO):
+            raise RuntimeError("build failed")
+    assert not os.path.exists(os.path.join(store.root, f"{VIDEO}.lock"))
@@ -0,0 +1,46 @@
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from ai_tutor import views
+
+factory = APIRequestFactory()
+
+
+@pytest.mark.parametrize("view, body", [
+    (views.YouTubePrepareView, {"video_id": "../../../revtest_pwned"}),
+    (views.YouTubeAskView, {"video_id": "../x", "question": "What is an acid?"}),
+])
+def test_invalid_video_id_is_a_400(view, body):
+    response = view.as_view()(factory.post("/", body, format="json"))
+    assert response.status_code == 400
+    assert "video_id" in response.data["detail"]
+
+
+def test_set_context_response_hides_internal_session_fields():
+    from ai_tutor import controller
+
+    sid = controller.new_session()
+    sess = controller.SESSIONS.get(sid)
+    sess.update({
+        "history": [{"role": "user", "content": "earlier question"}],
+        "summary": "earlier summary",
+        "prefetched_video": "fxAcidBas01",
+        "warm_pool": [1, 2, 3],
+    })
+    controller.SESSIONS.save(sid, sess)
+
+    body = {"session_id": sid, "topic": "Acids, Bases and Salts", "keywords": ["acid"]}
+    response = views.SetContextView.as_view()(factory.post("/", body, format="json"))
+    assert response.status_code == 200
+    session = response.data["session"]
+    assert session["topic"] == "Acids, Bases and Salts"
+    assert not set(session) & controller.INTERNAL_SESSION_FIELDS
+    assert not {"history", "summary", "prefetched_video"} & set(session)
+
+
+@pytest.mark.parametrize("timestamp", ["soon", -3, "nan", [1]])
+def test_ask_rejects_a_bad_timestamp(timestamp):
+    body = {"video_id": "fxAcidBas01", "question": "What is an acid?", "timestamp": timestamp}
+    response = views.YouTubeAskView.as_view()(factory.post("/", body, format="json"))
+    assert response.status_code == 400
+    assert "timestamp" in response.data["detail"]
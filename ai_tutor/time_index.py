@@ -0,0 +1,45 @@
+# ai_tutor/time_index.py
+"""
+Interval lookup over a video's chunks (start/end seconds), for timestamp-aware
+retrieval in YouTubeRAG.
+
+Starts are kept sorted (chunks are built in time order) together with a running
+maximum of the ends, so both lookups are binary searches:
+- at(t)                  → the chunk playing at t (or the nearest one)
+- window(t, before, after) → chunk range [lo, hi) overlapping [t - before, t + after]
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Sequence, Tuple
+
+
+class TimeIndex:
+    def __init__(self, starts: Sequence[float], ends: Sequence[float]):
+        self.starts = [float(s) for s in starts]
+        self._max_ends = []
+        running = float("-inf")
+        for e, s in zip(ends, self.starts):
+            running = max(running, float(e if e is not None else s))
+            self._max_ends.append(running)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def at(self, t: float) -> int:
+        """Index of the chunk containing t, else the one whose start is closest (-1 if empty)."""
+        n = len(self.starts)
+        if n == 0:
+            return -1
+        i = bisect_right(self.starts, t) - 1
+        if i < 0:
+            return 0
+        if t <= self._max_ends[i] or i == n - 1:
+            return i
+        # in a gap between chunks: nearest start wins (matches the old linear scan)
+        return i if t - self.starts[i] <= self.starts[i + 1] - t else i + 1
+
+    def window(self, t: float, before: float, after: float) -> Tuple[int, int]:
+        """[lo, hi) of chunks overlapping [t - before, t + after]; empty if none."""
+        lo = bisect_left(self._max_ends, t - before)
+        hi = bisect_right(self.starts, t + after)
+        return lo, max(lo, hi)
@@ -0,0 +1,187 @@
+# ai_tutor/transcription.py
+"""
+Parallel chunked transcription for long videos (Whisper fallback).
+
+1. decode the audio once to 16 kHz mono float32 (ffmpeg)
+2. split it into ~AI_TUTOR_WHISPER_WINDOW-second windows, cutting at the
+   quietest point near each boundary so words are not split
+3. transcribe the windows in a process pool; each worker loads the STT engine
+   (ai_tutor.stt, AI_TUTOR_STT_BACKEND) ONCE in the pool initializer and keeps
+   it for every later window / video
+4. shift each window's segments by its offset and stitch them back in order
+   (iter_transcribe* yields them window by window, for pipelined preparation;
+   iter_transcribe_stream cuts windows from PCM as it is still being decoded)
+
+Segments come back as [{'start', 'end', 'text'}], the format YouTubeRAG uses.
+"""
+
+import os
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Tuple
+
+from .conf import get_setting
+
+SAMPLE_RATE = 16000
+_FRAME = SAMPLE_RATE // 40          # 25 ms energy frames
+
+
+def decode_audio(path: str, sr: int = SAMPLE_RATE):
+    """Any ffmpeg-readable file → float32 mono PCM in [-1, 1] at sr Hz."""
+    import numpy as np
+
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-i", path,
+           "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr), "-"]
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def split_on_silence(audio, sr: int = SAMPLE_RATE, window_s: float = 60.0, search_s: float = 10.0) -> List[Tuple[int, int]]:
+    """
+    [(start_sample, end_sample)] covering the whole signal. Each cut is placed at
+    the lowest-energy 25 ms frame within ±search_s of the nominal window boundary.
+    """
+    import numpy as np
+
+    n = len(audio)
+    window = int(window_s * sr)
+    if n <= window + search_s * sr:
+        return [(0, n)]
+
+    n_frames = n // _FRAME
+    energy = (audio[: n_frames * _FRAME].reshape(n_frames, _FRAME) ** 2).mean(axis=1)
+
+    bounds = []
+    start = 0
+    while n - start > window + search_s * sr:
+        lo = (start + window - int(search_s * sr)) // _FRAME
+        hi = min((start + window + int(search_s * sr)) // _FRAME, n_frames)
+        cut = (lo + int(np.argmin(energy[lo:hi]))) * _FRAME
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, n))
+    return bounds
+
+
+# ================================================================
+#  WORKER PROCESS
+# ================================================================
+
+_worker_engine = None
+
+
+def _init_worker(backend: str, model_size: str, threads: int):
+    global _worker_engine
+    from .stt import load_engine
+
+    _worker_engine = load_engine(backend, model_size, threads=max(1, threads))
+
+
+def _transcribe_window(job) -> List[Dict]:
+    audio, offset = job
+    return [
+        {"start": round(s["start"] + offset, 3), "end": round(s["end"] + offset, 3), "text": s["text"]}
+        for s in _worker_engine.transcribe_array(audio)
+    ]
+
+
+# ================================================================
+#  PUBLIC
+# ================================================================
+
+class ParallelTranscriber:
+    def __init__(self, model_size: str = "base", workers: int = None, window_s: float = 60.0, backend: str = "whisper"):
+        cpus = os.cpu_count() or 1
+        self.backend = backend
+        self.model_size = model_size
+        self.workers = workers or max(1, cpus // 2)
+        self.window_s = window_s
+        self._threads_per_worker = max(1, cpus // self.workers)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: PyTorch is not fork-safe once initialised in the parent
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.backend, self.model_size, self._threads_per_worker),
+                )
+            return self._pool
+
+    def iter_transcribe_array(self, audio, sr: int = SAMPLE_RATE) -> Iterator[Dict]:
+        """Segments in order, yielded as soon as each window (and all before it) is done."""
+        windows = split_on_silence(audio, sr, self.window_s)
+        jobs = [(audio[a:b], a / sr) for a, b in windows]
+        for part in self._get_pool().map(_transcribe_window, jobs):
+            yield from part
+
+    def iter_transcribe(self, path: str) -> Iterator[Dict]:
+        return self.iter_transcribe_array(decode_audio(path))
+
+    def iter_transcribe_stream(self, blocks, sr: int = SAMPLE_RATE, search_s: float = 10.0) -> Iterator[Dict]:
+        """
+        Like iter_transcribe_array, but for PCM arriving in blocks (ai_tutor.audio.stream_pcm):
+        each window is cut at a silence and submitted as soon as enough audio is buffered,
+        so transcription overlaps the download/decode.
+        """
+        import numpy as np
+
+        pool = self._get_pool()
+        pending = deque()
+        buf = np.zeros(0, np.float32)
+        offset = 0   # samples before buf
+
+        for block in blocks:
+            buf = np.concatenate([buf, block])
+            bounds = split_on_silence(buf, sr, self.window_s, search_s)
+            # every window but the last is final; the last may still grow
+            for a, b in bounds[:-1]:
+                pending.append(pool.submit(_transcribe_window, (buf[a:b], (offset + a) / sr)))
+            if len(bounds) > 1:
+                cut = bounds[-1][0]
+                buf, offset = buf[cut:], offset + cut
+            while pending and pending[0].done():
+                yield from pending.popleft().result()
+
+        if len(buf):
+            pending.append(pool.submit(_transcribe_window, (buf, offset / sr)))
+        while pending:
+            yield from pending.popleft().result()
+
+    def transcribe_array(self, audio, sr: int = SAMPLE_RATE) -> List[Dict]:
+        return list(self.iter_transcribe_array(audio, sr))
+
+    def transcribe(self, path: str) -> List[Dict]:
+        return self.transcribe_array(decode_audio(path))
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+_transcribers: Dict[tuple, ParallelTranscriber] = {}
+_transcribers_lock = threading.Lock()
+
+
+def get_transcriber(model_size: str = "base", backend: str = None) -> ParallelTranscriber:
+    """Process-wide transcriber per (backend, model size), so worker models stay loaded between videos."""
+    backend = backend or get_setting("AI_TUTOR_STT_BACKEND", "whisper")
+    with _transcribers_lock:
+        t = _transcribers.get((backend, model_size))
+        if t is None:
+            t = _transcribers[(backend, model_size)] = ParallelTranscriber(
+                model_size,
+                workers=get_setting("AI_TUTOR_WHISPER_WORKERS"),
+                window_s=get_setting("AI_TUTOR_WHISPER_WINDOW", 60.0),
+                backend=backend,
+            )
+        return t
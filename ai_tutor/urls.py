@@ -4,12 +4,18 @@ from .views import (
     # YouTube endpoints
     YouTubeSearchView,
     YouTubePrepareView,
+    YouTubePrepareStatusView,
     YouTubeAskView,
+    PreparedVideoSearchView,
 
     # AI Tutor endpoints
     StartSessionView,
     SetContextView,
-    ChatView
+    ChatView,
+
+    # Ops
+    MetricsView,
+    VideoCacheStatsView,
 )
 
 urlpatterns = [
@@ -18,7 +24,9 @@ urlpatterns = [
     # -------------------------
     path("search/", YouTubeSearchView.as_view()),
     path("prepare/", YouTubePrepareView.as_view()),
+    path("prepare/<str:job_id>/", YouTubePrepareStatusView.as_view()),
     path("ask/", YouTubeAskView.as_view()),
+    path("videos/search/", PreparedVideoSearchView.as_view()),
 
     # -------------------------
     # AI Tutor API
@@ -26,4 +34,10 @@ urlpatterns = [
     path("start_session/", StartSessionView.as_view()),
     path("set_context/", SetContextView.as_view()),
     path("chat/", ChatView.as_view()),
+
+    # -------------------------
+    # Ops
+    # -------------------------
+    path("metrics/", MetricsView.as_view()),
+    path("ops/video_cache/", VideoCacheStatsView.as_view()),
 ]
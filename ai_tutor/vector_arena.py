@@ -0,0 +1,282 @@
+# ai_tutor/vector_arena.py
+"""
+One contiguous float32 arena for every prepared video's chunk vectors.
+
+Replaces a faiss.IndexFlatL2 plus a duplicate `vectors` array per video: a video
+owns rows [offset, offset + n) of the arena (offset table), and search is a
+vectorised L2 over that slice,
+
+    ‖v - q‖² = ‖v‖² - 2·v·q + ‖q‖²
+
+with the row norms precomputed, so each query is one BLAS matrix-vector product.
+The same arena backs ai_tutor.global_index (all live rows at once).
+
+Appends only ever write past the rows readers can see, and growth / compaction
+build a new array, so a search works on a consistent snapshot without holding
+the lock. Re-putting or removing a video leaves its old rows dead until
+compaction, which runs once dead rows outnumber live ones.
+
+Every put gets a new slot number (offsets move on compaction, slots do not), so
+a caller holding an old record can remove(video_id, expected=slot) without
+freeing rows a newer put has since replaced.
+
+With AI_TUTOR_VECTOR_ARENA_DIR set, the arena is a numpy memmap in that
+directory (one file per generation), so the OS can page cold videos out. Files
+are unlinked right away where the OS allows it (POSIX); otherwise (Windows) a
+generation's file is deleted once a rebuild replaces it, and leftovers of
+earlier runs are cleared when an arena starts on the directory.
+"""
+
+import itertools
+import os
+import threading
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .conf import get_setting
+
+
+def l2_distances(vectors, q, norms=None):
+    """
+    Squared L2 distance of every row of vectors to q (1-D), without a temp (n, dim)
+    array. norms: the rows' precomputed squared norms, if known.
+    """
+    import numpy as np
+
+    if not len(vectors):
+        return np.zeros(0, "float32")
+    if norms is None:
+        norms = np.einsum("ij,ij->i", vectors, vectors)
+    d = norms - 2.0 * (vectors @ q) + float(q @ q)
+    return np.maximum(d, 0.0)
+
+
+def top_k(distances, k: int) -> List[int]:
+    """Indices of the k smallest distances, nearest first."""
+    import numpy as np
+
+    if k >= len(distances):
+        return [int(i) for i in np.argsort(distances)]
+    part = np.argpartition(distances, k)[:k]
+    return [int(i) for i in part[np.argsort(distances[part])]]
+
+
+class VectorArena:
+    def __init__(self, dim: Optional[int] = None, capacity: int = 1024, directory: Optional[str] = None):
+        self.dim = dim
+        self.directory = str(directory) if directory else None
+        self._capacity = capacity
+        self._data = None                     # (capacity, dim) float32, ndarray or memmap
+        self._norms = None                    # (capacity,) float32
+        self._live = None                     # (capacity,) bool
+        self._size = 0
+        self._dead = 0
+        self._generation = 0
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._slots: Dict[str, int] = {}      # video_id → slot of its current put
+        self._next_slot = itertools.count(1)
+        self._lock = threading.Lock()
+        self._files: List[str] = []           # memmap files not deleted yet (still mapped on Windows)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._files = [
+                os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if name.startswith("arena.") and name.endswith(".f32")
+            ]
+            self._delete_files()
+
+    # ----------------------------------------------------
+    # STORAGE
+    # ----------------------------------------------------
+    def _allocate(self, capacity: int):
+        import numpy as np
+
+        if self.directory:
+            self._generation += 1
+            path = os.path.join(self.directory, f"arena.{os.getpid()}.{self._generation}.f32")
+            data = np.memmap(path, dtype="float32", mode="w+", shape=(capacity, self.dim))
+            # The mapping stays valid after unlink (POSIX); Windows refuses while mapped
+            self._files.append(path)
+            self._delete_files()
+        else:
+            data = np.empty((capacity, self.dim), dtype="float32")
+        return data, np.zeros(capacity, "float32"), np.zeros(capacity, bool)
+
+    def _delete_files(self):
+        """Delete pending memmap files; the ones still mapped are retried next time."""
+        remaining = []
+        for path in self._files:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                remaining.append(path)
+        self._files = remaining
+
+    def _reserve(self, n: int):
+        """Caller holds the lock. Ensure room for n more rows."""
+        if self._data is None or self._size + n > len(self._data):
+            self._rebuild(n)
+
+    def _rebuild(self, extra: int):
+        """Caller holds the lock. New arrays holding only live rows, with room for extra more."""
+        live_rows = self._size - self._dead
+        capacity = max(self._capacity, 2 * (live_rows + extra))
+        data, norms, live = self._allocate(capacity)
+
+        # Copy live videos only: growth doubles as compaction
+        pos = 0
+        offsets = {}
+        for video_id, (off, cnt) in self._offsets.items():
+            data[pos:pos + cnt] = self._data[off:off + cnt]
+            norms[pos:pos + cnt] = self._norms[off:off + cnt]
+            live[pos:pos + cnt] = True
+            offsets[video_id] = (pos, cnt)
+            pos += cnt
+        self._data, self._norms, self._live = data, norms, live
+        self._offsets, self._size, self._dead = offsets, pos, 0
+        if self._files:
+            self._delete_files()   # the previous generation's file, now that it is replaced
+
+    def put(self, video_id: str, vectors) -> int:
+        """Store (replace) a video's vectors; returns the slot of this put."""
+        import numpy as np
+
+        vectors = np.asarray(vectors, dtype="float32")
+        if vectors.ndim != 2:
+            raise ValueError("vectors must be (n, dim)")
+        n = len(vectors)
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"dim {vectors.shape[1]} != arena dim {self.dim}")
+
+            self._kill(video_id)
+            if self._dead > max(1024, self._size // 2):
+                self._rebuild(n)
+            else:
+                self._reserve(n)
+
+            off = self._size
+            self._data[off:off + n] = vectors
+            self._norms[off:off + n] = np.einsum("ij,ij->i", vectors, vectors)
+            self._live[off:off + n] = True
+            self._size += n
+            self._offsets[video_id] = (off, n)
+            slot = self._slots[video_id] = next(self._next_slot)
+            return slot
+
+    def _kill(self, video_id: str):
+        """Caller holds the lock."""
+        old = self._offsets.pop(video_id, None)
+        self._slots.pop(video_id, None)
+        if old is not None:
+            off, n = old
+            self._live[off:off + n] = False
+            self._dead += n
+
+    def remove(self, video_id: str, expected: Optional[int] = None) -> bool:
+        """
+        Free a video's rows. With expected, only if they are still those of that
+        put (slot); returns whether anything was removed.
+        """
+        with self._lock:
+            if video_id not in self._offsets:
+                return False
+            if expected is not None and self._slots.get(video_id) != expected:
+                return False
+            self._kill(video_id)
+            if self._dead > max(1024, self._size // 2):
+                self._rebuild(0)
+            return True
+
+    def __contains__(self, video_id: str) -> bool:
+        return video_id in self._offsets
+
+    def view(self, video_id: str):
+        """The video's rows (no copy), or None."""
+        with self._lock:
+            loc = self._offsets.get(video_id)
+            return None if loc is None else self._data[loc[0]:loc[0] + loc[1]]
+
+    def rows(self, video_id: str):
+        """(vectors, squared norms) of the video (no copy), or None. Stays valid after removal."""
+        with self._lock:
+            loc = self._offsets.get(video_id)
+            if loc is None:
+                return None
+            off, n = loc
+            return self._data[off:off + n], self._norms[off:off + n]
+
+    # ----------------------------------------------------
+    # SCORING
+    # ----------------------------------------------------
+    def distances(self, video_id: str, q, lo: int = 0, hi: Optional[int] = None):
+        """Squared L2 from q to the video's chunks [lo, hi) (chunk order)."""
+        import numpy as np
+
+        rows = self.rows(video_id)
+        if rows is None:
+            raise KeyError(video_id)
+        vectors, norms = rows
+        q = np.asarray(q, dtype="float32").reshape(-1)
+        return l2_distances(vectors[lo:hi], q, norms[lo:hi])
+
+    def search(self, video_id: str, q, k: int) -> List[Tuple[int, float]]:
+        """[(chunk index, squared L2)] nearest first, within one video."""
+        d = self.distances(video_id, q)
+        return [(i, float(d[i])) for i in top_k(d, k)]
+
+    def iter_all(self, q, allowed: Optional[set] = None) -> Iterator[Tuple[str, int, float]]:
+        """(video_id, chunk index, squared L2) over every live row, nearest first."""
+        import numpy as np
+
+        with self._lock:
+            if self._data is None or not self._offsets:
+                return
+            size = self._size
+            data, norms, live = self._data, self._norms, self._live
+            table = sorted((off, n, vid) for vid, (off, n) in self._offsets.items())
+        q = np.asarray(q, dtype="float32").reshape(-1)
+        d = norms[:size] - 2.0 * (data[:size] @ q) + float(q @ q)
+        d = np.where(live[:size], np.maximum(d, 0.0), np.inf)
+
+        starts = [t[0] for t in table]
+        for row in np.argsort(d):
+            if not np.isfinite(d[row]):
+                break
+            t = table[bisect_right(starts, int(row)) - 1]
+            if allowed is not None and t[2] not in allowed:
+                continue
+            yield t[2], int(row) - t[0], float(d[row])
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "videos": len(self._offsets),
+                "rows": self._size - self._dead,
+                "live_bytes": (self._size - self._dead) * (self.dim or 0) * 4,
+                "dead_rows": self._dead,
+                "capacity": 0 if self._data is None else len(self._data),
+                "bytes": 0 if self._data is None else int(self._data.nbytes),
+                "mmap": bool(self.directory),
+            }
+
+
+_arenas: Dict[str, VectorArena] = {}
+_arenas_lock = threading.Lock()
+
+
+def get_vector_arena(embed_model: str = "all-MiniLM-L6-v2") -> VectorArena:
+    """Process-wide arena per embedding model, shared by YouTubeRAG and the global index."""
+    with _arenas_lock:
+        arena = _arenas.get(embed_model)
+        if arena is None:
+            directory = get_setting("AI_TUTOR_VECTOR_ARENA_DIR")
+            arena = _arenas[embed_model] = VectorArena(
+                directory=os.path.join(str(directory), embed_model) if directory else None,
+            )
+        return arena
@@ -0,0 +1,102 @@
+# ai_tutor/video_cache.py
+"""
+Size-bounded LRU of prepared videos held in memory by YouTubeRAG.
+
+Each entry is charged for its chunk text and timestamps, plus its vectors: the
+record's own vectors / FAISS index if it carries them, or "vector_bytes" for
+rows held in the shared ai_tutor.vector_arena (YouTubeRAG frees those rows on
+eviction). When the total passes
+AI_TUTOR_VIDEO_CACHE_MAX_BYTES, least-recently-used videos are handed to
+on_evict (YouTubeRAG makes sure they are on disk) and dropped; the next request
+for them reloads from ai_tutor.video_store instead of re-transcribing.
+
+Hits, misses and evictions are counted in ai_tutor.metrics (video_cache.*).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from . import metrics
+
+
+def record_bytes(rec: Dict[str, Any]) -> int:
+    size = 0
+    vectors = rec.get("vectors")
+    if vectors is not None:
+        size += int(getattr(vectors, "nbytes", 0))
+    index = rec.get("index")
+    if index is not None:
+        size += int(getattr(index, "ntotal", 0)) * int(getattr(index, "d", 0)) * 4
+    size += int(rec.get("vector_bytes", 0))
+    size += sum(len(t.encode("utf-8")) for t in rec.get("chunks", []))
+    size += 8 * (len(rec.get("starts", [])) + len(rec.get("ends", [])))
+    return size
+
+
+class PreparedVideoCache:
+    def __init__(self, max_bytes: int, on_evict: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, video_id: str) -> bool:
+        with self._lock:
+            return video_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            rec = self._entries.get(video_id)
+            if rec is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(video_id)
+                self.hits += 1
+        metrics.incr("video_cache.hits" if rec is not None else "video_cache.misses")
+        return rec
+
+    def put(self, video_id: str, rec: Dict[str, Any]):
+        size = record_bytes(rec)
+        evicted = []
+        with self._lock:
+            if video_id in self._entries:
+                self._bytes -= self._sizes[video_id]
+            self._entries[video_id] = rec
+            self._entries.move_to_end(video_id)
+            self._sizes[video_id] = size
+            self._bytes += size
+
+            # Keep at least the entry just added, even if it alone exceeds the ceiling
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                old_id, old_rec = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_id)
+                self.evictions += 1
+                evicted.append((old_id, old_rec))
+
+        for old_id, old_rec in evicted:
+            metrics.incr("video_cache.evictions")
+            if self.on_evict is not None:
+                try:
+                    self.on_evict(old_id, old_rec)
+                except Exception as err:
+                    print(f"[ai_tutor.video_cache] on_evict failed for {old_id}: {err}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,218 @@
+# ai_tutor/video_store.py
+"""
+Persistent on-disk store of prepared YouTube videos, so each video is
+transcribed (captions or Whisper), chunked and embedded once per deployment.
+
+Layout (STORE_VERSION bumps whenever chunking or the record format changes):
+    <root>/v<STORE_VERSION>/<video_id>/
+        meta.json       {"version", "video_id", "embed_model", "dim", "n_chunks", "created", "timings"}
+        segments.json   [{"start", "end", "text"}, ...]
+        chunks.json     {"texts": [...], "starts": [...], "ends": [...]}
+        vectors.npy     float32 (n_chunks, dim)
+
+Each video directory is written to a temp directory and renamed into place,
+so readers never see a half-written record. lock(video_id) is an exclusive
+file lock (<root>/v<N>/<video_id>.lock, removed on release) that lets workers
+sharing the store agree on who prepares a video while the others wait and
+then load it.
+
+Video ids are checked against YouTube's id format (11 of [A-Za-z0-9_-]) before
+they touch the filesystem; anything else raises ValueError.
+
+Also reads the per-video files YouTubeService.build_and_save_video_index writes
+(video_indices/video_<id>.index + _metadata.pkl) when no store record exists.
+"""
+
+import json
+import os
+import pickle
+import re
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+STORE_VERSION = 1
+
+VIDEO_ID_RE = re.compile(r"[A-Za-z0-9_-]{11}")
+
+
+def is_valid_video_id(video_id) -> bool:
+    return isinstance(video_id, str) and VIDEO_ID_RE.fullmatch(video_id) is not None
+
+
+def check_video_id(video_id) -> str:
+    if not is_valid_video_id(video_id):
+        raise ValueError(f"Invalid YouTube video id: {video_id!r}")
+    return video_id
+
+
+class VideoStore:
+    def __init__(self, root="video_cache", legacy_dir="video_indices"):
+        self.root = os.path.join(str(root), f"v{STORE_VERSION}")
+        self.legacy_dir = str(legacy_dir) if legacy_dir else None
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, video_id: str) -> str:
+        return os.path.join(self.root, check_video_id(video_id))
+
+    def exists(self, video_id: str) -> bool:
+        return os.path.exists(os.path.join(self.path(video_id), "meta.json"))
+
+    def video_ids(self, newest_first: bool = False):
+        """Ids of complete records in this store version (legacy files not included)."""
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        ids = [n for n in names if is_valid_video_id(n) and self.exists(n)]
+        if newest_first:
+            ids.sort(key=lambda n: os.path.getmtime(os.path.join(self.root, n, "meta.json")), reverse=True)
+        return ids
+
+    @contextmanager
+    def lock(self, video_id: str):
+        """
+        Exclusive cross-process lock for preparing video_id (blocks until acquired).
+        The lock file is removed on release, so the store does not collect one per
+        video ever requested.
+        """
+        path = os.path.join(self.root, f"{check_video_id(video_id)}.lock")
+        if sys.platform == "win32":
+            import msvcrt
+            f = open(path, "a+b")
+            try:
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:   # LK_LOCK gives up after ~10s; keep waiting
+                        continue
+                try:
+                    yield
+                finally:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                f.close()
+                try:
+                    os.remove(path)   # fails while another worker has it open; it cleans up
+                except OSError:
+                    pass
+            return
+
+        import fcntl
+        while True:
+            f = open(path, "a+b")
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            # The previous holder may have unlinked the file while we waited on it;
+            # only a lock on the file currently at `path` counts
+            try:
+                if os.path.samestat(os.fstat(f.fileno()), os.stat(path)):
+                    break
+            except FileNotFoundError:
+                pass
+            f.close()
+        try:
+            yield
+        finally:
+            try:
+                os.remove(path)   # still holding the lock, so no one else owns this file
+            except OSError:
+                pass
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            f.close()
+
+    # ----------------------------------------------------
+    # SAVE
+    # ----------------------------------------------------
+    def save(self, video_id: str, record: Dict[str, Any], embed_model: str):
+        import numpy as np
+
+        check_video_id(video_id)
+        vectors = np.asarray(record["vectors"], dtype="float32")
+        tmp = tempfile.mkdtemp(prefix=f".{video_id}.", dir=self.root)
+        try:
+            with open(os.path.join(tmp, "segments.json"), "w", encoding="utf-8") as f:
+                json.dump(record.get("segments", []), f)
+            with open(os.path.join(tmp, "chunks.json"), "w", encoding="utf-8") as f:
+                json.dump({"texts": record["chunks"], "starts": record["starts"], "ends": record["ends"]}, f)
+            np.save(os.path.join(tmp, "vectors.npy"), vectors)
+            # meta.json last: its presence marks a complete record
+            with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": STORE_VERSION,
+                    "video_id": video_id,
+                    "embed_model": embed_model,
+                    "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+                    "n_chunks": len(record["chunks"]),
+                    "created": time.time(),
+                    "timings": record.get("timings"),
+                }, f)
+
+            final = self.path(video_id)
+            if os.path.exists(final):
+                shutil.rmtree(final, ignore_errors=True)
+            os.replace(tmp, final)
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    # ----------------------------------------------------
+    # LOAD
+    # ----------------------------------------------------
+    def load(self, video_id: str, embed_model: str) -> Optional[Dict[str, Any]]:
+        """Stored record for video_id, or None if missing / stale / built with another embedder."""
+        import numpy as np
+
+        base = self.path(video_id)
+        try:
+            with open(os.path.join(base, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != STORE_VERSION or meta.get("embed_model") != embed_model:
+                return None
+            with open(os.path.join(base, "chunks.json"), encoding="utf-8") as f:
+                chunks = json.load(f)
+            with open(os.path.join(base, "segments.json"), encoding="utf-8") as f:
+                segments = json.load(f)
+            vectors = np.load(os.path.join(base, "vectors.npy"))
+        except (OSError, ValueError):
+            return self._load_legacy(video_id, embed_model)
+
+        return {
+            "segments": segments,
+            "chunks": chunks["texts"],
+            "starts": chunks["starts"],
+            "ends": chunks["ends"],
+            "vectors": vectors.astype("float32", copy=False),
+            "timings": meta.get("timings"),
+        }
+
+    def _load_legacy(self, video_id: str, embed_model: str) -> Optional[Dict[str, Any]]:
+        """Index + metadata written by YouTubeService (always all-MiniLM-L6-v2)."""
+        if not self.legacy_dir or embed_model != "all-MiniLM-L6-v2":
+            return None
+        idx_path = os.path.join(self.legacy_dir, f"video_{video_id}.index")
+        meta_path = os.path.join(self.legacy_dir, f"video_{video_id}_metadata.pkl")
+        if not (os.path.exists(idx_path) and os.path.exists(meta_path)):
+            return None
+        try:
+            import faiss
+            index = faiss.read_index(idx_path)
+            with open(meta_path, "rb") as f:
+                metadata = pickle.load(f)
+        except Exception as err:
+            print(f"[ai_tutor.video_store] Could not read legacy index for {video_id}: {err}")
+            return None
+
+        rows = [metadata[i] for i in sorted(metadata)]
+        return {
+            "segments": [],
+            "chunks": [r["text"] for r in rows],
+            "starts": [float(r["start"]) for r in rows],
+            "ends": [float(r["end"]) for r in rows],
+            "vectors": index.reconstruct_n(0, index.ntotal).astype("float32"),
+        }
@@ -1,3 +1,6 @@
+import math
+import time
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -6,7 +9,13 @@ from rest_framework.permissions import AllowAny
 # -------------------------------
 # IMPORT RAG MODULES
 # -------------------------------
-from .rag_youtube import YouTubeRAG
+from .rag_youtube import get_youtube_rag, TIME_MODES
+from . import metrics
+from .scheduler import SchedulerBusy
+from .projection import shape_chat_response
+from .jobs import PrepareJobQueue
+from .video_store import is_valid_video_id
+from .conf import get_setting
 
 # -------------------------------
 # IMPORT AI TUTOR ORCHESTRATOR
@@ -15,13 +24,57 @@ from .controller import (
     new_session,
     set_session_context,
     get_session_context,
-    handle_student_query
+    handle_student_query,
+    public_session,
 )
 
 # -------------------------------
 # INITIALIZE YOUTUBE RAG
 # -------------------------------
-yt_rag = YouTubeRAG()
+yt_rag = get_youtube_rag()
+
+# Video preparation (captions / Whisper + embedding) runs off the request thread
+prepare_jobs = PrepareJobQueue(
+    yt_rag.prepare_video,
+    workers=get_setting("AI_TUTOR_PREPARE_WORKERS", 2),
+    ttl=get_setting("AI_TUTOR_PREPARE_JOB_TTL", 3600),
+)
+
+
+def wait_for_video(video_id: str):
+    """
+    Make sure video_id is (being) prepared and wait up to AI_TUTOR_PREPARE_WAIT seconds.
+    Returns None when it can be answered from (fully prepared, or partially indexed
+    while preparation continues), else a Response for the client.
+    """
+    if yt_rag.is_prepared(video_id):
+        return None
+
+    job = prepare_jobs.submit(video_id)
+    deadline = time.monotonic() + get_setting("AI_TUTOR_PREPARE_WAIT", 20.0)
+    # Stop waiting as soon as the first chunks are searchable
+    while not job.wait(0.25) and not yt_rag.is_queryable(video_id) and time.monotonic() < deadline:
+        pass
+
+    if job.state == "ready" or (job.active and yt_rag.is_queryable(video_id)):
+        return None
+    if job.state == "failed":
+        return Response({"detail": f"Video preparation failed: {job.error}", **job.to_dict()},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    return Response({"detail": "Video is still being prepared; poll the job and retry.", **job.to_dict()},
+                    status=status.HTTP_202_ACCEPTED)
+
+
+def invalid_video_id_response():
+    return Response({"detail": "video_id must be an 11-character YouTube video id"},
+                    status=status.HTTP_400_BAD_REQUEST)
+
+
+def busy_response(err: SchedulerBusy):
+    """HTTP 429 for an overloaded LLM scheduler."""
+    resp = Response({"detail": str(err)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+    resp["Retry-After"] = str(err.retry_after)
+    return resp
 
 
 # ==========================================================
@@ -37,14 +90,51 @@ class YouTubeSearchView(APIView):
         return Response(videos)
 
 
+class PreparedVideoSearchView(APIView):
+    """
+    GET /ai_tutor/videos/search/?q=...&k=10&per_video=1
+    Ranked (video, timestamp) hits across every already-prepared video.
+    """
+    def get(self, request):
+        query = request.query_params.get("q")
+        if not query:
+            return Response({"detail": "Missing ?q= parameter"}, status=400)
+        try:
+            k = max(1, min(int(request.query_params.get("k", 10)), 50))
+            per_video = request.query_params.get("per_video", "1")
+            per_video = int(per_video) if per_video not in ("", "0", "all") else None
+            min_score = float(request.query_params.get("min_score", 0.0))
+        except ValueError:
+            return Response({"detail": "k, per_video and min_score must be numbers"}, status=400)
+        hits = yt_rag.search_prepared(query, k=k, per_video=per_video, min_score=min_score)
+        return Response({"query": query, "results": hits})
+
+
 class YouTubePrepareView(APIView):
     def post(self, request):
         video_id = request.data.get("video_id")
         if not video_id:
             return Response({"detail": "video_id required"}, status=400)
+        if not is_valid_video_id(video_id):
+            return invalid_video_id_response()
 
-        yt_rag.prepare_video(video_id)
-        return Response({"status": "prepared"})
+        if yt_rag.is_prepared(video_id):
+            return Response({"status": "ready", "video_id": video_id, "progress": 1.0})
+
+        job = prepare_jobs.submit(video_id)
+        return Response(job.to_dict(), status=status.HTTP_202_ACCEPTED)
+
+
+class YouTubePrepareStatusView(APIView):
+    """
+    GET /ai_tutor/prepare/<job_id>/
+    status: queued | fetching | transcribing | embedding | ready | failed
+    """
+    def get(self, request, job_id):
+        job = prepare_jobs.get(job_id)
+        if job is None:
+            return Response({"detail": "Unknown job_id"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job.to_dict())
 
 
 class YouTubeAskView(APIView):
@@ -52,11 +142,30 @@ class YouTubeAskView(APIView):
         video_id = request.data.get("video_id")
         question = request.data.get("question")
         timestamp = request.data.get("timestamp")
+        time_mode = request.data.get("time_mode")   # auto | bias | boost | restrict
 
         if not video_id or not question:
             return Response({"detail": "video_id and question are required"}, status=400)
+        if not is_valid_video_id(video_id):
+            return invalid_video_id_response()
+        if time_mode is not None and time_mode not in TIME_MODES:
+            return Response({"detail": f"time_mode must be one of {', '.join(TIME_MODES)}"}, status=400)
+        if timestamp is not None:
+            try:
+                timestamp = float(timestamp)
+            except (TypeError, ValueError):
+                timestamp = math.nan
+            if not (math.isfinite(timestamp) and timestamp >= 0):
+                return Response({"detail": "timestamp must be a number of seconds (>= 0)"}, status=400)
+
+        pending = wait_for_video(video_id)
+        if pending is not None:
+            return pending
 
-        answer = yt_rag.ask_video(question, video_id, timestamp)
+        try:
+            answer = yt_rag.ask_video(question, video_id, timestamp, time_mode=time_mode)
+        except SchedulerBusy as err:
+            return busy_response(err)
         return Response({"answer": answer})
 
 
@@ -103,7 +212,7 @@ class SetContextView(APIView):
                 keywords=data.get("keywords"),
                 mode=data.get("mode")
             )
-            return Response({"ok": True, "session": updated})
+            return Response({"ok": True, "session": public_session(updated)})
         except KeyError:
             return Response({"detail": "Invalid session_id"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -117,8 +226,12 @@ class ChatView(APIView):
       {
         "session_id": "...",
         "question": "What is an acid?",
-        "use_youtube": false
+        "use_youtube": false,
+        "include": "session,ncert,youtube",   # optional; "all" = full context
+        "fields": "answer,refs"               # optional; exact top-level fields
       }
+    Default response is compact: answer, retrieval status, source ids + scores.
+    include / fields may also be passed as query parameters.
     """
     def post(self, request):
         data = request.data
@@ -133,10 +246,41 @@ class ChatView(APIView):
             )
 
         use_youtube = bool(data.get("use_youtube", False))
-        result = handle_student_query(sid, question, use_youtube=use_youtube)
+        try:
+            result = handle_student_query(sid, question, use_youtube=use_youtube)
+        except SchedulerBusy as err:
+            return busy_response(err)
 
         if not result.get("ok"):
             # domain guard or invalid session
             return Response({"detail": result.get("error")}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response(result)
+        shaped = shape_chat_response(
+            result,
+            fields=data.get("fields") or request.query_params.get("fields"),
+            include=data.get("include") or request.query_params.get("include"),
+        )
+        return Response(shaped)
+
+
+# ==========================================================
+#  OPS ENDPOINTS
+# ==========================================================
+
+class MetricsView(APIView):
+    """
+    GET /ai_tutor/metrics/
+    Counters, gauges (e.g. coalescing rate) and latency histograms.
+    """
+    def get(self, request):
+        return Response(metrics.snapshot())
+
+
+class VideoCacheStatsView(APIView):
+    """
+    GET /ai_tutor/ops/video_cache/
+    In-memory prepared-video LRU: entries, bytes, hits, misses, evictions,
+    plus the size of the global cross-video index.
+    """
+    def get(self, request):
+        return Response({**yt_rag.cache_stats(), "global_index": yt_rag.global_index.stats()})
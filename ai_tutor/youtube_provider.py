@@ -0,0 +1,117 @@
+# ai_tutor/youtube_provider.py
+"""
+Pluggable YouTube backends for YouTubeRAG, selected by AI_TUTOR_YOUTUBE_BACKEND:
+- "live"     → yt_dlp search + youtube_transcript_api captions (production)
+- "fixtures" → JSON files under AI_TUTOR_YOUTUBE_FIXTURES, no network
+
+Fixture layout:
+    <dir>/search.json               {"<normalized query>": [video, ...], "*": [video, ...]}
+    <dir>/transcripts/<video_id>.json   [{"start":..., "end":..., "text":...}, ...]
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from .coalesce import normalize_text
+from .conf import get_setting
+
+
+class LiveYouTubeProvider:
+    """Real network calls; Whisper fallback stays in YouTubeRAG."""
+
+    supports_audio = True
+
+    def __init__(self, ffmpeg_location=None):
+        self.ffmpeg_location = ffmpeg_location
+        self._ydl = None
+        self._ydl_lock = threading.Lock()   # YoutubeDL instances are not thread-safe
+
+    def _search_extractor(self):
+        """One YoutubeDL for all searches (extractors are initialised once, not per call)."""
+        if self._ydl is None:
+            from yt_dlp import YoutubeDL
+
+            # A bounded socket timeout lets a search that missed its retrieval
+            # deadline finish and free its worker instead of hanging on the network
+            ydl_opts = {
+                "quiet": True,
+                "extract_flat": "in_playlist",
+                "socket_timeout": get_setting("AI_TUTOR_YOUTUBE_SOCKET_TIMEOUT", 10),
+            }
+            if self.ffmpeg_location:
+                ydl_opts["ffmpeg_location"] = self.ffmpeg_location
+            self._ydl = YoutubeDL(ydl_opts)
+        return self._ydl
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict]:
+        search_query = f"ytsearch{max_results}:{query}"
+
+        with self._ydl_lock:
+            data = self._search_extractor().extract_info(search_query, download=False)
+
+        return [
+            {
+                "title": e.get("title"),
+                "video_id": e.get("id"),
+                "channel": e.get("channel"),
+                "link": f"https://www.youtube.com/watch?v={e.get('id')}",
+                "duration": e.get("duration"),
+            }
+            for e in data.get("entries", [])
+        ]
+
+    def fetch_captions(self, video_id: str) -> Optional[List[Dict]]:
+        """Official YouTube transcript as [{'start','end','text'}], or None if unavailable."""
+        try:
+            from youtube_transcript_api import YouTubeTranscriptApi
+            t = YouTubeTranscriptApi.list_transcripts(video_id)
+
+            try:
+                tr = t.find_transcript(["en", "en-US", "en-GB"])
+            except:
+                tr = next(iter(t._transcripts.values()))
+
+            fetched = tr.fetch()
+            return [
+                {
+                    "start": float(s["start"]),
+                    "end": float(s["start"] + s["duration"]),
+                    "text": s["text"].strip(),
+                }
+                for s in fetched if s.get("text")
+            ]
+        except:
+            return None
+
+
+class FixtureYouTubeProvider:
+    """Offline, reproducible search results and transcripts for benchmarks."""
+
+    supports_audio = False
+
+    def __init__(self, fixture_dir: str):
+        self.fixture_dir = str(fixture_dir)
+        with open(os.path.join(self.fixture_dir, "search.json"), encoding="utf-8") as f:
+            self._search = json.load(f)
+
+    def search(self, query: str, max_results: int = 5) -> List[Dict]:
+        results = self._search.get(normalize_text(query)) or self._search.get("*", [])
+        return [dict(v) for v in results[:max_results]]
+
+    def fetch_captions(self, video_id: str) -> Optional[List[Dict]]:
+        path = os.path.join(self.fixture_dir, "transcripts", f"{video_id}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def get_youtube_provider(ffmpeg_location=None):
+    backend = get_setting("AI_TUTOR_YOUTUBE_BACKEND", "live")
+    if backend == "fixtures":
+        return FixtureYouTubeProvider(get_setting("AI_TUTOR_YOUTUBE_FIXTURES", "benchmarks/fixtures/youtube"))
+    if backend != "live":
+        raise ValueError(f"Unknown AI_TUTOR_YOUTUBE_BACKEND: {backend!r}")
+    return LiveYouTubeProvider(ffmpeg_location=ffmpeg_location)
@@ -95,39 +95,36 @@ class YouTubeService:
 
     def run_whisper_local(self, audio_path, model="base"):
         """
-        Local whisper fallback. Requires 'whisper' package installed.
+        Local STT fallback. Engine is AI_TUTOR_STT_BACKEND ('whisper' or 'faster_whisper'),
+        run through the shared parallel transcriber (model loaded once per worker process).
         Returns list of {'text','start','duration'}.
         """
-        import whisper
-        w = whisper.load_model(model)
-        res = w.transcribe(audio_path)
+        from ai_tutor.transcription import get_transcriber
         segments = []
-        for seg in res.get("segments", []):
+        for seg in get_transcriber(model).transcribe(audio_path):
             segments.append({
-                "text": seg["text"].strip(),
-                "start": float(seg["start"]),
-                "duration": float(seg["end"] - seg["start"])
+                "text": seg["text"],
+                "start": seg["start"],
+                "duration": seg["end"] - seg["start"]
             })
         return segments
 
     def fetch_transcript_with_fallback(self, video_id, video_url=None, whisper_model="base"):
         """
-        Try YouTube transcripts first; if not available, fallback to download + whisper.
+        Try YouTube transcripts first; if not available, fall back to local STT on the
+        smallest audio stream, decoded straight to 16 kHz PCM (see ai_tutor.audio).
+        video_url is kept for compatibility; the stream is resolved from video_id.
         """
         segs = self.fetch_transcript_segments(video_id)
         if segs:
             return segs
-        if video_url is None:
-            video_url = f"https://www.youtube.com/watch?v={video_id}"
-        audio_path = os.path.join("downloads", f"{video_id}.wav")
-        print("No YouTube transcript — downloading audio and running local STT (this will take time)...")
-        self.download_audio(video_url, out_path=audio_path)
-        try:
-            segments = self.run_whisper_local(audio_path, model=whisper_model)
-            return segments
-        finally:
-            # optionally keep or delete audio; we'll keep for debugging
-            pass
+        print("No YouTube transcript — streaming audio into local STT (this will take time)...")
+        from ai_tutor.audio import stream_pcm
+        from ai_tutor.transcription import get_transcriber
+        return [
+            {"text": seg["text"], "start": seg["start"], "duration": seg["end"] - seg["start"]}
+            for seg in get_transcriber(whisper_model).iter_transcribe_stream(stream_pcm(video_id))
+        ]
 
     # -------------------------
     # Chunking with timestamps
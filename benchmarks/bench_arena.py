@@ -0,0 +1,126 @@
+# benchmarks/bench_arena.py
+"""
+Memory per video and query latency: one faiss.IndexFlatL2 + a `vectors` copy per
+video (the previous YouTubeRAG layout) vs the shared VectorArena.
+
+Synthetic unit-length vectors stand in for MiniLM embeddings; videos get a
+uniform 10–40 chunks, like typical lessons.
+
+    python benchmarks/bench_arena.py --videos 2000
+    python benchmarks/bench_arena.py --videos 2000 --mmap /tmp/arena
+
+Memory is the process RSS growth while building each layout (so FAISS's C++
+allocations count too). Latency is a top-5 search in one random video, averaged
+over --queries queries. The legacy layout is skipped if faiss is not installed.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai_tutor.vector_arena import VectorArena  # noqa: E402
+
+
+def rss_bytes() -> int:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def make_videos(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    videos = {}
+    for i in range(n):
+        v = rng.normal(size=(int(rng.integers(10, 41)), dim)).astype("float32")
+        videos[f"vid{i:05d}"] = v / np.linalg.norm(v, axis=1, keepdims=True)
+    return videos
+
+
+def measure(build, videos, queries, search):
+    gc.collect()
+    before = rss_bytes()
+    started = time.perf_counter()
+    layout = build(videos)
+    build_s = time.perf_counter() - started
+    gc.collect()
+    grown = rss_bytes() - before
+
+    ids = list(videos)
+    rng = np.random.default_rng(1)
+    picks = [ids[int(i)] for i in rng.integers(len(ids), size=len(queries))]
+    started = time.perf_counter()
+    for vid, q in zip(picks, queries):
+        search(layout, vid, q)
+    query_us = (time.perf_counter() - started) / len(queries) * 1e6
+    return layout, grown, build_s, query_us
+
+
+def build_legacy(videos):
+    import faiss
+    out = {}
+    for vid, v in videos.items():
+        vectors = v.copy()                 # the record's own `vectors` array
+        index = faiss.IndexFlatL2(v.shape[1])
+        index.add(vectors)
+        out[vid] = {"index": index, "vectors": vectors}
+    return out
+
+
+def search_legacy(layout, vid, q):
+    return layout[vid]["index"].search(q[None, :], 5)
+
+
+def build_arena(directory):
+    def build(videos):
+        arena = VectorArena(directory=directory)
+        for vid, v in videos.items():
+            arena.put(vid, v)
+        return arena
+    return build
+
+
+def search_arena(arena, vid, q):
+    return arena.search(vid, q, 5)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--videos", type=int, default=2000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--queries", type=int, default=2000)
+    ap.add_argument("--mmap", default=None, help="directory for a memory-mapped arena")
+    args = ap.parse_args()
+
+    videos = make_videos(args.videos, args.dim)
+    chunks = sum(len(v) for v in videos.values())
+    raw = sum(v.nbytes for v in videos.values())
+    queries = np.random.default_rng(2).normal(size=(args.queries, args.dim)).astype("float32")
+    print(f"{args.videos} videos, {chunks} chunks, dim {args.dim}, raw vectors {raw / 2**20:.1f} MiB\n")
+    print(f"{'layout':<14}{'RSS growth':>12}{'per video':>12}{'build s':>9}{'query µs':>10}")
+
+    try:
+        import faiss  # noqa: F401
+        legacy, grown, build_s, query_us = measure(build_legacy, videos, queries, search_legacy)
+        print(f"{'faiss/video':<14}{grown / 2**20:10.1f}Mi{grown / args.videos / 1024:10.1f}Ki{build_s:9.2f}{query_us:10.1f}")
+        del legacy
+    except ImportError:
+        print(f"{'faiss/video':<14}  (faiss not installed — skipped)")
+
+    label = "arena (mmap)" if args.mmap else "arena"
+    arena, grown, build_s, query_us = measure(build_arena(args.mmap), videos, queries, search_arena)
+    print(f"{label:<14}{grown / 2**20:10.1f}Mi{grown / args.videos / 1024:10.1f}Ki{build_s:9.2f}{query_us:10.1f}")
+    print(f"\narena: {arena.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_projection.py
+"""
+Serialised size and time of a chat response: full result vs compact projection.
+
+Builds a representative handle_student_query result (8 NCERT chunks, 5 YouTube
+results, a session with conversation history) and renders it the way DRF does
+(JSONRenderer when installed, json.dumps otherwise).
+
+Usage (from the repo root):
+    python benchmarks/bench_projection.py --iterations 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai_tutor.projection import shape_chat_response  # noqa: E402
+
+
+def sample_result():
+    chunk = ("Acids are sour in taste and turn blue litmus red. " * 30).strip()
+    ncert_hits = [{"id": f"gesc105_chunk{i}.txt", "score": round(0.8 - i * 0.03, 4)} for i in range(8)]
+    videos = [
+        {
+            "title": f"Acids, Bases and Salts part {i}",
+            "video_id": f"vid{i:08d}",
+            "channel": "NCERT Explained",
+            "link": f"https://www.youtube.com/watch?v=vid{i:08d}",
+            "duration": 600 + i,
+        }
+        for i in range(5)
+    ]
+    history = [{"role": "user" if i % 2 == 0 else "assistant", "content": chunk[:600]} for i in range(8)]
+    return {
+        "ok": True,
+        "session_id": "8d3c7a1e-0000-4000-8000-000000000000",
+        "question": "Explain why acids and bases neutralise each other",
+        "session": {
+            "topic": "Acids, Bases and Salts",
+            "keywords": ["acid", "base", "salt", "ph"],
+            "mode": "chat",
+            "current_video": None,
+            "history": history,
+            "summary": chunk[:500],
+        },
+        "ncert": {"source": "ncert", "results": [chunk] * 8, "hits": ncert_hits},
+        "youtube": {"source": "youtube", "results": videos},
+        "sources": {"ncert": "ok", "youtube": "ok"},
+        "answer": chunk[:2500],
+        "model": "llama3:latest",
+    }
+
+
+def renderer():
+    try:
+        from django.conf import settings
+        if not settings.configured:
+            settings.configure()
+        from rest_framework.renderers import JSONRenderer
+        r = JSONRenderer()
+        return "drf", lambda data: r.render(data)
+    except Exception:
+        return "json", lambda data: json.dumps(data).encode("utf-8")
+
+
+def measure(render, make_payload, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        body = render(make_payload())
+    per_call = (time.perf_counter() - started) / iterations
+    return len(body), per_call
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--iterations", type=int, default=2000)
+    args = ap.parse_args()
+
+    name, render = renderer()
+    result = sample_result()
+    cases = {
+        "full": lambda: result,
+        "compact": lambda: shape_chat_response(result),
+        "include=session": lambda: shape_chat_response(result, include="session"),
+        "fields=answer,refs": lambda: shape_chat_response(result, fields="answer,refs"),
+    }
+
+    print(f"renderer: {name}, iterations: {args.iterations}")
+    base_bytes = None
+    for label, make in cases.items():
+        size, per_call = measure(render, make, args.iterations)
+        base_bytes = base_bytes or size
+        print(f"{label:<20} {size:>8} bytes ({size / base_bytes:6.1%})  {per_call * 1e6:8.1f} µs/response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_stt.py
+"""
+WER + speed comparison of the speech-to-text backends in ai_tutor.stt.
+
+Fixtures are pairs of an audio file and its reference transcript:
+    <dir>/<name>.(wav|mp3|m4a|webm|flac)
+    <dir>/<name>.txt
+
+    python benchmarks/bench_stt.py --fixtures samples/stt --model base
+    python benchmarks/bench_stt.py --fixtures samples/stt --backends faster_whisper
+
+Each engine transcribes every clip in-process (one model, no window pool) so the
+numbers compare the engines themselves. Model load time is reported separately.
+WER is word-level edit distance / reference words after lower-casing and
+stripping punctuation; RTF is transcription seconds / audio seconds (lower is faster).
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai_tutor.stt import ENGINES, load_engine  # noqa: E402
+from ai_tutor.transcription import SAMPLE_RATE, decode_audio  # noqa: E402
+
+AUDIO_EXTS = (".wav", ".mp3", ".m4a", ".webm", ".flac")
+
+
+def normalize(text: str):
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_errors(ref, hyp) -> int:
+    """Levenshtein distance over words (substitutions + deletions + insertions)."""
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1]
+
+
+def load_fixtures(directory):
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, "*"))):
+        stem, ext = os.path.splitext(path)
+        if ext.lower() in AUDIO_EXTS and os.path.exists(stem + ".txt"):
+            with open(stem + ".txt", encoding="utf-8") as f:
+                fixtures.append((os.path.basename(stem), decode_audio(path), normalize(f.read())))
+    return fixtures
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--fixtures", required=True, help="directory of <name>.<audio> + <name>.txt pairs")
+    ap.add_argument("--model", default="base")
+    ap.add_argument("--backends", nargs="+", default=sorted(ENGINES), choices=sorted(ENGINES))
+    ap.add_argument("--threads", type=int, default=os.cpu_count())
+    args = ap.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        sys.exit(f"no <audio>+<txt> pairs found in {args.fixtures}")
+    total_audio = sum(len(a) for _, a, _ in fixtures) / SAMPLE_RATE
+    total_words = sum(len(r) for _, _, r in fixtures)
+    print(f"{len(fixtures)} clips, {total_audio / 60:.1f} min audio, {total_words} reference words\n")
+
+    print(f"{'backend':<16}{'load s':>8}{'run s':>9}{'RTF':>8}{'WER':>8}")
+    for backend in args.backends:
+        started = time.perf_counter()
+        engine = load_engine(backend, args.model, threads=args.threads)
+        load_s = time.perf_counter() - started
+
+        engine.transcribe_array(fixtures[0][1][: SAMPLE_RATE * 2])   # first-call warm-up
+        errors, run_s = 0, 0.0
+        for name, audio, ref in fixtures:
+            started = time.perf_counter()
+            segments = engine.transcribe_array(audio)
+            run_s += time.perf_counter() - started
+            errors += word_errors(ref, normalize(" ".join(s["text"] for s in segments)))
+
+        print(f"{backend:<16}{load_s:8.1f}{run_s:9.1f}{run_s / total_audio:8.3f}{errors / max(total_words, 1):8.3f}")
+        del engine
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/bench_tutor.py
+"""
+Offline, reproducible load test of the tutor flows:
+- handle_student_query (chat)
+- YouTubeRAG.search_youtube → prepare_video → ask_video
+
+Uses ai_tutor.fake_ollama for the LLM and the fixture YouTube provider,
+so no Ollama server, yt_dlp or network access is needed
+(the sentence-transformers embedder still runs locally).
+
+Usage (from the repo root):
+    python benchmarks/bench_tutor.py --requests 40 --concurrency 8 --tokens-per-sec 40
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+QUESTIONS = [
+    "What is an acid?",
+    "Explain why acids and bases neutralise each other, with examples",
+    "How is soil acidity treated?",
+    "What happens when an ant bites?",
+]
+
+
+def configure(args):
+    from django.conf import settings
+
+    settings.configure(
+        AI_TUTOR_OLLAMA_HOST=f"http://127.0.0.1:{args.port}",
+        AI_TUTOR_YOUTUBE_BACKEND="fixtures",
+        AI_TUTOR_YOUTUBE_FIXTURES=os.path.join(ROOT, "benchmarks", "fixtures", "youtube"),
+        AI_TUTOR_LLM_MAX_CONCURRENCY=args.llm_concurrency,
+        AI_TUTOR_LLM_MAX_QUEUE=10_000,
+        AI_TUTOR_LLM_MAX_WAIT=None,
+    )
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    k = min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))
+    return values[k]
+
+
+def report(name, latencies, wall):
+    print(
+        f"{name:<12} n={len(latencies):<4} "
+        f"p50={percentile(latencies, 50):.3f}s p95={percentile(latencies, 95):.3f}s "
+        f"mean={statistics.mean(latencies):.3f}s throughput={len(latencies) / wall:.2f} req/s"
+    )
+
+
+def timed(fn, *a, **kw):
+    started = time.perf_counter()
+    fn(*a, **kw)
+    return time.perf_counter() - started
+
+
+def run_load(fn, jobs, concurrency):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(lambda job: timed(fn, *job), jobs))
+    return latencies, time.perf_counter() - started
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--requests", type=int, default=40)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--llm-concurrency", type=int, default=2)
+    ap.add_argument("--port", type=int, default=11435)
+    ap.add_argument("--tokens-per-sec", type=float, default=40.0)
+    ap.add_argument("--ttft-mean", type=float, default=0.3)
+    ap.add_argument("--answer-tokens", type=int, default=80)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    configure(args)
+
+    from ai_tutor.fake_ollama import FakeOllamaConfig, serve
+    server = serve(port=args.port, background=True, config=FakeOllamaConfig(
+        tokens_per_sec=args.tokens_per_sec,
+        ttft_mean=args.ttft_mean,
+        answer_tokens=args.answer_tokens,
+        cold_load=0.0,
+        seed=args.seed,
+    ))
+
+    from ai_tutor import controller, metrics
+
+    sid = controller.new_session()
+    controller.set_session_context(
+        sid, topic="Acids, Bases and Salts", keywords=["acid", "base", "salt", "ph"], mode="chat"
+    )
+    jobs = [(sid, QUESTIONS[i % len(QUESTIONS)]) for i in range(args.requests)]
+    latencies, wall = run_load(controller.handle_student_query, jobs, args.concurrency)
+    report("chat", latencies, wall)
+
+    from ai_tutor.rag_youtube import get_youtube_rag
+    rag = get_youtube_rag()
+    videos = rag.search_youtube("Acids, Bases and Salts")
+    video_id = videos[0]["video_id"]
+    print(f"{'prepare':<12} {timed(rag.prepare_video, video_id):.3f}s ({video_id})")
+
+    jobs = [(QUESTIONS[i % len(QUESTIONS)], video_id) for i in range(args.requests)]
+    latencies, wall = run_load(rag.ask_video, jobs, args.concurrency)
+    report("video_ask", latencies, wall)
+
+    server.shutdown()
+
+    hist = metrics.snapshot()["histograms"]
+    for name in ("llm.queue_wait.interactive", "llm.run_seconds"):
+        if name in hist:
+            h = hist[name]
+            print(f"{name:<28} count={h['count']} mean={h['sum'] / max(h['count'], 1):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
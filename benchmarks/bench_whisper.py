@@ -0,0 +1,62 @@
+# benchmarks/bench_whisper.py
+"""
+Wall-clock comparison: single whisper.transcribe() call vs ParallelTranscriber
+(silence-split windows in a process pool, model loaded once per worker).
+
+Bring your own long sample (the target case is ~20 minutes of lecture audio):
+    python benchmarks/bench_whisper.py --audio samples/lecture_20min.mp3 --model base --workers 4
+
+Model loading is excluded from both timings (the server keeps models loaded),
+and the parallel pool is warmed on a short clip before timing.
+"""
+
+import argparse
+import difflib
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai_tutor.transcription import SAMPLE_RATE, ParallelTranscriber, decode_audio  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--audio", required=True, help="path to a long audio/video file")
+    ap.add_argument("--model", default="base")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--window", type=float, default=60.0, help="target window length (s)")
+    args = ap.parse_args()
+
+    audio = decode_audio(args.audio)
+    duration = len(audio) / SAMPLE_RATE
+    print(f"audio: {args.audio} ({duration / 60:.1f} min)")
+
+    # --- single call (today's path) ---
+    import whisper
+    model = whisper.load_model(args.model)
+    started = time.perf_counter()
+    single = model.transcribe(audio, fp16=False)
+    single_s = time.perf_counter() - started
+    single_text = " ".join(s["text"].strip() for s in single["segments"])
+    del model
+
+    # --- parallel windows ---
+    transcriber = ParallelTranscriber(args.model, workers=args.workers, window_s=args.window, backend="whisper")
+    transcriber.transcribe_array(audio[: SAMPLE_RATE * 5])   # spawn workers + load models
+    started = time.perf_counter()
+    segments = transcriber.transcribe_array(audio)
+    parallel_s = time.perf_counter() - started
+    transcriber.shutdown()
+    parallel_text = " ".join(s["text"] for s in segments)
+
+    similarity = difflib.SequenceMatcher(None, single_text.split(), parallel_text.split()).ratio()
+    print(f"single call   {single_s:8.1f}s  ({duration / single_s:5.2f}x realtime)  {len(single['segments'])} segments")
+    print(f"parallel x{transcriber.workers:<3} {parallel_s:8.1f}s  ({duration / parallel_s:5.2f}x realtime)  {len(segments)} segments")
+    print(f"speed-up      {single_s / parallel_s:8.2f}x   word-sequence similarity {similarity:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -194,8 +194,10 @@ class EducatorStudentView(APIView):
 #                ⭐ AI TUTOR API ⭐
 # =================================================
 
-from ai_tutor.rag_youtube import YouTubeRAG
-yt_rag = YouTubeRAG()
+from ai_tutor.scheduler import SchedulerBusy
+# Share ai_tutor's YouTubeRAG and prepare-job queue (one video cache per process)
+from ai_tutor.video_store import is_valid_video_id
+from ai_tutor.views import busy_response, wait_for_video, yt_rag
 
 
 # --- 1) Search YouTube ---
@@ -221,8 +223,16 @@ class AskTutor(APIView):
 
         if not video_id or not question:
             return Response({"error": "video_id and question are required"}, status=400)
+        if not is_valid_video_id(video_id):
+            return Response({"error": "video_id must be an 11-character YouTube video id"}, status=400)
 
-        yt_rag.prepare_video(video_id)
-        answer = yt_rag.ask_video(question, video_id)
+        pending = wait_for_video(video_id)
+        if pending is not None:
+            return pending
+
+        try:
+            answer = yt_rag.ask_video(question, video_id)
+        except SchedulerBusy as err:
+            return busy_response(err)
 
         return Response({"answer": answer})
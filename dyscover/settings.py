@@ -86,6 +86,23 @@ DATABASES = {
 }
 
 
+# ---------------------------------------------------------
+# Caches
+# ---------------------------------------------------------
+# "sessions" is on disk so every worker on the host shares tutor sessions
+# (AI_TUTOR_SESSION_BACKEND = "cache"); point it at Redis/memcached when the
+# workers span hosts.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "django_cache" / "sessions",
+    },
+}
+
+
 # ---------------------------------------------------------
 # Authentication + Password Validators
 # ---------------------------------------------------------
@@ -144,3 +161,134 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
+
+
+# ---------------------------------------------------------
+# AI Tutor
+# ---------------------------------------------------------
+# LLM scheduler: concurrent Ollama generations, queued requests,
+# and the longest a request may wait for a slot before HTTP 429.
+AI_TUTOR_LLM_MAX_CONCURRENCY = 2
+AI_TUTOR_LLM_MAX_QUEUE = 32
+AI_TUTOR_LLM_MAX_WAIT = 60.0
+
+# Ollama model lifecycle: models loaded at startup and how long
+# the server keeps them resident after the last request. Warm-up only runs
+# in the serving process (runserver / gunicorn / uvicorn ...), never for
+# migrate, shell, collectstatic or tests.
+AI_TUTOR_WARMUP_ON_START = True
+AI_TUTOR_WARM_MODELS = ["llama3:latest", "llama3.2:1b"]
+AI_TUTOR_OLLAMA_KEEP_ALIVE = "30m"
+
+# Model routing: quality vs fast model, per-endpoint latency SLOs (seconds),
+# and the JSONL file every routing decision is appended to. An SLO below the
+# quality model's expected latency (15s until observed) pins that endpoint to
+# the fast model, so keep each SLO above it.
+AI_TUTOR_MODEL_QUALITY = "llama3:latest"
+AI_TUTOR_MODEL_FAST = "llama3.2:1b"
+AI_TUTOR_LATENCY_SLO = {"chat": 30.0, "video_ask": 20.0, "ncert": 20.0}
+AI_TUTOR_ROUTING_LOG = BASE_DIR / "logs" / "model_routing.jsonl"
+
+# Backends: None → local Ollama default; point at ai_tutor.fake_ollama for load tests.
+# YouTube: "live" (yt_dlp + captions API) or "fixtures" (offline JSON fixtures).
+AI_TUTOR_OLLAMA_HOST = None
+AI_TUTOR_YOUTUBE_BACKEND = "live"
+AI_TUTOR_YOUTUBE_FIXTURES = BASE_DIR / "benchmarks" / "fixtures" / "youtube"
+
+# Per-source retrieval deadlines (seconds) for the chat fan-out; a source
+# that misses its deadline is dropped from that answer.
+AI_TUTOR_RETRIEVAL_DEADLINES = {"ncert": 3.0, "youtube": 5.0}
+# Worker threads per source; calls that missed their deadline keep theirs until
+# they finish, and a source with every worker taken is skipped ("busy").
+AI_TUTOR_RETRIEVAL_WORKERS = {"ncert": 4, "youtube": 4}
+# Network timeout (seconds) for yt_dlp searches, so stragglers do finish.
+AI_TUTOR_YOUTUBE_SOCKET_TIMEOUT = 10
+
+# Tutor sessions: "memory" (per-process LRU + idle TTL) or "cache"
+# (shared through CACHES[AI_TUTOR_SESSION_CACHE_ALIAS] for multi-worker deployments).
+AI_TUTOR_SESSION_BACKEND = "memory"
+AI_TUTOR_SESSION_TTL = 2 * 60 * 60
+AI_TUTOR_SESSION_MAX_ENTRIES = 10000
+AI_TUTOR_SESSION_CACHE_ALIAS = "sessions"
+AI_TUTOR_SESSION_SWEEP_INTERVAL = 60.0
+
+# Conversation memory: history size (estimated tokens) that triggers a background
+# summarisation, turns kept verbatim, and the fixed memory budget per prompt.
+AI_TUTOR_MEMORY_COMPACT_TOKENS = 1200
+AI_TUTOR_MEMORY_KEEP_TURNS = 4
+AI_TUTOR_MEMORY_MAX_TOKENS = 600
+
+# Domain guard: minimum cosine similarity between a question and the
+# session's topic/keyword centroid (all-MiniLM-L6-v2 embeddings).
+AI_TUTOR_DOMAIN_GUARD_THRESHOLD = 0.3
+
+# Topic prefetch on set_context: NCERT chunks pinned per session, the largest
+# squared-L2 distance a pool hit may have before falling back to the full index,
+# and whether to also search + prepare the best matching video.
+AI_TUTOR_PREFETCH_POOL_SIZE = 48
+AI_TUTOR_PREFETCH_MAX_DISTANCE = 1.0
+AI_TUTOR_PREFETCH_VIDEO = False
+
+# Prepared YouTube videos persisted on disk (versioned), plus the directory
+# YouTubeService.build_and_save_video_index writes, read as a fallback.
+AI_TUTOR_VIDEO_CACHE_DIR = BASE_DIR / "video_cache"
+AI_TUTOR_LEGACY_VIDEO_INDEX_DIR = BASE_DIR / "video_indices"
+
+# Memory ceiling for prepared videos kept in RAM (chunk text, timestamps and
+# their rows in the vector arena); evicted videos are reloaded from disk.
+AI_TUTOR_VIDEO_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Chunk vectors of all videos share one contiguous arena per embedding model.
+# Set a directory to back it with a memory-mapped file (None → plain RAM).
+AI_TUTOR_VECTOR_ARENA_DIR = None
+
+# /videos/search/ covers the videos held in memory; on first use the most
+# recently stored ones (at most this many, within the LRU budget) are loaded.
+AI_TUTOR_GLOBAL_INDEX_WARM_MAX = 200
+
+# Background video preparation: worker threads, how long ask endpoints wait
+# for a video before answering 202 + job status, and finished-job retention.
+AI_TUTOR_PREPARE_WORKERS = 2
+AI_TUTOR_PREPARE_WAIT = 20.0
+AI_TUTOR_PREPARE_JOB_TTL = 3600
+# Chunks embedded per batch while a video is prepared; each batch becomes
+# searchable immediately, so ask_video can answer from a partial transcript.
+AI_TUTOR_PREPARE_EMBED_BATCH = 8
+
+# Whisper fallback: worker processes (None → half the CPU cores) and the
+# target window length (seconds) audio is split into at silences.
+AI_TUTOR_WHISPER_WORKERS = None
+AI_TUTOR_WHISPER_WINDOW = 60.0
+
+# Speech-to-text backend: "whisper" (openai-whisper, fp32) or
+# "faster_whisper" (CTranslate2, int8 on CPU).
+AI_TUTOR_STT_BACKEND = "whisper"
+
+# Speech-to-text audio: when a stream cannot be decoded directly, the native
+# audio file is downloaded here; least recently used files are deleted once
+# the directory passes the quota.
+AI_TUTOR_AUDIO_TEMP_DIR = BASE_DIR / "audio_temp"
+AI_TUTOR_AUDIO_TEMP_MAX_BYTES = 512 * 1024 * 1024
+
+# YouTube search results cache: TTL (seconds), entry bound, and optional JSON
+# file so cached topic searches survive restarts (None → memory only).
+AI_TUTOR_SEARCH_CACHE_TTL = 6 * 3600
+AI_TUTOR_SEARCH_CACHE_MAX_ENTRIES = 512
+AI_TUTOR_SEARCH_CACHE_PATH = BASE_DIR / "video_cache" / "youtube_search.json"
+
+# Speculative preparation of YouTube search results (captions only, never
+# Whisper): top-N per search, at most BUDGET starts per hour, and videos
+# longer than MAX_DURATION seconds are skipped.
+AI_TUTOR_SPECULATIVE_PREPARE = False
+AI_TUTOR_SPECULATIVE_TOP_N = 3
+AI_TUTOR_SPECULATIVE_BUDGET = 30
+AI_TUTOR_SPECULATIVE_MAX_DURATION = 1800
+
+# Timestamp-aware video retrieval: default mode (auto | bias | boost |
+# restrict; "bias" is the original behaviour, the others are opt-in per
+# request via time_mode), the window around the playback position as
+# (before, after) seconds, and the distance multiplier for in-window chunks
+# in "boost" mode.
+AI_TUTOR_VIDEO_TIME_MODE = "bias"
+AI_TUTOR_VIDEO_TIME_WINDOW = (90.0, 15.0)
+AI_TUTOR_VIDEO_TIME_BOOST = 0.75